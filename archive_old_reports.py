@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 归档任务：把早于指定天数的汇报按月移入归档库，可定期（如每日）运行
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from archive import archive_dir, archive_reports
+from config import ARCHIVE_AFTER_DAYS
+from storage import DB_PATH, get_connection, init_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按月归档旧汇报")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"归档采集日期早于多少天的汇报，默认 {ARCHIVE_AFTER_DAYS}")
+    parser.add_argument("--db", default=DB_PATH, help="热库文件")
+    parser.add_argument("--vacuum", action="store_true", help="归档后 VACUUM 热库，回收磁盘空间")
+    args = parser.parse_args()
+
+    init_database(args.db)
+    result = archive_reports(args.older_than_days, args.db)
+    for month, count in result["months"].items():
+        print(f"📦 {month}: {count} 条")
+    print(f"🎉 共归档 {result['archived']} 条，归档目录: {archive_dir(args.db)}")
+
+    if args.vacuum and result["archived"]:
+        get_connection(args.db).execute("VACUUM")
+        print("🧹 热库已 VACUUM")
+
+
+if __name__ == "__main__":
+    main()
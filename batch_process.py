@@ -1,109 +1,23 @@
 #!/usr/bin/env python3
 # 批量处理示例数据
-import sqlite3
-import pandas as pd
+import argparse
+import os
+import queue
+import sys
+import threading
 import json
-import re
-from datetime import datetime
-from typing import Dict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List
 
-def extract_with_rules(text: str) -> Dict:
-    """使用规则和正则表达式提取数据"""
-    result = {
-        "driver_name": None,
-        "vehicle_number": None,
-        "collection_task": None,
-        "collection_segments": None,
-        "collection_location": None,
-        "collection_date": None,
-        "collection_time_period": None,
-        "driving_distance": None
-    }
-    
-    # 司机姓名提取
-    name_patterns = [r'采集员[：:]\s*([^，,\n]+)', r'姓名[：:]\s*([^，,\n]+)', r'司机[：:]\s*([^，,\n]+)']
-    for pattern in name_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["driver_name"] = match.group(1).strip()
-            break
-    
-    # 车辆编号提取
-    vehicle_patterns = [r'车辆编号[：:]\s*([^，,\n]+)', r'车牌[：:]\s*([^，,\n]+)', r'车号[：:]\s*([^，,\n]+)']
-    for pattern in vehicle_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["vehicle_number"] = match.group(1).strip()
-            break
-    
-    # 采集任务提取
-    task_patterns = [r'采集任务[：:]\s*([^，,\n]+)', r'任务[：:]\s*([^，,\n]+)', r'项目[：:]\s*([^，,\n]+)']
-    for pattern in task_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["collection_task"] = match.group(1).strip()
-            break
-    
-    # 采集段数提取（提取数字）
-    segments_patterns = [r'采集段数[：:]\s*(\d+)', r'段数[：:]\s*(\d+)', r'(\d+)\s*段']
-    for pattern in segments_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["collection_segments"] = int(match.group(1))
-            break
-    
-    # 采集地点提取
-    location_patterns = [r'采集地点[：:]\s*([^，,\n]+)', r'地点[：:]\s*([^，,\n]+)', r'位置[：:]\s*([^，,\n]+)']
-    for pattern in location_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["collection_location"] = match.group(1).strip()
-            break
-    
-    # 采集日期提取
-    date_patterns = [r'采集日期[：:]\s*([0-9-/]+)', r'日期[：:]\s*([0-9-/]+)', r'时间[：:]\s*([0-9-/]+)']
-    for pattern in date_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["collection_date"] = match.group(1).strip()
-            break
-    
-    # 采集时段提取
-    if '白天' in text or '白' in text or '上午' in text or '下午' in text:
-        result["collection_time_period"] = "白天"
-    elif '夜晚' in text or '夜' in text or '晚上' in text:
-        result["collection_time_period"] = "夜晚"
-    
-    # 行驶里程提取
-    distance_patterns = [r'行驶里程[：:]\s*([0-9.]+)', r'里程[：:]\s*([0-9.]+)', r'([0-9.]+)\s*公里', r'距离[：:]\s*([0-9.]+)']
-    for pattern in distance_patterns:
-        match = re.search(pattern, text)
-        if match:
-            result["driving_distance"] = float(match.group(1))
-            break
-    
-    return result
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 
-def save_to_database(data: Dict, raw_text: str):
-    """保存数据到SQLite数据库"""
-    conn = sqlite3.connect('driver_data.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    INSERT INTO driver_reports 
-    (driver_name, vehicle_number, collection_task, collection_segments, 
-     collection_location, collection_date, collection_time_period, 
-     driving_distance, raw_text)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        data["driver_name"], data["vehicle_number"], data["collection_task"],
-        data["collection_segments"], data["collection_location"], 
-        data["collection_date"], data["collection_time_period"],
-        data["driving_distance"], raw_text
-    ))
-    
-    conn.commit()
-    conn.close()
+from export import export_csv
+from ingest import SEPARATORS, ingest_file, iter_reports, parse_chunk, parse_reports_batch
+from storage import DB_PATH, DUPLICATE_POLICIES, save_reports_batch
+from summary import get_collection_summary
 
 def process_sample_data():
     """处理示例数据"""
@@ -166,44 +80,143 @@ def process_sample_data():
     
     print("🚀 开始批量处理示例数据...")
     
-    for i, report_text in enumerate(sample_reports, 1):
-        print(f"\n📊 处理第 {i} 条数据...")
-        
-        # 解析数据
-        extracted_data = extract_with_rules(report_text)
-        print(f"解析结果: {json.dumps(extracted_data, ensure_ascii=False)}")
-        
-        # 保存到数据库
-        save_to_database(extracted_data, report_text.strip())
-        print("✅ 数据已保存")
+    # 整批解析后在单个事务中保存
+    batch = parse_reports_batch(sample_reports)
+    if 'error' in batch:
+        print(f"❌ 批量保存失败: {batch['error']}")
+        return
     
-    print(f"\n🎉 批量处理完成！共处理 {len(sample_reports)} 条数据")
+    for item in batch["results"]:
+        print(f"\n📊 第 {item['index'] + 1} 条数据...")
+        if item["status"] == "success":
+            print(f"解析结果: {json.dumps(item['data'], ensure_ascii=False)}")
+        else:
+            print(f"❌ 解析失败: {item['error']}")
+    
+    print(f"\n🎉 批量处理完成！共保存 {batch['saved']} 条数据，重复 {batch['duplicates']} 条")
 
 def get_final_summary():
     """获取最终汇总"""
-    conn = sqlite3.connect('driver_data.db')
-    df = pd.read_sql_query("SELECT * FROM driver_reports", conn)
-    conn.close()
+    summary = get_collection_summary()
+    if 'total_reports' not in summary:
+        print(f"\n📈 最终数据汇总: {summary.get('message') or summary.get('error')}")
+        return
     
     print("\n📈 最终数据汇总:")
-    print(f"📊 总报告数: {len(df)}")
-    print(f"👥 司机数量: {df['driver_name'].nunique()}")
-    print(f"🛣️  总采集段数: {df['collection_segments'].sum()}")
-    print(f"🚗 总行驶里程: {df['driving_distance'].sum():.1f} 公里")
+    print(f"📊 总报告数: {summary['total_reports']}")
+    print(f"👥 司机数量: {summary['total_drivers']}")
+    print(f"🛣️  总采集段数: {summary['total_segments']}")
+    print(f"🚗 总行驶里程: {summary['total_distance']:.1f} 公里")
     
     print(f"\n📍 采集地点分布:")
-    for location, count in df['collection_location'].value_counts().items():
+    for location, count in summary['locations'].items():
         print(f"   {location}: {count} 次")
     
     print(f"\n⏰ 时段分布:")
-    for period, count in df['collection_time_period'].value_counts().items():
+    for period, count in summary['time_periods'].items():
         print(f"   {period}: {count} 次")
     
     # 导出最终数据
-    filename = f"driver_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"\n📤 数据已导出到: {filename}")
+    result = export_csv()
+    print(f"\n📤 数据已导出到: {result['filename']}")
+
+def _chunked(report_texts: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """把汇报流切成固定大小的工作单元"""
+    iterator = iter(report_texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _parse_chunks_in_order(chunks: Iterable[List[str]], workers: int) -> Iterator[List]:
+    """多进程解析工作单元，按提交顺序产出结果，在途单元数有上限"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield parse_chunk(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(parse_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def bulk_process_reports(report_texts: Iterable[str], workers: int = None,
+                         chunk_size: int = 500, db_path: str = DB_PATH,
+                         on_duplicate: str = "skip") -> int:
+    """
+    多核批量解析入库
+    
+    正则提取分摊到进程池，单个写线程按输入顺序逐块批量写库，
+    SQLite 写入始终串行。返回新增行数，重复汇报按 on_duplicate 处理。
+    """
+    workers = workers or os.cpu_count() or 1
+    results = queue.Queue(maxsize=workers * 2)
+    state = {"saved": 0, "error": None}
+    
+    def writer():
+        while True:
+            items = results.get()
+            if items is None:
+                return
+            if state["error"] is not None:
+                continue
+            try:
+                state["saved"] += save_reports_batch(items, db_path, on_duplicate=on_duplicate)
+            except Exception as e:
+                state["error"] = e
+    
+    writer_thread = threading.Thread(target=writer, name="report-writer")
+    writer_thread.start()
+    try:
+        for items in _parse_chunks_in_order(_chunked(report_texts, chunk_size), workers):
+            if state["error"] is not None:
+                break
+            results.put(items)
+    finally:
+        results.put(None)
+        writer_thread.join()
+    
+    if state["error"] is not None:
+        raise state["error"]
+    return state["saved"]
+
+def _print_progress(offset: int, total_bytes: int, saved: int):
+    percent = offset / total_bytes * 100 if total_bytes else 100.0
+    print(f"\r📊 {percent:5.1f}% ({offset}/{total_bytes} 字节)，已保存 {saved} 条", end="", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="批量处理司机汇报")
+    parser.add_argument("--bulk", metavar="FILE", help="多核批量解析入库的汇报文件")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数，默认CPU核数")
+    parser.add_argument("--chunk-size", type=int, default=500, help="每个工作单元的汇报条数")
+    parser.add_argument("--stream", metavar="FILE", help="流式导入的大文件，内存占用与文件大小无关")
+    parser.add_argument("--separator", default="header_or_blank",
+                        help=f"汇报分隔行：{'/'.join(SEPARATORS)} 或自定义正则")
+    parser.add_argument("--batch-size", type=int, default=1000, help="流式导入每批提交的条数")
+    parser.add_argument("--resume", action="store_true", help="从上次提交的字节偏移继续流式导入")
+    parser.add_argument("--on-duplicate", choices=sorted(DUPLICATE_POLICIES), default="skip",
+                        help="重复汇报的处理：skip 跳过、update 覆盖解析结果、count 累加提交次数")
+    args = parser.parse_args()
+    separator = SEPARATORS.get(args.separator, args.separator)
+    
+    if args.stream:
+        print(f"🚀 流式导入: {args.stream}")
+        result = ingest_file(args.stream, separator, args.batch_size, args.resume,
+                             progress=_print_progress, on_duplicate=args.on_duplicate)
+        print(f"\n🎉 流式导入完成！从字节 {result['start_offset']} 开始，共保存 {result['saved']} 条数据")
+    elif args.bulk:
+        print(f"🚀 多核批量入库: {args.bulk}")
+        reports = (report_text for _, report_text in iter_reports(args.bulk, separator))
+        saved = bulk_process_reports(reports, args.workers, args.chunk_size, on_duplicate=args.on_duplicate)
+        print(f"🎉 批量入库完成！共保存 {saved} 条数据")
+    else:
+        process_sample_data()
+    get_final_summary()
 
 if __name__ == "__main__":
-    process_sample_data()
-    get_final_summary()
\ No newline at end of file
+    main()
\ No newline at end of file
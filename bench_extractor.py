@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 规则提取微基准：对比逐字段 re.search 的旧实现与单次扫描的 extractor
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+
+RUN_TOGETHER_REPORT = "采集员：方少东车辆编号：LY-005-31781采集任务：黄灯闪烁路口/与行人二轮车交互采集段数：70+采集地点：合肥采集日期：8.10采集时段：白天行驶里程:  273"
+
+
+def legacy_extract_with_rules(text: str) -> Dict:
+    """旧版 batch_process.py 中的逐模式提取，仅作为基准线"""
+    result = dict.fromkeys([
+        "driver_name", "vehicle_number", "collection_task", "collection_segments",
+        "collection_location", "collection_date", "collection_time_period", "driving_distance",
+    ])
+    text_fields = [
+        ("driver_name", [r'采集员[：:]\s*([^，,\n]+)', r'姓名[：:]\s*([^，,\n]+)', r'司机[：:]\s*([^，,\n]+)']),
+        ("vehicle_number", [r'车辆编号[：:]\s*([^，,\n]+)', r'车牌[：:]\s*([^，,\n]+)', r'车号[：:]\s*([^，,\n]+)']),
+        ("collection_task", [r'采集任务[：:]\s*([^，,\n]+)', r'任务[：:]\s*([^，,\n]+)', r'项目[：:]\s*([^，,\n]+)']),
+        ("collection_location", [r'采集地点[：:]\s*([^，,\n]+)', r'地点[：:]\s*([^，,\n]+)', r'位置[：:]\s*([^，,\n]+)']),
+        ("collection_date", [r'采集日期[：:]\s*([0-9-/]+)', r'日期[：:]\s*([0-9-/]+)', r'时间[：:]\s*([0-9-/]+)']),
+    ]
+    for field, patterns in text_fields:
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match:
+                result[field] = match.group(1).strip()
+                break
+    for pattern in [r'采集段数[：:]\s*(\d+)', r'段数[：:]\s*(\d+)', r'(\d+)\s*段']:
+        match = re.search(pattern, text)
+        if match:
+            result["collection_segments"] = int(match.group(1))
+            break
+    if '白天' in text or '白' in text or '上午' in text or '下午' in text:
+        result["collection_time_period"] = "白天"
+    elif '夜晚' in text or '夜' in text or '晚上' in text:
+        result["collection_time_period"] = "夜晚"
+    for pattern in [r'行驶里程[：:]\s*([0-9.]+)', r'里程[：:]\s*([0-9.]+)', r'([0-9.]+)\s*公里', r'距离[：:]\s*([0-9.]+)']:
+        match = re.search(pattern, text)
+        if match:
+            result["driving_distance"] = float(match.group(1))
+            break
+    return result
+
+
+def load_corpus() -> List[str]:
+    """读取 example_data.txt 中以 ## 分隔的示例汇报"""
+    text = (Path(__file__).resolve().parent / "example_data.txt").read_text(encoding="utf-8")
+    reports = [part.split("\n", 1)[1] for part in text.split("\n## ")[1:]]
+    reports.append(RUN_TOGETHER_REPORT)
+    return reports
+
+
+def measure(func: Callable[[str], Dict], corpus: List[str], rounds: int) -> float:
+    """返回每秒处理的汇报条数"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for report in corpus:
+            func(report)
+    elapsed = time.perf_counter() - start
+    return rounds * len(corpus) / elapsed
+
+
+def best_of(funcs: List[Callable[[str], Dict]], corpus: List[str], rounds: int, repeats: int) -> List[float]:
+    """交替运行各实现 repeats 次，各取最快的一次，减小机器负载波动的影响"""
+    best = [0.0] * len(funcs)
+    for _ in range(repeats):
+        for i, func in enumerate(funcs):
+            best[i] = max(best[i], measure(func, corpus, rounds))
+    return best
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    corpus = load_corpus()
+
+    print(f"📊 语料: {len(corpus)} 条汇报 x {rounds} 轮，取 {repeats} 次中最快")
+    legacy, current = best_of([legacy_extract_with_rules, extract_with_rules], corpus, rounds, repeats)
+    print(f"旧实现 (逐模式 re.search): {legacy:,.0f} 条/秒")
+    print(f"extractor (单次扫描):      {current:,.0f} 条/秒")
+    # 单条汇报只有一两百字节，旧实现的 re.search 本身在 C 中完成，耗时主要是逐字段的
+    # Python 处理，单次扫描只带来小幅提升（参考机器上约 1.1x~1.2x）
+    print(f"比值: {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
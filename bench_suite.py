@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 端到端基准：解析、入库、汇总、导出在不同数据量下的吞吐与延迟，并与基线比较
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from export import export_csv
+from extractor import extract_with_rules
+import summary
+import trends
+from storage import close_connections, init_database, save_reports_batch
+from summary import get_collection_summary
+from synthetic import generate_reports
+from trends import get_collection_trends
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "bench_baseline.json"
+BATCH_SIZE = 1000
+
+# 指标 -> 是否越大越好；其余字段（如 rows）不参与回归比较
+METRICS = {
+    "parse_reports_per_sec": True,
+    "insert_rows_per_sec": True,
+    "summary_ms": False,
+    "summary_cached_ms": False,
+    "filtered_summary_ms": False,
+    "trends_ms": False,
+    "export_csv_seconds": False,
+}
+
+# 耗时指标的绝对噪声下限：变化量小于该值时不算回归。汇总命中物化表或缓存只需
+# 几十微秒，计时抖动就能超过 20%，单看比例会误报
+NOISE_FLOORS = {
+    "summary_ms": 1.0,
+    "summary_cached_ms": 1.0,
+    "filtered_summary_ms": 1.0,
+    "trends_ms": 1.0,
+    "export_csv_seconds": 0.1,
+}
+
+
+def _clear_result_caches():
+    summary._summary_cache.clear()
+    trends._trends_cache.clear()
+
+
+def _median_ms(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> float:
+    """func 的耗时中位数；setup 在每次计时前调用，不计入耗时"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run_size(rows: int, seed: int, work_dir: Path) -> Dict:
+    """在临时数据库上跑一轮：流式生成并解析、分批入库，再测汇总与导出"""
+    db_path = str(work_dir / f"bench_{rows}.db")
+    init_database(db_path)
+
+    parse_seconds = 0.0
+    insert_seconds = 0.0
+    reports = generate_reports(rows, seed)
+    while True:
+        chunk = list(islice(reports, BATCH_SIZE))
+        if not chunk:
+            break
+        start = time.perf_counter()
+        items = [(extract_with_rules(text), text) for text in chunk]
+        parse_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_reports_batch(items, db_path)
+        insert_seconds += time.perf_counter() - start
+
+    # 汇总与趋势按数据版本缓存：每次计时前清空缓存，测的是 SQL 本身；命中缓存的耗时单独报告
+    summary_ms = _median_ms(lambda: get_collection_summary(db_path), 20, _clear_result_caches)
+    summary_cached_ms = _median_ms(lambda: get_collection_summary(db_path), 20)
+    filtered_summary_ms = _median_ms(
+        lambda: get_collection_summary(db_path, start_date="2025-03-01", end_date="2025-03-31"), 15,
+        _clear_result_caches)
+    trends_ms = _median_ms(lambda: get_collection_trends(db_path, "week", dimension="driver"), 15,
+                           _clear_result_caches)
+
+    start = time.perf_counter()
+    export_csv(str(work_dir / f"bench_{rows}.csv"), db_path=db_path)
+    export_seconds = time.perf_counter() - start
+
+    close_connections()
+    return {
+        "rows": rows,
+        "parse_reports_per_sec": rows / parse_seconds,
+        "insert_rows_per_sec": rows / insert_seconds,
+        "summary_ms": summary_ms,
+        "summary_cached_ms": summary_cached_ms,
+        "filtered_summary_ms": filtered_summary_ms,
+        "trends_ms": trends_ms,
+        "export_csv_seconds": export_seconds,
+    }
+
+
+def best_metrics(runs: List[Dict]) -> Dict:
+    """多轮结果逐项取最好的一轮：吞吐取最大、耗时取最小，减小机器负载波动的影响"""
+    best = dict(runs[0])
+    for name, higher_is_better in METRICS.items():
+        values = [run[name] for run in runs]
+        best[name] = max(values) if higher_is_better else min(values)
+    return best
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """返回超出阈值的回归说明；只比较双方都有的数据量与指标，变化量低于 NOISE_FLOORS 的忽略"""
+    regressions = []
+    for size, metrics in results.items():
+        base = baseline.get(size)
+        if not base:
+            continue
+        for name, higher_is_better in METRICS.items():
+            if name not in metrics or not base.get(name):
+                continue
+            if abs(metrics[name] - base[name]) < NOISE_FLOORS.get(name, 0):
+                continue
+            change = metrics[name] / base[name] - 1
+            if (change < -threshold) if higher_is_better else (change > threshold):
+                regressions.append(f"{size} 行 {name}: {base[name]:,.2f} -> {metrics[name]:,.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析/入库/汇总/导出基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="数据量（行）")
+    parser.add_argument("--seed", type=int, default=0, help="合成汇报的随机种子")
+    parser.add_argument("--runs", type=int, default=3, help="每个数据量运行的轮数，各指标取最好的一轮，默认 3")
+    parser.add_argument("--output", default="bench_results.json", help="结果 JSON 文件")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线 JSON 文件")
+    # 各取最好一轮后，同一台机器不改代码重复运行的差异在 15% 以内
+    parser.add_argument("--threshold", type=float, default=0.3, help="允许的退化比例，默认 0.3")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--check", action="store_true", help="回归检查：基线缺失时同样以非零状态退出")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.sizes:
+            print(f"📊 {rows:,} 行 x {args.runs} 轮...", flush=True)
+            runs = []
+            for run in range(args.runs):
+                # 每轮使用新的数据库
+                run_dir = Path(work_dir) / f"{rows}_{run}"
+                run_dir.mkdir()
+                runs.append(run_size(rows, args.seed, run_dir))
+            metrics = best_metrics(runs)
+            results[str(rows)] = metrics
+            print(f"   解析 {metrics['parse_reports_per_sec']:,.0f} 条/秒，"
+                  f"入库 {metrics['insert_rows_per_sec']:,.0f} 行/秒，"
+                  f"汇总 {metrics['summary_ms']:.2f} ms（缓存命中 {metrics['summary_cached_ms']:.3f} ms），"
+                  f"筛选汇总 {metrics['filtered_summary_ms']:.2f} ms，"
+                  f"趋势 {metrics['trends_ms']:.2f} ms，"
+                  f"导出 {metrics['export_csv_seconds']:.2f} 秒")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "runs": args.runs,
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"📤 结果已写入: {args.output}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📌 基线已保存: {args.baseline}")
+        return
+
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        if args.check:
+            print(f"❌ 未找到基线: {baseline_path}（用 --save-baseline 生成）")
+            sys.exit(1)
+        print("⚠️  未找到基线，跳过回归比较（用 --save-baseline 生成）")
+        return
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    if args.check and not set(results) & set(baseline):
+        print(f"❌ 基线中没有这些数据量的结果: {', '.join(results)}（基线: {', '.join(baseline)}）")
+        sys.exit(1)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ 性能回归超过 {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print("✅ 与基线相比无回归")
+
+
+if __name__ == "__main__":
+    main()
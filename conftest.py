@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# 测试共用的夹具
+import sys
+from pathlib import Path
+from typing import Callable, Iterable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+from storage import init_database, save_reports_batch
+
+
+@pytest.fixture
+def make_db(tmp_path: Path) -> Callable[..., str]:
+    """返回 make(reports=())：在 tmp_path 下建库，按规则提取并写入 reports，返回数据库路径"""
+    def make(reports: Iterable[str] = ()) -> str:
+        db_path = str(tmp_path / "driver_data.db")
+        init_database(db_path)
+        save_reports_batch([(extract_with_rules(text), text) for text in reports], db_path)
+        return db_path
+
+    return make
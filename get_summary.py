@@ -1,34 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import sqlite3
-import pandas as pd
-from datetime import datetime
+import sys
+from pathlib import Path
 
-def get_collection_summary():
-    try:
-        conn = sqlite3.connect('driver_data.db')
-        df = pd.read_sql_query('SELECT * FROM driver_reports', conn)
-        conn.close()
-        
-        if df.empty:
-            return {'message': '暂无数据'}
-        
-        summary = {
-            'total_reports': len(df),
-            'total_drivers': df['driver_name'].nunique(),
-            'total_segments': int(df['collection_segments'].sum()) if df['collection_segments'].notna().any() else 0,
-            'total_distance': float(df['driving_distance'].sum()) if df['driving_distance'].notna().any() else 0,
-            'locations': df['collection_location'].value_counts().to_dict(),
-            'time_periods': df['collection_time_period'].value_counts().to_dict(),
-            'latest_update': df['created_at'].max() if 'created_at' in df.columns else 'N/A'
-        }
-        
-        return summary
-    except Exception as e:
-        return {'error': str(e)}
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from storage import init_database
+from summary import get_collection_summary
 
 def main():
+    init_database()
     summary = get_collection_summary()
     print('采集数据总览:')
     print('='*50)
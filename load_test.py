@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# /rpc 接口压测：N 个并发模拟客户端按比例调用解析、汇总、导出，统计吞吐、延迟分位与错误率
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from synthetic import generate_reports
+
+# 操作 -> (方法, 路径)
+OPERATIONS = {
+    "parse": ("POST", "/rpc/parse_driver_report"),
+    "summary": ("GET", "/rpc/get_collection_summary"),
+    "export": ("GET", "/rpc/export_data_csv?format=csv"),
+}
+DEFAULT_MIX = "parse=80,summary=18,export=2"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """把 "parse=80,summary=18,export=2" 解析为操作权重"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"未知的操作: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> Optional[float]:
+    """最近秩分位数，输入需已排序"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """读完一个 HTTP/1.1 响应，返回 (状态码, 连接是否可复用)"""
+    status_line = await reader.readuntil(b"\r\n")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+
+    keep_alive = headers.get("connection") != "close"
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        keep_alive = False
+    return status, keep_alive
+
+
+class Client:
+    """一个保持长连接的模拟客户端"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nConnection: keep-alive\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode("latin-1") + b"\r\n" + (body or b""))
+        try:
+            await self.writer.drain()
+            status, keep_alive = await asyncio.wait_for(_read_response(self.reader), self.timeout)
+        except BaseException:
+            await self.close()
+            raise
+        if not keep_alive:
+            await self.close()
+        return status
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = self.reader = None
+
+
+async def _client_loop(client: Client, operations: List[str], weights: List[float], rng: random.Random,
+                       reports, deadline: float, samples: Dict[str, List], errors: Dict[str, int]):
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        method, path = OPERATIONS[operation]
+        body = json.dumps({"report_text": next(reports)}).encode("utf-8") if operation == "parse" else None
+        start = time.perf_counter()
+        try:
+            status = await client.request(method, path, body)
+            ok = 200 <= status < 300
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        samples[operation].append(elapsed)
+        if not ok:
+            errors[operation] += 1
+    await client.close()
+
+
+def _stats(latencies: List[float], errors: int, seconds: float) -> Dict:
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "error_rate": round(errors / len(ordered), 4) if ordered else 0.0,
+        "throughput": round(len(ordered) / seconds, 1),
+        "p50_ms": to_ms(percentile(ordered, 0.50)),
+        "p95_ms": to_ms(percentile(ordered, 0.95)),
+        "p99_ms": to_ms(percentile(ordered, 0.99)),
+    }
+
+
+async def run_stage(url: str, clients: int, duration: float, mix: Dict[str, float],
+                    seed: int = 0, timeout: float = 30.0) -> Dict:
+    """以 clients 个并发客户端压测 duration 秒，返回总体与各操作的统计"""
+    parts = urlsplit(url)
+    operations = list(mix)
+    weights = [mix[name] for name in operations]
+    samples = {name: [] for name in operations}
+    errors = {name: 0 for name in operations}
+    # 每个阶段使用不同种子，解析请求不会因去重而只做哈希查找
+    reports = generate_reports(10 ** 9, seed=seed * 1000 + clients)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _client_loop(Client(parts.hostname, parts.port or 80, timeout), operations, weights,
+                     random.Random(seed * 1000 + i), reports, deadline, samples, errors)
+        for i in range(clients)
+    ))
+    seconds = time.perf_counter() - start
+
+    result = _stats([value for values in samples.values() for value in values], sum(errors.values()), seconds)
+    result["clients"] = clients
+    result["operations"] = {name: _stats(samples[name], errors[name], seconds) for name in operations}
+    return result
+
+
+def _print_stage(stage: Dict):
+    def fmt(value):
+        return "-" if value is None else f"{value:.1f}"
+    print(f"👥 {stage['clients']:>4} 客户端: {stage['throughput']:>8.1f} 请求/秒  "
+          f"p50 {fmt(stage['p50_ms'])} ms  p95 {fmt(stage['p95_ms'])} ms  p99 {fmt(stage['p99_ms'])} ms  "
+          f"错误率 {stage['error_rate']:.2%}")
+    for name, stats in stage["operations"].items():
+        print(f"   {name:<8} {stats['requests']:>7} 次  p50 {fmt(stats['p50_ms'])} ms  "
+              f"p99 {fmt(stats['p99_ms'])} ms  错误 {stats['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/rpc 接口并发压测")
+    parser.add_argument("--url", default="http://localhost:8080", help="服务器地址")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10],
+                        help="并发客户端数；给出多个值时依次逐级加压")
+    parser.add_argument("--duration", type=float, default=30.0, help="每级持续秒数")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"操作比例，默认 {DEFAULT_MIX}")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单个请求超时（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    print(f"🚀 压测 {args.url}，操作比例 {args.mix}，每级 {args.duration:g} 秒")
+    stages = []
+    for clients in args.clients:
+        stage = asyncio.run(run_stage(args.url, clients, args.duration, mix, args.seed, args.timeout))
+        stages.append(stage)
+        _print_stage(stage)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"url": args.url, "mix": mix, "stages": stages},
+                                                ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📤 结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,6 @@ try:
     print(f"✅ 数据库连接成功，表: {tables}")
     conn.close()
     
-    import pandas as pd
-    print("✅ Pandas 导入成功")
-    
     import json
     print("✅ JSON 导入成功")
     
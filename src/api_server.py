@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP RPC 服务
+
+供聊天平台等 HTTP 客户端调用的 /rpc 接口（见 driver-data-skill.yaml），与 MCP 工具
+共用解析、存储、汇总与导出代码。基于 asyncio 的 HTTP/1.1 实现，只依赖标准库：
+
+- 连接默认保持（keep-alive），空闲超过 HTTP_KEEPALIVE_TIMEOUT 秒后关闭，
+  聊天平台逐条消息调用时省去每次建立连接的开销；
+- 客户端接受 gzip 且响应体不小于 HTTP_GZIP_MIN_BYTES 时压缩；
+- CSV 导出以 chunked 编码流式发送，边查询边输出，不生成临时文件；
+- 汇总带强 ETag，If-None-Match 命中时返回 304；
+- 阻塞调用经 offload 在线程池中执行，各类接口的并发限额与 MCP 工具相同；
+- /metrics 以 Prometheus 文本格式输出 metrics 模块记录的运行指标。
+
+参数可放在查询串或 JSON 请求体中，同名时请求体优先。接口参数校验失败返回 400，
+工具执行出错返回 500，响应体均为 {"error": ...}。
+
+启动: python src/api_server.py [--host 0.0.0.0] [--port 8080]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import zlib
+from http import HTTPStatus
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from cache import etag_matches
+from config import (HTTP_GZIP_MIN_BYTES, HTTP_HOST, HTTP_KEEPALIVE_TIMEOUT, HTTP_MAX_BATCH_SIZE,
+                    HTTP_MAX_BODY_BYTES, HTTP_PORT)
+from export import export_csv, iter_csv_chunks
+from ingest import parse_and_save, parse_reports_batch
+from metrics import PROMETHEUS_TYPE, record_tool, render_prometheus, server_stats
+from offload import iterate_blocking, run_blocking
+from query import DEFAULT_PAGE_SIZE, query_reports
+from search import search_reports
+from storage import DB_PATH, DUPLICATE_POLICIES, init_database
+from summary import get_collection_summary_with_etag
+from trends import get_collection_trends
+
+# 请求行与请求头的总长度上限
+MAX_HEADER_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+# wbits 31：带 gzip 头尾的 deflate 流
+GZIP_WBITS = 31
+
+JSON_TYPE = "application/json; charset=utf-8"
+CSV_TYPE = "text/csv; charset=utf-8"
+
+FILTER_PARAMS = ("start_date", "end_date", "driver_name", "vehicle_number", "collection_location")
+
+
+class HTTPError(Exception):
+    """以 status 状态码返回 {"error": message}"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = dict(parse_qsl(parts.query))
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.1":
+            return "close" not in connection
+        return "keep-alive" in connection
+
+    @property
+    def accepts_gzip(self) -> bool:
+        return "gzip" in self.headers.get("accept-encoding", "").lower()
+
+    def params(self) -> Dict:
+        """查询参数与 JSON 请求体合并，请求体中的同名参数优先"""
+        params = dict(self.query)
+        if self.body:
+            try:
+                data = json.loads(self.body)
+            except ValueError:
+                raise HTTPError(400, "请求体不是合法的 JSON")
+            if not isinstance(data, dict):
+                raise HTTPError(400, "请求体须为 JSON 对象")
+            params.update(data)
+        return params
+
+
+class Response:
+    """
+    payload 编码为 JSON 响应体，否则发送 body 原样；stream 为异步产出的字节块，
+    以 chunked 编码发送
+    """
+
+    def __init__(self, status: int = 200, payload=None, headers: Optional[Dict[str, str]] = None,
+                 stream: Optional[AsyncIterator[bytes]] = None, content_type: str = JSON_TYPE,
+                 body: bytes = b""):
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else body
+        self.headers = dict(headers or {})
+        self.stream = stream
+        self.content_type = content_type
+
+
+def _error(status: int, message: str) -> Response:
+    return Response(status, {"error": message})
+
+
+def _result(result) -> Response:
+    """工具返回 {"error": ...} 时视为执行失败"""
+    status = 500 if isinstance(result, dict) and "error" in result else 200
+    return Response(status, result)
+
+
+def _filters(params: Dict) -> Dict:
+    return {name: params.get(name) or None for name in FILTER_PARAMS}
+
+
+def _on_duplicate(params: Dict) -> str:
+    on_duplicate = params.get("on_duplicate") or "skip"
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise HTTPError(400, f"on_duplicate 须为 {'/'.join(DUPLICATE_POLICIES)}")
+    return on_duplicate
+
+
+def _columns(params: Dict) -> Optional[List[str]]:
+    """导出列：JSON 数组，或查询串中逗号分隔的列名"""
+    columns = params.get("columns")
+    if isinstance(columns, str):
+        columns = [column.strip() for column in columns.split(",") if column.strip()]
+    return columns or None
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _prepend(first: bytes, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await stream.aclose()
+
+
+class RPCServer:
+    """一个数据库上的 /rpc 接口；handle_connection 用作 asyncio.start_server 的回调"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        # 路径 -> (允许的方法, 处理函数)
+        self.routes = {
+            "/": (("GET",), self.index),
+            "/health": (("GET",), self.health),
+            "/metrics": (("GET",), self.metrics),
+            "/rpc/parse_driver_report": (("POST",), self.parse_driver_report),
+            "/rpc/parse_driver_reports_batch": (("POST",), self.parse_driver_reports_batch),
+            "/rpc/get_collection_summary": (("GET", "POST"), self.get_collection_summary),
+            "/rpc/get_collection_trends": (("GET", "POST"), self.get_collection_trends),
+            "/rpc/search_reports": (("GET", "POST"), self.search_reports),
+            "/rpc/query_reports": (("GET", "POST"), self.query_reports),
+            "/rpc/export_data_csv": (("GET", "POST"), self.export_data_csv),
+            "/rpc/get_server_stats": (("GET", "POST"), self.get_server_stats),
+        }
+
+    async def index(self, request: Request) -> Response:
+        return Response(payload={"name": "driver-data-server", "endpoints": list(self.routes)})
+
+    async def health(self, request: Request) -> Response:
+        return Response(payload={"status": "ok"})
+
+    async def metrics(self, request: Request) -> Response:
+        return Response(body=render_prometheus().encode("utf-8"), content_type=PROMETHEUS_TYPE)
+
+    async def get_server_stats(self, request: Request) -> Response:
+        return Response(payload=server_stats())
+
+    async def parse_driver_report(self, request: Request) -> Response:
+        params = request.params()
+        report_text = params.get("report_text")
+        if not isinstance(report_text, str) or not report_text.strip():
+            raise HTTPError(400, "缺少 report_text")
+        result = await run_blocking("parse", parse_and_save, report_text, self.db_path, _on_duplicate(params))
+        return Response(payload=result)
+
+    async def parse_driver_reports_batch(self, request: Request) -> Response:
+        params = request.params()
+        report_texts = params.get("report_texts")
+        if not isinstance(report_texts, list):
+            raise HTTPError(400, "report_texts 须为字符串数组")
+        if len(report_texts) > HTTP_MAX_BATCH_SIZE:
+            raise HTTPError(413, f"单次最多 {HTTP_MAX_BATCH_SIZE} 条汇报")
+        result = await run_blocking("parse", parse_reports_batch, report_texts, self.db_path,
+                                    on_duplicate=_on_duplicate(params))
+        return _result(result)
+
+    async def get_collection_summary(self, request: Request) -> Response:
+        summary, etag = await run_blocking("summary", get_collection_summary_with_etag, self.db_path,
+                                           **_filters(request.params()))
+        if etag is None:
+            return _result(summary)
+        # no-cache：客户端可以缓存，但每次都要带 If-None-Match 重新验证
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(304, headers=headers)
+        return Response(payload=summary, headers=headers)
+
+    async def get_collection_trends(self, request: Request) -> Response:
+        params = request.params()
+        result = await run_blocking("summary", get_collection_trends, self.db_path,
+                                    params.get("granularity") or "day", params.get("dimension") or None,
+                                    **_filters(params))
+        return _result(result)
+
+    async def search_reports(self, request: Request) -> Response:
+        params = request.params()
+        result = await run_blocking("summary", search_reports, params.get("query") or "",
+                                    params.get("page", 1), params.get("page_size", 20), self.db_path)
+        return _result(result)
+
+    async def query_reports(self, request: Request) -> Response:
+        params = request.params()
+        include_raw_text = params.get("include_raw_text", False)
+        if isinstance(include_raw_text, str):
+            include_raw_text = include_raw_text.lower() in ("1", "true", "yes")
+        result = await run_blocking("summary", query_reports, self.db_path,
+                                    params.get("driver_name") or None, params.get("vehicle_number") or None,
+                                    params.get("collection_location") or None,
+                                    params.get("collection_time_period") or None,
+                                    params.get("start_date") or None, params.get("end_date") or None,
+                                    params.get("cursor") or None, params.get("page_size", DEFAULT_PAGE_SIZE),
+                                    bool(include_raw_text))
+        return _result(result)
+
+    async def export_data_csv(self, request: Request) -> Response:
+        """
+        默认与 MCP 工具一样在服务器上写文件，返回 {"export_message", "filename", "rows"}；
+        format=csv 时以 chunked 流式返回 CSV 本身
+        """
+        params = request.params()
+        columns = _columns(params)
+        filters = _filters(params)
+        output = params.get("format") or "json"
+        if output == "json":
+            result = await run_blocking("export", export_csv, columns=columns, db_path=self.db_path, **filters)
+            message = f"数据已导出到文件: {result['filename']}（{result['rows']} 条）"
+            return Response(payload={"export_message": message, **result})
+        if output != "csv":
+            raise HTTPError(400, "format 须为 csv 或 json")
+
+        stream = iterate_blocking("export", iter_csv_chunks(columns, db_path=self.db_path, **filters))
+        # 先取第一块（表头）：列名错误等在发送响应头之前就能以 400 返回
+        first = await stream.__anext__()
+        headers = {"Content-Disposition": 'attachment; filename="driver_reports.csv"'}
+        return Response(headers=headers, stream=_prepend(first, stream), content_type=CSV_TYPE)
+
+    async def dispatch(self, request: Request) -> Response:
+        route = self.routes.get(request.path)
+        if route is None:
+            return _error(404, f"未知的接口: {request.path}")
+        methods, handler = route
+        if request.method not in methods:
+            response = _error(405, f"{request.path} 不支持 {request.method}")
+            response.headers["Allow"] = ", ".join(methods)
+            return response
+        # 只统计已知接口，未知路径不会产生新的指标标签；流式导出计到响应头就绪为止
+        start = time.perf_counter()
+        response = await self._call(handler, request)
+        record_tool(handler.__name__, "http", time.perf_counter() - start, response.status < 400)
+        return response
+
+    @staticmethod
+    async def _call(handler, request: Request) -> Response:
+        try:
+            return await handler(request)
+        except HTTPError as e:
+            return _error(e.status, str(e))
+        except ValueError as e:
+            return _error(400, str(e))
+        except Exception as e:
+            return _error(500, str(e))
+
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> Optional[Request]:
+        """读取一个请求；客户端在请求之间关闭连接时返回 None"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise HTTPError(400, "请求不完整")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "请求头过大")
+
+        lines = head.decode("latin-1").lstrip("\r\n").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400, "请求行格式错误")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise HTTPError(411, "请求体须带 Content-Length")
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length 格式错误")
+        if length > HTTP_MAX_BODY_BYTES:
+            raise HTTPError(413, "请求体过大")
+        if length and headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method, target, version, headers, body)
+
+    async def _send(self, writer: asyncio.StreamWriter, request: Optional[Request], response: Response,
+                    keep_alive: bool) -> bool:
+        """发送响应，返回发送后连接是否可以继续使用"""
+        headers = dict(response.headers)
+        if response.status == 304:
+            headers["Connection"] = "keep-alive" if keep_alive else "close"
+            writer.write(_head(304, headers))
+            await writer.drain()
+            return keep_alive
+
+        headers["Content-Type"] = response.content_type
+        gzip = request is not None and request.accepts_gzip
+        if response.stream is not None:
+            return await self._send_stream(writer, request, response, headers, gzip, keep_alive)
+
+        body = response.body
+        if len(body) >= HTTP_GZIP_MIN_BYTES:
+            headers["Vary"] = "Accept-Encoding"
+            if gzip:
+                compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+                body = compressor.compress(body) + compressor.flush()
+                headers["Content-Encoding"] = "gzip"
+        headers["Content-Length"] = str(len(body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        writer.write(_head(response.status, headers) + body)
+        await writer.drain()
+        return keep_alive
+
+    async def _send_stream(self, writer: asyncio.StreamWriter, request: Request, response: Response,
+                           headers: Dict[str, str], gzip: bool, keep_alive: bool) -> bool:
+        # HTTP/1.0 不支持 chunked，以关闭连接表示响应结束
+        chunked = request.version == "HTTP/1.1"
+        keep_alive = keep_alive and chunked
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS) if gzip else None
+        headers["Vary"] = "Accept-Encoding"
+        if compressor is not None:
+            headers["Content-Encoding"] = "gzip"
+        if chunked:
+            headers["Transfer-Encoding"] = "chunked"
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+        def frame(data: bytes) -> bytes:
+            return b"%x\r\n%s\r\n" % (len(data), data) if chunked else data
+
+        writer.write(_head(response.status, headers))
+        try:
+            async for chunk in response.stream:
+                if compressor is not None:
+                    # 每块同步刷新，客户端收到即可解压，不必等整个响应
+                    chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                if chunk:
+                    writer.write(frame(chunk))
+                    await writer.drain()
+        finally:
+            await response.stream.aclose()
+        tail = compressor.flush() if compressor is not None else b""
+        if tail:
+            writer.write(frame(tail))
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return keep_alive
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """依次处理一个连接上的请求，直到客户端关闭、要求关闭或空闲超时"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader, writer), HTTP_KEEPALIVE_TIMEOUT)
+                except HTTPError as e:
+                    await self._send(writer, None, _error(e.status, str(e)), keep_alive=False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                response = await self.dispatch(request)
+                if not await self._send(writer, request, response, request.keep_alive):
+                    break
+        except Exception:
+            # 连接中断或流式响应中途出错：响应头已发出，只能关闭连接
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+
+async def start_server(host: str = HTTP_HOST, port: int = HTTP_PORT,
+                       db_path: str = DB_PATH) -> asyncio.AbstractServer:
+    """开始监听并返回 asyncio 服务器；port 为 0 时由系统分配端口"""
+    server = RPCServer(db_path)
+    return await asyncio.start_server(server.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+async def serve(host: str = HTTP_HOST, port: int = HTTP_PORT, db_path: str = DB_PATH):
+    server = await start_server(host, port, db_path)
+    address = server.sockets[0].getsockname()
+    print(f"🚀 HTTP RPC 服务已启动: http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="智驾数据采集 HTTP RPC 服务")
+    parser.add_argument("--host", default=HTTP_HOST, help=f"监听地址（默认 {HTTP_HOST}）")
+    parser.add_argument("--port", type=int, default=HTTP_PORT, help=f"监听端口（默认 {HTTP_PORT}）")
+    parser.add_argument("--db", default=DB_PATH, help="数据库文件")
+    args = parser.parse_args()
+
+    init_database(args.db)
+    try:
+        asyncio.run(serve(args.host, args.port, args.db))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按月归档
+
+把采集日期（无法识别时用入库时间）早于指定天数的汇报按月移入归档目录下的
+YYYY-MM.db，热库只保留近期数据，日常入库、汇总和 VACUUM/备份都只涉及小表。
+
+物化汇总与趋势分桶保留已归档的数据，不需要读取归档库。带筛选条件的汇总和
+导出通过 report_tables 以只读方式附加月份与日期范围有交集的归档库，与热库
+UNION ALL 后一起查询；没有日期范围时每个归档都可能有匹配的行，全部附加。
+全文检索与重复提交判断只覆盖热库。
+
+归档库与热库一样把压缩后的原文放在 report_texts，并带有所用的压缩字典与
+driver_reports_with_text 视图。结构只在 archive_reports 写入归档时建立；
+早期直接存放 raw_text 列的归档库也在下次运行 archive_reports 时转换。
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_DIR, PROJECT_ROOT
+from storage import DB_PATH, REPORT_COLUMNS, get_connection, sync_search_index
+from textstore import SEED_DICTIONARY_ID
+
+# 归档分区所依据的日期
+ARCHIVE_KEY = "COALESCE(date(collection_date), date(created_at))"
+
+ARCHIVE_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS {schema}.driver_reports (
+           id INTEGER PRIMARY KEY,
+           driver_name TEXT,
+           vehicle_number TEXT,
+           collection_task TEXT,
+           collection_segments INTEGER,
+           collection_location TEXT,
+           collection_date TEXT,
+           collection_time_period TEXT,
+           driving_distance REAL,
+           created_at TIMESTAMP,
+           content_hash TEXT,
+           submit_count INTEGER NOT NULL DEFAULT 1
+       )''',
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_driver_reports_driver ON driver_reports (driver_name)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_driver_reports_vehicle ON driver_reports (vehicle_number)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_driver_reports_location ON driver_reports (collection_location)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_driver_reports_date_driver ON driver_reports (collection_date, driver_name)",
+    '''CREATE TABLE IF NOT EXISTS {schema}.text_dictionaries (
+           id INTEGER PRIMARY KEY,
+           data BLOB NOT NULL,
+           created_at TIMESTAMP
+       )''',
+    '''CREATE TABLE IF NOT EXISTS {schema}.report_texts (
+           id INTEGER PRIMARY KEY,
+           dictionary_id INTEGER NOT NULL,
+           data BLOB
+       )''',
+    # 视图中未限定的表名解析到视图所在的归档库
+    '''CREATE VIEW IF NOT EXISTS {schema}.driver_reports_with_text AS
+       SELECT d.*, decompress_text(t.dictionary_id, t.data) AS raw_text
+       FROM driver_reports d LEFT JOIN report_texts t ON t.id = d.id''',
+    # 字典只增不改，归档库保存一份，脱离热库也能解压
+    "INSERT OR IGNORE INTO {schema}.text_dictionaries SELECT * FROM main.text_dictionaries",
+)
+
+
+def _prepare_schema(conn: sqlite3.Connection, schema: str):
+    """建立归档库结构；早期的归档库把 raw_text 压缩移入 report_texts。需在事务中调用"""
+    legacy = "raw_text" in [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(driver_reports)")]
+    if legacy:
+        conn.execute(f"ALTER TABLE {schema}.driver_reports RENAME COLUMN raw_text TO legacy_raw_text")
+    for statement in ARCHIVE_SCHEMA:
+        conn.execute(statement.format(schema=schema))
+    if legacy:
+        conn.execute(f'''
+            INSERT OR REPLACE INTO {schema}.report_texts (id, dictionary_id, data)
+            SELECT id, {SEED_DICTIONARY_ID}, compress_text({SEED_DICTIONARY_ID}, legacy_raw_text)
+            FROM {schema}.driver_reports
+        ''')
+        conn.execute(f"ALTER TABLE {schema}.driver_reports DROP COLUMN legacy_raw_text")
+
+
+def archive_dir(db_path: str = DB_PATH) -> Path:
+    """归档目录：配置了 DRIVER_DATA_ARCHIVE_DIR 时使用该目录，否则为数据库旁的 <数据库名>_archive"""
+    if ARCHIVE_DIR:
+        return PROJECT_ROOT / ARCHIVE_DIR
+    path = Path(db_path)
+    return path.with_name(f"{path.stem}_archive")
+
+
+def list_archives(db_path: str = DB_PATH, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None) -> List[Tuple[str, str]]:
+    """按月份顺序返回与日期范围有交集的归档 [(YYYY-MM, 文件路径)]"""
+    directory = archive_dir(db_path)
+    if not directory.is_dir():
+        return []
+    archives = []
+    for path in sorted(directory.glob("????-??.db")):
+        month = path.stem
+        if start_date and month < start_date[:7]:
+            continue
+        if end_date and month > end_date[:7]:
+            continue
+        archives.append((month, str(path)))
+    return archives
+
+
+def _union(tables: List[str], columns: Tuple[str, ...]) -> str:
+    if len(tables) == 1:
+        return tables[0]
+    columns = ", ".join(columns)
+    return "(" + " UNION ALL ".join(f"SELECT {columns} FROM {table}" for table in tables) + ")"
+
+
+def report_tables(conn: sqlite3.Connection, db_path: str = DB_PATH, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None, with_text: bool = False,
+                  include_hot: bool = True) -> Iterator[str]:
+    """
+    依次产出覆盖热库与日期范围内归档的表表达式，可直接放在 FROM 之后
+
+    没有相关归档时只产出 "driver_reports"。每个表达式最多附加 SQLite 允许的
+    ATTACH 个数的归档，迭代到下一个表达式前会 DETACH 上一组，调用方对每个
+    表达式分别查询并合并结果。with_text=True 时改用带 raw_text 列的
+    driver_reports_with_text，读取该列时才解压。include_hot=False 时只产出归档，
+    没有归档则不产出。归档库以 mode=ro 附加，查询不会写入归档。
+    conn 须由 storage.connect 创建，且不能处于事务中。
+    """
+    table = "driver_reports_with_text" if with_text else "driver_reports"
+    columns = REPORT_COLUMNS + ("raw_text",) if with_text else REPORT_COLUMNS
+    archives = [path for _, path in list_archives(db_path, start_date, end_date)]
+    if not archives:
+        if include_hot:
+            yield table
+        return
+
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    groups = [archives[i:i + limit] for i in range(0, len(archives), limit)]
+    for index, group in enumerate(groups):
+        names = []
+        try:
+            for path in group:
+                name = f"archive_{len(names)}"
+                conn.execute(f"ATTACH DATABASE ? AS {name}", (f"{Path(path).resolve().as_uri()}?mode=ro",))
+                names.append(name)
+            tables = [f"{name}.{table}" for name in names]
+            yield _union([f"main.{table}"] + tables if index == 0 and include_hot else tables, columns)
+        finally:
+            for name in names:
+                conn.execute(f"DETACH DATABASE {name}")
+
+
+def upgrade_archives(conn: sqlite3.Connection, db_path: str = DB_PATH) -> List[str]:
+    """把早期直接存放 raw_text 列的归档库转换为压缩原文结构，返回转换的月份"""
+    upgraded = []
+    for month, path in list_archives(db_path):
+        with closing(sqlite3.connect(path)) as archive:
+            columns = [row[1] for row in archive.execute("PRAGMA table_info(driver_reports)")]
+        if "raw_text" not in columns:
+            continue
+        conn.execute("ATTACH DATABASE ? AS archive", (path,))
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                _prepare_schema(conn, "archive")
+        finally:
+            conn.execute("DETACH DATABASE archive")
+        upgraded.append(month)
+    return upgraded
+
+
+def archive_reports(older_than_days: int = ARCHIVE_AFTER_DAYS, db_path: str = DB_PATH,
+                    today: Optional[date] = None) -> Dict:
+    """
+    把早于 older_than_days 天的汇报按月移入归档库，返回 {"archived", "months": {YYYY-MM: 条数}}
+
+    每个月在一个事务内先写归档（结构化列与压缩原文原样复制，不解压）再从热库删除；
+    归档按 id 覆盖写入，中途失败后重新执行不会产生重复行。
+    """
+    cutoff = ((today or date.today()) - timedelta(days=older_than_days)).isoformat()
+    conn = get_connection(db_path)
+    upgrade_archives(conn, db_path)
+    months = [row[0] for row in conn.execute(f'''
+        SELECT DISTINCT strftime('%Y-%m', {ARCHIVE_KEY}) FROM driver_reports
+        WHERE {ARCHIVE_KEY} < ? ORDER BY 1
+    ''', (cutoff,))]
+
+    directory = archive_dir(db_path)
+    os.makedirs(directory, exist_ok=True)
+    columns = ", ".join(REPORT_COLUMNS)
+    condition = f"strftime('%Y-%m', {ARCHIVE_KEY}) = ? AND {ARCHIVE_KEY} < ?"
+    archived = {}
+    for month in months:
+        conn.execute("ATTACH DATABASE ? AS archive", (str(directory / f"{month}.db"),))
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                _prepare_schema(conn, "archive")
+                conn.execute(f'''
+                    INSERT OR REPLACE INTO archive.driver_reports ({columns})
+                    SELECT {columns} FROM main.driver_reports WHERE {condition}
+                ''', (month, cutoff))
+                conn.execute(f'''
+                    INSERT OR REPLACE INTO archive.report_texts (id, dictionary_id, data)
+                    SELECT t.id, t.dictionary_id, t.data
+                    FROM main.report_texts t JOIN main.driver_reports d ON d.id = t.id
+                    WHERE {condition}
+                ''', (month, cutoff))
+                conn.execute("UPDATE archive_state SET active = 1 WHERE id = 1")
+                archived[month] = conn.execute(
+                    f"DELETE FROM main.driver_reports WHERE {condition}", (month, cutoff)).rowcount
+                conn.execute("UPDATE archive_state SET active = 0 WHERE id = 1")
+                sync_search_index(conn)
+        finally:
+            conn.execute("DETACH DATABASE archive")
+    return {"archived": sum(archived.values()), "months": archived}
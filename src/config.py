@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行配置
+
+默认值可用环境变量覆盖。数据库路径相对于项目根目录解析，
+不依赖启动时的当前目录。
+"""
+
+import os
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 数据库文件；DRIVER_DATA_DB 为相对路径时相对于项目根目录
+DB_PATH = str(PROJECT_ROOT / os.environ.get("DRIVER_DATA_DB", "driver_data.db"))
+
+# 归档：采集日期早于 ARCHIVE_AFTER_DAYS 天的汇报按月移入归档目录下的 YYYY-MM.db；
+# DRIVER_DATA_ARCHIVE_DIR 为空时使用数据库旁的 <数据库名>_archive 目录
+ARCHIVE_DIR = os.environ.get("DRIVER_DATA_ARCHIVE_DIR", "")
+ARCHIVE_AFTER_DAYS = int(os.environ.get("DRIVER_DATA_ARCHIVE_AFTER_DAYS", "180"))
+
+# 写锁被占用时的等待时间（毫秒），超时才报 "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("DRIVER_DATA_BUSY_TIMEOUT_MS", "5000"))
+# 页缓存大小（KiB），对应 PRAGMA cache_size 的负值写法
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("DRIVER_DATA_CACHE_SIZE_KB", "20000"))
+# 内存映射读取的上限（字节），0 表示关闭
+SQLITE_MMAP_SIZE = int(os.environ.get("DRIVER_DATA_MMAP_SIZE", str(256 * 1024 * 1024)))
+# 每个连接缓存的预编译语句条数；明细查询的条件组合较多，比 sqlite3 默认的 128 大
+SQLITE_STATEMENT_CACHE_SIZE = int(os.environ.get("DRIVER_DATA_STATEMENT_CACHE_SIZE", "512"))
+
+# 工具线程池大小与各类工具的最大并发数；导出限额小于线程池，
+# 保证长时间导出时仍有线程处理解析请求
+TOOL_WORKERS = int(os.environ.get("DRIVER_DATA_TOOL_WORKERS", "8"))
+TOOL_CONCURRENCY = {
+    "parse": int(os.environ.get("DRIVER_DATA_PARSE_CONCURRENCY", "6")),
+    "summary": int(os.environ.get("DRIVER_DATA_SUMMARY_CONCURRENCY", "4")),
+    "export": int(os.environ.get("DRIVER_DATA_EXPORT_CONCURRENCY", "2")),
+}
+
+# HTTP RPC 服务（api_server.py）：监听地址、保持连接的空闲超时（秒）、请求体上限（字节）、
+# 批量解析接口单次的最大条数，以及启用 gzip 的最小响应体（字节，更小的响应压缩得不偿失）
+HTTP_HOST = os.environ.get("DRIVER_DATA_HTTP_HOST", "0.0.0.0")
+HTTP_PORT = int(os.environ.get("DRIVER_DATA_HTTP_PORT", "8080"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("DRIVER_DATA_HTTP_KEEPALIVE_TIMEOUT", "15"))
+HTTP_MAX_BODY_BYTES = int(os.environ.get("DRIVER_DATA_HTTP_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+HTTP_MAX_BATCH_SIZE = int(os.environ.get("DRIVER_DATA_HTTP_MAX_BATCH_SIZE", "1000"))
+HTTP_GZIP_MIN_BYTES = int(os.environ.get("DRIVER_DATA_HTTP_GZIP_MIN_BYTES", "1024"))
+
+# 解析结果 LRU 缓存条数（按规范化原文哈希），重复提交的汇报不再重新解析
+PARSE_CACHE_SIZE = int(os.environ.get("DRIVER_DATA_PARSE_CACHE_SIZE", "10000"))
+
+# LLM 兜底提取：未设置 DRIVER_DATA_LLM_URL 时不启用，只使用规则提取。
+# 接口为 OpenAI 兼容的 chat/completions
+LLM_API_URL = os.environ.get("DRIVER_DATA_LLM_URL", "")
+LLM_API_KEY = os.environ.get("DRIVER_DATA_LLM_API_KEY", "")
+LLM_MODEL = os.environ.get("DRIVER_DATA_LLM_MODEL", "gpt-4o-mini")
+LLM_TIMEOUT = float(os.environ.get("DRIVER_DATA_LLM_TIMEOUT", "30"))
+LLM_CONCURRENCY = int(os.environ.get("DRIVER_DATA_LLM_CONCURRENCY", "4"))
+LLM_BATCH_SIZE = int(os.environ.get("DRIVER_DATA_LLM_BATCH_SIZE", "10"))
+LLM_CACHE_DIR = str(PROJECT_ROOT / os.environ.get("DRIVER_DATA_LLM_CACHE_DIR", ".llm_cache"))
+
+# 汇总结果缓存条数（按数据版本与筛选条件）
+SUMMARY_CACHE_SIZE = int(os.environ.get("DRIVER_DATA_SUMMARY_CACHE_SIZE", "256"))
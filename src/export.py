@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据导出
+
+用 fetchmany 按固定大小分块遍历游标，逐块写出 CSV（utf-8-sig）或 Parquet 行组，
+内存占用只与块大小有关，不会把整张表读入内存。日期范围涉及已归档的月份时，
+一并导出附加的归档库中的数据。
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from archive import report_tables
+from storage import DB_PATH, connect
+from summary import build_filters
+
+EXPORT_COLUMNS = (
+    "id",
+    "driver_name",
+    "vehicle_number",
+    "collection_task",
+    "collection_segments",
+    "collection_location",
+    "collection_date",
+    "collection_time_period",
+    "driving_distance",
+    "raw_text",
+    "created_at",
+)
+
+CHUNK_SIZE = 1000
+
+
+def _select_columns(columns: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    if not columns:
+        return EXPORT_COLUMNS
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"未知的导出列: {', '.join(unknown)}")
+    return tuple(columns)
+
+
+def iter_row_chunks(columns: Optional[Sequence[str]] = None, chunk_size: int = CHUNK_SIZE,
+                    db_path: str = DB_PATH, **filters) -> Iterator[List[Tuple]]:
+    """
+    按 id 顺序分块产出 driver_reports 的行，filters 同 summary.build_filters
+
+    涉及的归档多于一次可附加的个数时分组导出，每组内按 id 排序。
+    只有选择了 raw_text 列时才读取并解压原文。
+    """
+    columns = _select_columns(columns)
+    where, params = build_filters(**filters)
+    # 独立的只读连接：流式响应可能在其他线程中继续迭代，读取期间持有 WAL 快照
+    conn = connect(db_path, check_same_thread=False)
+    tables = report_tables(conn, db_path, filters.get("start_date"), filters.get("end_date"),
+                           with_text="raw_text" in columns)
+    try:
+        for table in tables:
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY id", params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                # 先结束游标，归档库才能 DETACH
+                cursor.close()
+    finally:
+        tables.close()
+        conn.close()
+
+
+def iter_csv_chunks(columns: Optional[Sequence[str]] = None, chunk_size: int = CHUNK_SIZE,
+                    db_path: str = DB_PATH, **filters) -> Iterator[bytes]:
+    """
+    产出 utf-8-sig 编码的 CSV 字节块，可直接作为 HTTP 响应体流式发送
+
+    第一块是 BOM 加表头，之后每块对应 chunk_size 行。
+    """
+    columns = _select_columns(columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue().encode('utf-8-sig')
+
+    for rows in iter_row_chunks(columns, chunk_size, db_path, **filters):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def export_csv(filename: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+               chunk_size: int = CHUNK_SIZE, db_path: str = DB_PATH, **filters) -> Dict:
+    """分块导出数据到 CSV 文件，返回 {"filename", "rows"}"""
+    filename = filename or f"driver_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    columns = _select_columns(columns)
+    rows_written = 0
+
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in iter_row_chunks(columns, chunk_size, db_path, **filters):
+            writer.writerows(rows)
+            rows_written += len(rows)
+
+    return {"filename": filename, "rows": rows_written}
+
+
+# Parquet 导出：每个块写成一个行组，低基数文本列用字典编码
+ROW_GROUP_SIZE = 65536
+DICTIONARY_COLUMNS = ("driver_name", "collection_location", "collection_time_period")
+PARQUET_COMPRESSION = "zstd"
+
+
+def _parquet_schema(pa, columns: Sequence[str]):
+    types = {
+        "id": pa.int64(),
+        "collection_segments": pa.int64(),
+        "driving_distance": pa.float64(),
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+def export_parquet(filename: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                   row_group_size: int = ROW_GROUP_SIZE, compression: str = PARQUET_COMPRESSION,
+                   db_path: str = DB_PATH, **filters) -> Dict:
+    """
+    分块导出数据到 Parquet 文件，返回 {"filename", "rows", "row_groups"}
+
+    需要可选依赖 pyarrow。每 row_group_size 行写一个行组，
+    内存占用与块大小有关而与表大小无关。
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet 导出需要安装 pyarrow: pip install pyarrow") from e
+
+    filename = filename or f"driver_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+    columns = _select_columns(columns)
+    schema = _parquet_schema(pa, columns)
+    dictionary_columns = [column for column in columns if column in DICTIONARY_COLUMNS]
+    rows_written = 0
+    row_groups = 0
+
+    with pq.ParquetWriter(filename, schema, compression=compression,
+                          use_dictionary=dictionary_columns) as writer:
+        for rows in iter_row_chunks(columns, row_group_size, db_path, **filters):
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=row_group_size)
+            rows_written += len(rows)
+            row_groups += 1
+
+    return {"filename": filename, "rows": rows_written, "row_groups": row_groups}
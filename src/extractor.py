@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则提取引擎
+
+所有字段标签（含同义词）在导入时按公共前缀合并成一棵字典树，编译为
+一个正则，一次线性扫描即把汇报切分为“标签/取值”片段。每个标签的取值
+截止到下一个标签或分隔符（，,换行），因此无需为连写的汇报（如
+“采集员：方少东车辆编号：...”）在每个模式里写排除字符。
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+# 形如 8.10 的日期补全年份
+DEFAULT_YEAR = 2025
+
+FIELDS = (
+    "driver_name",
+    "vehicle_number",
+    "collection_task",
+    "collection_segments",
+    "collection_location",
+    "collection_date",
+    "collection_time_period",
+    "driving_distance",
+)
+_EMPTY_RESULT = dict.fromkeys(FIELDS)
+
+# 字段标签 -> (字段名, 优先级)，优先级数字越小越优先
+LABELS: Dict[str, Tuple[str, int]] = {
+    "采集员": ("driver_name", 0),
+    "姓名": ("driver_name", 1),
+    "司机": ("driver_name", 2),
+    "车辆编号": ("vehicle_number", 0),
+    "车牌": ("vehicle_number", 1),
+    "车牌号": ("vehicle_number", 1),
+    "车号": ("vehicle_number", 2),
+    "采集任务": ("collection_task", 0),
+    "任务": ("collection_task", 1),
+    "采集项目": ("collection_task", 1),
+    "项目": ("collection_task", 2),
+    "采集段数": ("collection_segments", 0),
+    "段数": ("collection_segments", 1),
+    "完成段数": ("collection_segments", 1),
+    "采集地点": ("collection_location", 0),
+    "地点": ("collection_location", 1),
+    "测试地点": ("collection_location", 1),
+    "位置": ("collection_location", 2),
+    "采集日期": ("collection_date", 0),
+    "日期": ("collection_date", 1),
+    "测试日期": ("collection_date", 1),
+    "时间": ("collection_date", 2),
+    "采集时段": ("collection_time_period", 0),
+    "时段": ("collection_time_period", 1),
+    "行驶里程": ("driving_distance", 0),
+    "里程": ("driving_distance", 1),
+    "总里程": ("driving_distance", 1),
+    "距离": ("driving_distance", 2),
+}
+
+
+def _trie_pattern(words) -> str:
+    """
+    把一组字面量按公共前缀合并为字典树形式的正则
+
+    每个位置只需按首字符选择一个分支，可选后缀贪婪匹配，保证取最长标签
+    （“车牌号”不会被截成“车牌”，“完成段数”不会只匹配到“段数”）。
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+# 按标签切分全文：切分结果中奇数位是标签，其后紧跟该标签的取值
+_SPLITTER = re.compile(rf"({_trie_pattern(LABELS)})[：:]\s*")
+
+# 无标签的兜底写法：“采集了6段”、“85.7公里”，仅在标签缺失时使用
+_FALLBACKS = {
+    "collection_segments": re.compile(r"(\d+)\s*段(?!数[：:])"),
+    "driving_distance": re.compile(r"(?<![\d.])(\d+(?:\.\d+)?|\.\d+)\s*公里"),
+}
+_VALUE = re.compile(r"[^，,\n\r]*")
+_INT = re.compile(r"\d+")
+_FLOAT = re.compile(r"\d+(?:\.\d+)?|\.\d+")
+_DATE = re.compile(r"[0-9./-]+")
+_SHORT_DATE = re.compile(r"(\d{1,2})\.(\d{1,2})")
+_DAY = re.compile(r"白|上午|下午")
+_NIGHT = re.compile(r"夜|晚上")
+
+
+def empty_result() -> Dict:
+    """返回所有字段为 None 的结果字典"""
+    return _EMPTY_RESULT.copy()
+
+
+def _parse_text(value: str) -> Optional[str]:
+    return _VALUE.match(value).group().strip() or None
+
+
+def _parse_int(value: str) -> Optional[int]:
+    match = _INT.match(value.strip())
+    return int(match.group()) if match else None
+
+
+def _parse_float(value: str) -> Optional[float]:
+    match = _FLOAT.match(value.strip())
+    return float(match.group()) if match else None
+
+
+def _parse_date(value: str) -> Optional[str]:
+    match = _DATE.match(value.strip())
+    if not match:
+        return None
+    date_str = match.group()
+    short = _SHORT_DATE.fullmatch(date_str)
+    if short:
+        month, day = short.groups()
+        return f"{DEFAULT_YEAR}-{month.zfill(2)}-{day.zfill(2)}"
+    return date_str
+
+
+def _match_time_period(text: str) -> Optional[str]:
+    if _DAY.search(text):
+        return "白天"
+    if _NIGHT.search(text):
+        return "夜晚"
+    return None
+
+
+def _parse_time_period(value: str) -> Optional[str]:
+    # 与其他字段一样只看到分隔符为止，后续行（如“备注：白色车辆”）不参与判断
+    return _match_time_period(_VALUE.match(value).group())
+
+
+_PARSERS = {
+    "driver_name": _parse_text,
+    "vehicle_number": _parse_text,
+    "collection_task": _parse_text,
+    "collection_segments": _parse_int,
+    "collection_location": _parse_text,
+    "collection_date": _parse_date,
+    "collection_time_period": _parse_time_period,
+    "driving_distance": _parse_float,
+}
+
+def parse_field(field: str, value) -> Optional[object]:
+    """按字段类型规范化外部来源（如 LLM）给出的取值，无法解析时返回 None"""
+    if value is None:
+        return None
+    return _PARSERS[field](str(value))
+
+
+# 标签 -> (字段名, 优先级, 解析函数)，热路径上只查一次字典
+_LABEL_INFO = {label: (field, priority, _PARSERS[field]) for label, (field, priority) in LABELS.items()}
+
+
+def extract_with_rules(text: str) -> Dict:
+    """使用规则和正则表达式提取数据"""
+    parts = _SPLITTER.split(text)
+    result = empty_result()
+    ranks = {}
+
+    # 同一字段出现多个标签时取优先级最高者，同级取最先出现者
+    for i in range(1, len(parts), 2):
+        field, priority, parse = _LABEL_INFO[parts[i]]
+        if ranks.get(field, priority + 1) <= priority:
+            continue
+        value = parse(parts[i + 1])
+        if value is not None:
+            result[field] = value
+            ranks[field] = priority
+
+    for field, pattern in _FALLBACKS.items():
+        if result[field] is None:
+            match = pattern.search(text)
+            if match:
+                result[field] = _PARSERS[field](match.group(1))
+
+    # 没有时段标签时按全文关键字判断
+    if result["collection_time_period"] is None:
+        result["collection_time_period"] = _match_time_period(text)
+
+    return result
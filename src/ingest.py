@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+汇报批量入库
+
+先解析整批汇报，再一次性写入数据库，并返回逐条结果与错误。
+大文件通过 iter_reports 逐行流式读取，内存占用与文件大小无关。
+解析结果按规范化原文哈希缓存，重复提交的汇报只需一次哈希查找。
+配置了 LLM 时，单条与批量解析会把规则未填充的字段交给 llm 模块补全；
+大文件流式导入与多核回灌只走规则路径。
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from cache import LRUCache
+from config import PARSE_CACHE_SIZE
+from extractor import extract_with_rules
+from llm import get_llm_extractor
+from metrics import PARSE_CACHE_HITS, PHASE_SECONDS, record_extraction
+from storage import DB_PATH, content_hash, get_ingest_offset, save_reports_batch, save_to_database
+
+# 汇报分隔行：以 # 开头的标题行（example_data.txt 格式）、空行，或两者皆可
+SEPARATORS = {
+    "header": r"#",
+    "blank": r"\s*$",
+    "header_or_blank": r"#|\s*$",
+}
+
+
+_parse_cache = LRUCache(PARSE_CACHE_SIZE)
+
+
+def parse_report(report_text: str) -> Dict:
+    """解析一条汇报；相同内容（忽略缩进与空行）的重复提交直接返回缓存结果"""
+    key = content_hash(report_text)
+    data = _parse_cache.get(key)
+    if data is None:
+        data = extract_with_rules(report_text)
+        record_extraction(data)
+        _parse_cache.put(key, data)
+    else:
+        PARSE_CACHE_HITS.inc()
+    return dict(data)
+
+
+def fill_missing_fields(results: List[Dict], texts: List[str]):
+    """配置了 LLM 时原地补全规则结果中缺失的字段，未配置时不做任何事"""
+    llm = get_llm_extractor()
+    if llm is None or not results:
+        return
+    with PHASE_SECONDS.time("llm"):
+        filled_results = llm.fill_missing(results, texts)
+    for data, filled in zip(results, filled_results):
+        data.update(filled)
+
+
+def parse_and_save(report_text: str, db_path: str = DB_PATH, on_duplicate: str = "skip") -> Dict:
+    """解析一条汇报（配置了 LLM 时补全缺失字段）并保存，返回解析结果；MCP 工具与 HTTP 接口共用"""
+    with PHASE_SECONDS.time("parse"):
+        data = parse_report(report_text)
+    fill_missing_fields([data], [report_text.strip()])
+    save_to_database(data, report_text.strip(), db_path, on_duplicate=on_duplicate)
+    return data
+
+
+def parse_chunk(report_texts: List[str]) -> List[Tuple[Dict, str]]:
+    """解析一组汇报，返回可直接写库的 (解析结果, 原始文本)，空文本跳过"""
+    items = []
+    for report_text in report_texts:
+        report_text = report_text.strip()
+        if report_text:
+            items.append((parse_report(report_text), report_text))
+    return items
+
+
+def parse_reports_batch(report_texts: List[str], db_path: str = DB_PATH,
+                        on_duplicate: str = "skip") -> Dict:
+    """
+    解析并在单个事务中保存一批汇报
+
+    返回 {"total", "saved", "duplicates", "failed", "results"}，results 与输入一一对应，
+    每项为 {"index", "status": "success", "data"} 或 {"index", "status": "error", "error"}。
+    与已有记录重复的汇报按 on_duplicate 处理，计入 duplicates 而不计入 saved。
+    数据库写入失败时整批回滚，返回 {"error": ...}。
+    """
+    results = []
+    items = []
+
+    with PHASE_SECONDS.time("parse"):
+        for index, report_text in enumerate(report_texts):
+            if not isinstance(report_text, str) or not report_text.strip():
+                results.append({"index": index, "status": "error", "error": "汇报文本为空"})
+                continue
+            try:
+                data = parse_report(report_text)
+            except Exception as e:
+                results.append({"index": index, "status": "error", "error": str(e)})
+                continue
+            items.append((data, report_text.strip()))
+            results.append({"index": index, "status": "success", "data": data})
+
+    fill_missing_fields([data for data, _ in items], [text for _, text in items])
+    try:
+        saved = save_reports_batch(items, db_path, on_duplicate=on_duplicate)
+    except Exception as e:
+        return {"error": str(e)}
+
+    return {
+        "total": len(results),
+        "saved": saved,
+        "duplicates": len(items) - saved,
+        "failed": len(results) - len(items),
+        "results": results,
+    }
+
+
+def iter_reports(path: str, separator: str = SEPARATORS["header_or_blank"],
+                 start_offset: int = 0) -> Iterator[Tuple[int, str]]:
+    """
+    逐行读取文件并按分隔行切分汇报，产出 (结束字节偏移, 汇报文本)
+
+    separator 为从行首匹配的正则，匹配的行本身被丢弃。结束偏移指向下一条
+    分隔行或文件末尾，从该偏移重新读取即可续传。
+    """
+    pattern = re.compile(separator)
+    lines = []
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for raw_line in f:
+            line = raw_line.decode('utf-8', errors='replace').rstrip('\r\n')
+            if offset == 0:
+                line = line.lstrip('\ufeff')
+            if pattern.match(line):
+                report_text = '\n'.join(lines).strip()
+                if report_text:
+                    yield offset, report_text
+                lines = []
+            else:
+                lines.append(line)
+            offset += len(raw_line)
+        report_text = '\n'.join(lines).strip()
+        if report_text:
+            yield offset, report_text
+
+
+def ingest_file(path: str, separator: str = SEPARATORS["header_or_blank"],
+                batch_size: int = 1000, resume: bool = False, db_path: str = DB_PATH,
+                progress: Optional[Callable[[int, int, int], None]] = None,
+                on_duplicate: str = "skip") -> Dict:
+    """
+    流式解析并分批写入一个多汇报文本文件
+
+    每批与文件的字节偏移在同一事务内提交；resume=True 时从上次提交的偏移继续。
+    重复汇报按 on_duplicate 处理，saved 只统计新增行。
+    progress(已读字节, 文件总字节, 已保存条数) 在每批提交后回调。
+    """
+    source = os.path.abspath(path)
+    total_bytes = os.path.getsize(path)
+    start_offset = get_ingest_offset(source, db_path) if resume else 0
+
+    saved = 0
+    batch = []
+    for offset, report_text in iter_reports(path, separator, start_offset):
+        batch.extend(parse_chunk([report_text]))
+        if len(batch) >= batch_size:
+            saved += save_reports_batch(batch, db_path, checkpoint=(source, offset),
+                                        on_duplicate=on_duplicate)
+            batch = []
+            if progress:
+                progress(offset, total_bytes, saved)
+
+    saved += save_reports_batch(batch, db_path, checkpoint=(source, total_bytes),
+                                on_duplicate=on_duplicate)
+    if progress:
+        progress(total_bytes, total_bytes, saved)
+
+    return {"source": source, "start_offset": start_offset, "saved": saved}
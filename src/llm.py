@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 兜底提取
+
+规则提取仍是主路径；只有规则未能填充的字段才交给 LLM，且只请求缺失的字段。
+待补全的汇报按 batch_size 合并成一次请求，响应按原文哈希缓存在磁盘上，
+同时进行的请求数受 concurrency 限制，每个请求有超时。请求失败时保留规则结果。
+
+入库路径总会导入本模块，而多数部署不配置 LLM：urllib.request（连带 http.client、
+email、ssl）、线程池与 logging 都在用到时才导入，不拖慢冷启动。
+"""
+
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+from config import (LLM_API_KEY, LLM_API_URL, LLM_BATCH_SIZE, LLM_CACHE_DIR, LLM_CONCURRENCY,
+                    LLM_MODEL, LLM_TIMEOUT)
+from extractor import FIELDS, parse_field
+from storage import content_hash
+
+FIELD_DESCRIPTIONS = {
+    "driver_name": "采集员/司机姓名",
+    "vehicle_number": "车辆编号或车牌",
+    "collection_task": "采集任务",
+    "collection_segments": "采集段数（整数）",
+    "collection_location": "采集地点",
+    "collection_date": "采集日期（YYYY-MM-DD）",
+    "collection_time_period": "采集时段（白天 或 夜晚）",
+    "driving_distance": "行驶里程（公里，数字）",
+}
+
+SYSTEM_PROMPT = (
+    "你是智驾数据采集汇报的信息提取助手。对每条汇报，只提取要求的字段，"
+    "原文没有提到的字段填 null，不要猜测。"
+    '只输出 JSON：{"results": [{"index": 序号, "fields": {字段名: 值}}]}'
+)
+
+# 发送一次请求：(请求体) -> 响应体，便于替换为其他客户端
+Transport = Callable[[Dict], Dict]
+
+
+def missing_fields(data: Dict) -> List[str]:
+    return [field for field in FIELDS if data.get(field) is None]
+
+
+class LLMExtractor:
+    """为规则提取结果补全缺失字段的 LLM 客户端"""
+
+    def __init__(self, api_url: str = LLM_API_URL, api_key: str = LLM_API_KEY, model: str = LLM_MODEL,
+                 timeout: float = LLM_TIMEOUT, concurrency: int = LLM_CONCURRENCY,
+                 batch_size: int = LLM_BATCH_SIZE, cache_dir: Optional[str] = LLM_CACHE_DIR,
+                 transport: Optional[Transport] = None):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.cache_dir = cache_dir
+        self.transport = transport or self._post
+        # 所有调用方共享的并发上限
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+
+    # ---- 磁盘缓存 ----
+
+    def _cache_path(self, text: str) -> str:
+        key = content_hash(f"{self.model}\n{text}")
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _cache_get(self, text: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(text), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_put(self, text: str, fields: Dict):
+        """写缓存失败（磁盘满、目录只读等）只记录日志，不影响已取得的提取结果"""
+        if not self.cache_dir:
+            return
+        path = self._cache_path(text)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(fields, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            import logging
+
+            logging.getLogger(__name__).warning("LLM 结果缓存写入失败: %s", e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    # ---- 请求 ----
+
+    def _post(self, payload: Dict) -> Dict:
+        import urllib.request
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.api_url, data=json.dumps(payload).encode("utf-8"),
+                                         headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def _payload(self, batch: Sequence[Dict]) -> Dict:
+        lines = []
+        for index, item in enumerate(batch):
+            wanted = "、".join(f"{field}（{FIELD_DESCRIPTIONS[field]}）" for field in item["fields"])
+            lines.append(f"### 汇报 {index}\n需要字段：{wanted}\n{item['text']}")
+        return {
+            "model": self.model,
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": "\n\n".join(lines)},
+            ],
+        }
+
+    @staticmethod
+    def _parse_response(response: Dict, size: int) -> List[Dict]:
+        content = response["choices"][0]["message"]["content"].strip()
+        if content.startswith("```"):
+            content = content.strip("`").partition("\n")[2]
+        results = [{} for _ in range(size)]
+        for entry in json.loads(content).get("results", []):
+            index = entry.get("index")
+            if isinstance(index, int) and 0 <= index < size and isinstance(entry.get("fields"), dict):
+                results[index] = entry["fields"]
+        return results
+
+    def _request_batch(self, batch: Sequence[Dict]) -> List[Dict]:
+        with self._slots:
+            try:
+                return self._parse_response(self.transport(self._payload(batch)), len(batch))
+            except Exception as e:
+                import logging
+
+                logging.getLogger(__name__).warning("LLM 提取失败（%d 条汇报），保留规则结果: %s", len(batch), e)
+                return [None] * len(batch)
+
+    # ---- 对外接口 ----
+
+    def fill_missing(self, items: Sequence[Dict], texts: Sequence[str]) -> List[Dict]:
+        """
+        用 LLM 补全规则结果中为 None 的字段，返回新的结果列表
+
+        已有值的字段不会被覆盖；没有缺失字段的汇报不发请求。
+        """
+        results = [dict(item) for item in items]
+        pending = []
+        for index, (data, text) in enumerate(zip(results, texts)):
+            fields = missing_fields(data)
+            if not fields:
+                continue
+            cached = self._cache_get(text)
+            if cached is not None:
+                self._merge(data, cached, fields)
+            else:
+                pending.append({"index": index, "text": text, "fields": fields})
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        if not batches:
+            return results
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+            for batch, answers in zip(batches, executor.map(self._request_batch, batches)):
+                for item, answer in zip(batch, answers):
+                    if answer is None:
+                        continue
+                    self._cache_put(item["text"], answer)
+                    self._merge(results[item["index"]], answer, item["fields"])
+        return results
+
+    @staticmethod
+    def _merge(data: Dict, answer: Dict, fields: Sequence[str]):
+        for field in fields:
+            if data.get(field) is None and field in answer:
+                data[field] = parse_field(field, answer[field])
+
+
+_default_extractor: Optional[LLMExtractor] = None
+
+
+def get_llm_extractor() -> Optional[LLMExtractor]:
+    """按配置返回共享的 LLMExtractor，未配置 DRIVER_DATA_LLM_URL 时返回 None"""
+    global _default_extractor
+    if not LLM_API_URL:
+        return None
+    if _default_extractor is None:
+        _default_extractor = LLMExtractor()
+    return _default_extractor
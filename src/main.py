@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Driver Data MCP Server
+
+智驾数据采集MCP服务器：解析司机汇报文本、汇总与导出采集数据。
+工具中的阻塞调用（SQLite、解析、导出）经 offload.run_blocking 在线程池中执行，
+不阻塞事件循环。
+"""
+
+from typing import Dict, List, Optional
+
+from fastmcp import FastMCP
+
+from export import export_csv, export_parquet
+from extractor import extract_with_rules as _extract_with_rules
+from ingest import parse_and_save, parse_reports_batch
+from metrics import server_stats, track_tool
+from offload import run_blocking
+from query import DEFAULT_PAGE_SIZE, query_reports as _query_reports
+from search import search_reports as _search_reports
+from storage import DB_PATH, init_database
+from summary import get_collection_summary as _get_collection_summary
+from trends import get_collection_trends as _get_collection_trends
+
+mcp = FastMCP("driver-data-server")
+
+
+async def extract_with_rules(text: str) -> Dict:
+    """使用规则和正则表达式提取数据"""
+    return _extract_with_rules(text)
+
+
+async def parse_driver_report(report_text: str, on_duplicate: str = "skip") -> Dict:
+    """
+    解析司机汇报文本并保存到数据库
+
+    重复提交（内容相同，忽略缩进与空行）时 on_duplicate 为 skip 保留原记录、
+    update 用新解析结果覆盖、count 只累加提交次数，汇总不会重复计入。
+    """
+    try:
+        return await run_blocking("parse", parse_and_save, report_text, DB_PATH, on_duplicate)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+async def parse_driver_reports_batch(report_texts: List[str], on_duplicate: str = "skip") -> Dict:
+    """批量解析司机汇报文本，并在单个事务中保存到数据库；on_duplicate 同 parse_driver_report"""
+    return await run_blocking("parse", parse_reports_batch, report_texts, on_duplicate=on_duplicate)
+
+
+async def get_collection_summary(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                 driver_name: Optional[str] = None, vehicle_number: Optional[str] = None,
+                                 collection_location: Optional[str] = None) -> Dict:
+    """获取采集数据总览，可按采集日期范围（YYYY-MM-DD）、司机、车辆、地点筛选"""
+    return await run_blocking("summary", _get_collection_summary, DB_PATH, start_date, end_date, driver_name,
+                              vehicle_number, collection_location)
+
+
+async def get_collection_trends(granularity: str = "day", dimension: Optional[str] = None,
+                                start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                driver_name: Optional[str] = None, vehicle_number: Optional[str] = None,
+                                collection_location: Optional[str] = None) -> Dict:
+    """
+    获取按日/周/月（granularity: day/week/month）分桶的报告数、段数与里程趋势
+
+    dimension 为 driver/vehicle/location/time_period 时每个桶再按该维度拆分；
+    筛选条件同 get_collection_summary。只读取增量维护的分桶汇总表。
+    """
+    return await run_blocking("summary", _get_collection_trends, DB_PATH, granularity, dimension,
+                              start_date, end_date, driver_name, vehicle_number, collection_location)
+
+
+async def search_reports(query: str, page: int = 1, page_size: int = 20) -> Dict:
+    """
+    全文检索原始汇报与采集任务（如 "黄灯闪烁路口"），按相关度排序分页返回命中片段
+
+    多个词用空格分隔，需全部出现；每个词至少 3 个字符时走全文索引，否则退回逐行匹配。
+    """
+    return await run_blocking("summary", _search_reports, query, page, page_size, DB_PATH)
+
+
+async def query_reports(driver_name: Optional[str] = None, vehicle_number: Optional[str] = None,
+                        collection_location: Optional[str] = None, collection_time_period: Optional[str] = None,
+                        start_date: Optional[str] = None, end_date: Optional[str] = None,
+                        cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                        include_raw_text: bool = False) -> Dict:
+    """
+    按司机、车辆、地点、时段与采集日期范围查询汇报明细，最新的在前，每页 page_size 条（最多 200）
+
+    返回的 next_cursor 作为 cursor 传入获取下一页，为 None 时没有更多数据。
+    include_raw_text 为 True 时附带原始汇报文本。
+    """
+    return await run_blocking("summary", _query_reports, DB_PATH, driver_name, vehicle_number,
+                              collection_location, collection_time_period, start_date, end_date,
+                              cursor, page_size, include_raw_text)
+
+
+async def export_data_csv(columns: Optional[List[str]] = None, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None, driver_name: Optional[str] = None,
+                          vehicle_number: Optional[str] = None,
+                          collection_location: Optional[str] = None) -> str:
+    """
+    导出数据为CSV格式，分块读取，不把整张表载入内存
+
+    columns 指定导出列（如省略 raw_text），默认全部列；筛选条件同 get_collection_summary。
+    """
+    try:
+        result = await run_blocking("export", export_csv, columns=columns, db_path=DB_PATH,
+                                    start_date=start_date, end_date=end_date, driver_name=driver_name,
+                                    vehicle_number=vehicle_number, collection_location=collection_location)
+        return f"数据已导出到文件: {result['filename']}（{result['rows']} 条）"
+    except Exception as e:
+        return f"导出失败: {e}"
+
+
+async def export_data_parquet(columns: Optional[List[str]] = None, start_date: Optional[str] = None,
+                              end_date: Optional[str] = None, driver_name: Optional[str] = None,
+                              vehicle_number: Optional[str] = None,
+                              collection_location: Optional[str] = None) -> str:
+    """
+    导出数据为Parquet列式格式（需要 pyarrow），按行组分块写入
+
+    司机、地点、时段列使用字典编码并整体压缩，下游分析可只读取所需列。
+    参数同 export_data_csv。
+    """
+    try:
+        result = await run_blocking("export", export_parquet, columns=columns, db_path=DB_PATH,
+                                    start_date=start_date, end_date=end_date, driver_name=driver_name,
+                                    vehicle_number=vehicle_number, collection_location=collection_location)
+        return f"数据已导出到文件: {result['filename']}（{result['rows']} 条，{result['row_groups']} 个行组）"
+    except Exception as e:
+        return f"导出失败: {e}"
+
+
+async def get_server_stats() -> Dict:
+    """
+    获取服务运行指标
+
+    返回各工具的调用次数、错误数与耗时分位数，解析/LLM/数据库各阶段耗时，入库行数，
+    解析缓存命中率，以及规则提取各字段的命中率。
+    """
+    return server_stats()
+
+
+# 每个工具都记录调用次数与耗时
+for _tool in (parse_driver_report, parse_driver_reports_batch, get_collection_summary,
+              get_collection_trends, search_reports, query_reports, export_data_csv, export_data_parquet,
+              get_server_stats):
+    mcp.tool()(track_tool(_tool))
+
+
+if __name__ == "__main__":
+    init_database()
+    mcp.run()
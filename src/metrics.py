@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行指标
+
+进程内的计数器与直方图：各工具/接口的调用次数与耗时分布，规则提取（parse）、
+LLM 补全（llm）、入库事务（db_write）与查询（db_read）各阶段的耗时，入库行数，
+以及规则提取各字段的命中率（extract_with_rules 返回 None 即未命中）。
+HTTP 服务的 /metrics 以 Prometheus 文本格式输出，MCP 工具 get_server_stats 返回 JSON 摘要。
+
+工具耗时包含在线程池前排队的时间，阶段耗时不包含：两者对比即可看出慢在排队、
+SQLite 还是正则。解析与入库的阶段耗时按调用记录而不是按条记录，每条汇报只多一次
+加锁的字典更新（约 1 µs），不做 I/O。指标只存在于当前进程，重启后清零；多核回灌子进程中的解析不计入。
+"""
+
+import bisect
+import functools
+import operator
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from extractor import FIELDS
+
+# 工具耗时的桶上界（秒）；阶段耗时再加上微秒级的桶，单条规则提取约 10 µs
+TOOL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PHASE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005) + TOOL_BUCKETS
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+START_TIME = time.time()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: Tuple = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """单调递增的计数；labels 为标签名，inc 按同样的顺序传标签值"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount: float = 1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def value(self, *values) -> float:
+        return self._values.get(values, 0)
+
+    def items(self) -> List[Tuple[Tuple, float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> List[str]:
+        items = self.items()
+        if not items and not self.labels:
+            items = [((), 0)]
+        return [f"{self.name}{_labels(self.labels, values)} {_number(value)}" for values, value in items]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class FieldHits:
+    """
+    规则提取各字段的命中计数
+
+    按"哪些字段为 None"的组合计数，记录一次提取只需一次字典更新；
+    输出时再展开为每个字段的 found/missing。
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, fields: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.fields = tuple(fields)
+        self._nones = (None,) * len(self.fields)
+        self._values: Dict[Tuple[bool, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, data: Dict):
+        key = tuple(map(operator.is_, map(data.get, self.fields), self._nones))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + 1
+
+    def counts(self) -> Tuple[int, Dict[str, int]]:
+        """返回 (提取次数, 字段 -> 未命中次数)"""
+        with self._lock:
+            items = list(self._values.items())
+        missing = dict.fromkeys(self.fields, 0)
+        for key, count in items:
+            for field, is_none in zip(self.fields, key):
+                if is_none:
+                    missing[field] += count
+        return sum(count for _, count in items), missing
+
+    def render(self) -> List[str]:
+        total, missing = self.counts()
+        if not total:
+            return []
+        lines = []
+        for field in self.fields:
+            lines.append(f'{self.name}{{field="{field}",result="found"}} {total - missing[field]}')
+            lines.append(f'{self.name}{{field="{field}",result="missing"}} {missing[field]}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class _Timer:
+    __slots__ = ("histogram", "values", "start")
+
+    def __init__(self, histogram: "Histogram", values: Tuple):
+        self.histogram = histogram
+        self.values = values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.values)
+
+
+class Histogram:
+    """固定分桶的耗时分布（秒）；每组标签保存各桶计数（最后一个为 +Inf 桶）与总和"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = TOOL_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *values):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            data = self._values.get(values)
+            if data is None:
+                data = self._values[values] = [0] * (len(self.buckets) + 1) + [0.0]
+            data[index] += 1
+            data[-1] += seconds
+
+    def time(self, *values) -> _Timer:
+        """with histogram.time(标签值...): 记录代码块的耗时"""
+        return _Timer(self, values)
+
+    def items(self) -> List[Tuple[Tuple, List]]:
+        with self._lock:
+            return sorted((values, list(data)) for values, data in self._values.items())
+
+    def _quantile(self, counts: List[int], q: float) -> Optional[float]:
+        """按桶上界估计分位数，落在最后一个桶之外时为 None"""
+        rank = q * sum(counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return None
+
+    def summary(self, data: List) -> Dict:
+        counts, total = data[:-1], data[-1]
+        count = sum(counts)
+
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 3) if seconds is not None else None
+
+        return {
+            "count": count,
+            "total_seconds": round(total, 6),
+            "mean_ms": ms(total / count) if count else None,
+            "p50_ms": ms(self._quantile(counts, 0.5)),
+            "p95_ms": ms(self._quantile(counts, 0.95)),
+            "p99_ms": ms(self._quantile(counts, 0.99)),
+        }
+
+    def render(self) -> List[str]:
+        lines = []
+        for values, data in self.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data[:-1]):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {_number(data[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {cumulative}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+TOOL_CALLS = Counter("driver_data_tool_calls_total", "工具/接口调用次数，outcome 为 ok 或 error",
+                     ("tool", "transport", "outcome"))
+TOOL_LATENCY = Histogram("driver_data_tool_latency_seconds", "工具/接口耗时，含排队等待", ("tool", "transport"))
+PHASE_SECONDS = Histogram("driver_data_phase_seconds", "各阶段耗时：parse、llm、db_write、db_read",
+                          ("phase",), PHASE_BUCKETS)
+ROWS_INGESTED = Counter("driver_data_rows_ingested_total", "新增入库的汇报行数")
+DUPLICATE_REPORTS = Counter("driver_data_duplicate_reports_total", "与已有记录重复、未新增行的提交数")
+PARSE_CACHE_HITS = Counter("driver_data_parse_cache_hits_total", "命中解析缓存、无需重新提取的汇报数")
+EXTRACTED_FIELDS = FieldHits("driver_data_extracted_fields_total",
+                             "规则提取各字段的结果，result 为 found 或 missing；未命中解析缓存时才提取", FIELDS)
+
+REGISTRY = (TOOL_CALLS, TOOL_LATENCY, PHASE_SECONDS, ROWS_INGESTED, DUPLICATE_REPORTS, PARSE_CACHE_HITS,
+            EXTRACTED_FIELDS)
+
+
+def record_tool(tool: str, transport: str, seconds: float, ok: bool = True):
+    TOOL_CALLS.inc(tool, transport, "ok" if ok else "error")
+    TOOL_LATENCY.observe(seconds, tool, transport)
+
+
+def record_extraction(data: Dict):
+    """记录一次规则提取中各字段是否命中"""
+    EXTRACTED_FIELDS.record(data)
+
+
+def track_tool(fn: Callable, transport: str = "mcp") -> Callable:
+    """包装异步工具，记录调用次数与耗时；返回 {"error": ...} 或抛出异常计为 error"""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await fn(*args, **kwargs)
+            ok = not (isinstance(result, dict) and "error" in result)
+            return result
+        finally:
+            record_tool(name, transport, time.perf_counter() - start, ok)
+
+    return wrapper
+
+
+def render_prometheus() -> str:
+    """所有指标的 Prometheus 文本格式"""
+    lines = [
+        "# HELP driver_data_start_time_seconds 进程启动时间（Unix 时间戳）",
+        "# TYPE driver_data_start_time_seconds gauge",
+        f"driver_data_start_time_seconds {_number(round(START_TIME, 3))}",
+    ]
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def _rate(hits: float, total: float) -> Optional[float]:
+    return round(hits / total, 4) if total else None
+
+
+def server_stats() -> Dict:
+    """
+    指标的 JSON 摘要
+
+    返回 {"uptime_seconds", "tools", "phases", "rows_ingested", "duplicate_reports",
+    "parse_cache", "extraction"}。tools 每项含调用次数、错误数与耗时均值/分位数（毫秒，
+    分位数按桶上界估计）；extraction 为各字段的命中次数与命中率。
+    """
+    calls = {}
+    for (tool, transport, outcome), count in TOOL_CALLS.items():
+        entry = calls.setdefault((tool, transport), {"calls": 0, "errors": 0})
+        entry["calls"] += int(count)
+        if outcome == "error":
+            entry["errors"] += int(count)
+    tools = [
+        {"tool": tool, "transport": transport, **calls.get((tool, transport), {"calls": 0, "errors": 0}),
+         **{key: value for key, value in TOOL_LATENCY.summary(data).items() if key.endswith("_ms")}}
+        for (tool, transport), data in TOOL_LATENCY.items()
+    ]
+
+    hits = int(PARSE_CACHE_HITS.value())
+    reports, missing = EXTRACTED_FIELDS.counts()
+    fields = {
+        field: {"found": reports - missing[field], "missing": missing[field],
+                "hit_rate": _rate(reports - missing[field], reports)}
+        for field in FIELDS
+    }
+    return {
+        "uptime_seconds": round(time.time() - START_TIME, 1),
+        "tools": tools,
+        "phases": {phase: PHASE_SECONDS.summary(data) for (phase,), data in PHASE_SECONDS.items()},
+        "rows_ingested": int(ROWS_INGESTED.value()),
+        "duplicate_reports": int(DUPLICATE_REPORTS.value()),
+        "parse_cache": {"hits": hits, "misses": reports, "hit_rate": _rate(hits, hits + reports)},
+        "extraction": {"reports": reports, "fields": fields},
+    }
+
+
+def reset():
+    """清零所有指标（测试用）"""
+    for metric in REGISTRY:
+        metric.reset()
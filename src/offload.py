@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阻塞任务卸载
+
+异步工具中的 SQLite、解析与导出都是同步调用，直接执行会阻塞事件循环。
+run_blocking 把它们放到有界线程池中执行，并按工具类别限制并发，
+长时间的导出不会占满线程池而饿死快速的解析请求。
+iterate_blocking 以同样的方式逐块推进阻塞的生成器，用于流式响应。
+"""
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from config import TOOL_CONCURRENCY, TOOL_WORKERS
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+# 信号量绑定到事件循环，每个循环各自一组
+_limits: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _limit(loop: asyncio.AbstractEventLoop, kind: str) -> asyncio.Semaphore:
+    limits = _limits.get(loop)
+    if limits is None:
+        limits = _limits[loop] = {name: asyncio.Semaphore(n) for name, n in TOOL_CONCURRENCY.items()}
+    return limits[kind]
+
+
+async def run_blocking(kind: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """在线程池中执行 fn，同一类别（parse/summary/export）同时执行的任务数受限"""
+    loop = asyncio.get_running_loop()
+    async with _limit(loop, kind):
+        return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+_DONE = object()
+
+
+async def iterate_blocking(kind: str, iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """
+    在线程池中逐项推进阻塞迭代器，整个迭代期间占用一个 kind 类别的并发名额
+
+    提前结束（客户端断开等）时在线程池中关闭迭代器，释放其持有的连接。
+    迭代器可能在不同的线程中推进，不能依赖线程局部的 SQLite 连接。
+    """
+    loop = asyncio.get_running_loop()
+    async with _limit(loop, kind):
+        try:
+            while True:
+                item = await loop.run_in_executor(_executor, next, iterator, _DONE)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await loop.run_in_executor(_executor, close)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+汇报明细查询
+
+按司机、车辆、地点、采集日期范围与时段筛选，按 id 倒序分页。分页使用键集游标
+（上一页最后一条的 id，WHERE id < ?）而不是 OFFSET：每页只读取本页的行，翻到
+多深耗时都不变。司机、车辆、地点的单列索引隐含 id，等值筛选加 id 范围直接在
+索引上定位。
+
+SQL 文本只由出现了哪些条件决定，取值一律绑定参数，每个线程的连接复用
+sqlite3 的语句缓存，同类查询不会重复编译。日期范围涉及已归档的月份时，经
+archive.report_tables 附加归档库，每组各取一页后按 id 合并。
+"""
+
+import functools
+from typing import Dict, Optional, Tuple
+
+from archive import report_tables
+from metrics import PHASE_SECONDS
+from storage import DB_PATH, get_connection
+
+# 参数名 -> 条件
+QUERY_FILTERS = (
+    ("driver_name", "driver_name = ?"),
+    ("vehicle_number", "vehicle_number = ?"),
+    ("collection_location", "collection_location = ?"),
+    ("collection_time_period", "collection_time_period = ?"),
+    ("start_date", "collection_date >= ?"),
+    ("end_date", "collection_date <= ?"),
+)
+
+REPORT_FIELDS = (
+    "id", "driver_name", "vehicle_number", "collection_task", "collection_segments",
+    "collection_location", "collection_date", "collection_time_period", "driving_distance",
+    "created_at", "submit_count",
+)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+
+@functools.lru_cache(maxsize=256)
+def _query_sql(table: str, filters: Tuple[str, ...], after_cursor: bool, with_text: bool) -> str:
+    conditions = [clause for name, clause in QUERY_FILTERS if name in filters]
+    if after_cursor:
+        conditions.append("id < ?")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    columns = REPORT_FIELDS + ("raw_text",) if with_text else REPORT_FIELDS
+    return f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY id DESC LIMIT ?"
+
+
+def _decode_cursor(cursor) -> Optional[int]:
+    if cursor is None or cursor == "":
+        return None
+    try:
+        return int(cursor)
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的分页游标: {cursor}")
+
+
+def query_reports(db_path: str = DB_PATH, driver_name: Optional[str] = None, vehicle_number: Optional[str] = None,
+                  collection_location: Optional[str] = None, collection_time_period: Optional[str] = None,
+                  start_date: Optional[str] = None, end_date: Optional[str] = None, cursor: Optional[str] = None,
+                  page_size: int = DEFAULT_PAGE_SIZE, include_raw_text: bool = False) -> Dict:
+    """
+    按条件分页查询汇报明细，最新的在前
+
+    返回 {"reports", "next_cursor", "page_size"}；next_cursor 传回 cursor 参数获取下一页，
+    为 None 时已是最后一页。没有匹配的汇报时 reports 为空列表，另附 message 说明。
+    include_raw_text 为 True 时每条附带解压后的 raw_text。
+    """
+    try:
+        page_size = min(max(1, int(page_size)), MAX_PAGE_SIZE)
+        before = _decode_cursor(cursor)
+        values = {
+            "driver_name": driver_name,
+            "vehicle_number": vehicle_number,
+            "collection_location": collection_location,
+            "collection_time_period": collection_time_period,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        filters = tuple(name for name, _ in QUERY_FILTERS if values[name] is not None)
+        params = [values[name] for name in filters]
+        if before is not None:
+            params.append(before)
+        # 多取一条用来判断是否还有下一页
+        params.append(page_size + 1)
+
+        conn = get_connection(db_path)
+        rows = []
+        with PHASE_SECONDS.time("db_read"):
+            for table in report_tables(conn, db_path, start_date, end_date, with_text=include_raw_text):
+                rows.extend(conn.execute(_query_sql(table, filters, before is not None, include_raw_text), params))
+        rows.sort(key=lambda row: row[0], reverse=True)
+
+        fields = REPORT_FIELDS + ("raw_text",) if include_raw_text else REPORT_FIELDS
+        page = rows[:page_size]
+        result = {
+            "reports": [dict(zip(fields, row)) for row in page],
+            "next_cursor": str(page[-1][0]) if len(rows) > page_size else None,
+            "page_size": page_size,
+        }
+        if not page:
+            result["message"] = "暂无数据"
+        return result
+    except Exception as e:
+        return {'error': str(e)}
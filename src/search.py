@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+汇报全文检索
+
+在 report_search（raw_text 与 collection_task 的 FTS5 trigram 索引）上检索，
+按 bm25 相关度排序并分页。查询按空白拆成若干词，所有词都须出现；
+trigram 索引只能匹配不少于 3 个字符的词，含更短的词时退回 LIKE 扫描，
+按 id 倒序返回；LIKE 扫描需要逐条解压原文，比索引检索慢得多。
+检索前先处理外部工具删改汇报后留在 report_search_queue 中的索引更新。
+"""
+
+import sqlite3
+from typing import Dict, List, Tuple
+
+from metrics import PHASE_SECONDS
+from storage import DB_PATH, get_connection, sync_search_index
+
+MIN_INDEXED_LENGTH = 3
+MAX_PAGE_SIZE = 100
+
+HIT_COLUMNS = "d.id, d.driver_name, d.vehicle_number, d.collection_date, d.collection_location, d.collection_task"
+
+
+def _terms(query: str) -> List[str]:
+    terms = query.split()
+    if not terms:
+        raise ValueError("检索词为空")
+    return terms
+
+
+def _match_expression(terms: List[str]) -> str:
+    """每个词作为短语引用，避免用户输入被当作 FTS5 查询语法"""
+    return " AND ".join('"%s"' % term.replace('"', '""') for term in terms)
+
+
+def _fts_search(conn: sqlite3.Connection, terms: List[str], limit: int, offset: int) -> Tuple[int, List]:
+    match = _match_expression(terms)
+    total = conn.execute("SELECT COUNT(*) FROM report_search WHERE report_search MATCH ?", (match,)).fetchone()[0]
+    rows = conn.execute(f'''
+        SELECT {HIT_COLUMNS},
+               snippet(report_search, -1, '【', '】', '…', 16), bm25(report_search)
+        FROM report_search JOIN driver_reports d ON d.id = report_search.rowid
+        WHERE report_search MATCH ?
+        ORDER BY bm25(report_search) LIMIT ? OFFSET ?
+    ''', (match, limit, offset)).fetchall()
+    return total, rows
+
+
+def _like_search(conn: sqlite3.Connection, terms: List[str], limit: int, offset: int) -> Tuple[int, List]:
+    patterns = []
+    conditions = []
+    for term in terms:
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        conditions.append("(d.raw_text LIKE ? ESCAPE '\\' OR d.collection_task LIKE ? ESCAPE '\\')")
+        patterns += [f"%{escaped}%"] * 2
+    where = " AND ".join(conditions)
+    total = conn.execute(f"SELECT COUNT(*) FROM driver_reports_with_text d WHERE {where}", patterns).fetchone()[0]
+    rows = conn.execute(f'''
+        SELECT {HIT_COLUMNS}, substr(d.raw_text, 1, 64), NULL
+        FROM driver_reports_with_text d WHERE {where}
+        ORDER BY d.id DESC LIMIT ? OFFSET ?
+    ''', patterns + [limit, offset]).fetchall()
+    return total, rows
+
+
+def search_reports(query: str, page: int = 1, page_size: int = 20, db_path: str = DB_PATH) -> Dict:
+    """
+    检索原始汇报文本与采集任务
+
+    返回 {"query", "total", "page", "page_size", "hits"}，hits 每项含 id、司机、车辆、
+    日期、地点、任务、命中片段 snippet（命中处以【】标出）与 score（bm25，越小越相关；
+    LIKE 退回时为 None）。
+    """
+    try:
+        terms = _terms(query)
+        page = max(1, int(page))
+        page_size = min(max(1, int(page_size)), MAX_PAGE_SIZE)
+        conn = get_connection(db_path)
+        if conn.execute("SELECT 1 FROM report_search_queue LIMIT 1").fetchone():
+            with conn:
+                sync_search_index(conn)
+        search = _fts_search if all(len(term) >= MIN_INDEXED_LENGTH for term in terms) else _like_search
+        with PHASE_SECONDS.time("db_read"):
+            total, rows = search(conn, terms, page_size, (page - 1) * page_size)
+        hits = [
+            {
+                "id": report_id,
+                "driver_name": driver_name,
+                "vehicle_number": vehicle_number,
+                "collection_date": collection_date,
+                "collection_location": collection_location,
+                "collection_task": collection_task,
+                "snippet": snippet,
+                "score": round(score, 4) if score is not None else None,
+            }
+            for (report_id, driver_name, vehicle_number, collection_date, collection_location,
+                 collection_task, snippet, score) in rows
+        ]
+        return {"query": query, "total": total, "page": page, "page_size": page_size, "hits": hits}
+    except Exception as e:
+        return {'error': str(e)}
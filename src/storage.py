@@ -0,0 +1,768 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 存储
+
+数据库初始化与汇报写入。批量写入在一个事务内用 executemany 完成，
+整批只提交（fsync）一次。
+
+summary_totals / summary_counts 是 driver_reports 的物化汇总，由触发器
+在每次插入、更新、删除时增量维护，汇总查询只需读取这两张小表。
+
+连接统一由 get_connection 按线程复用，数据库使用 WAL 日志：读取不会被
+写入阻塞，写入之间的锁冲突由 busy_timeout 等待而不是立即报错。
+connect 新建连接时检查 PRAGMA user_version，结构落后（含旧版脚本创建的
+数据库）时先建表并执行迁移，调用方不需要事先调用 init_database。
+
+content_hash 列保存规范化原文的哈希并建唯一索引，重复提交的汇报按
+DUPLICATE_POLICIES 跳过、更新或计数，不会重复计入汇总。
+
+report_rollups 按日、周、月分桶，以 (司机, 车辆, 地点, 时段) 组合为键累计
+报告数、段数与里程，同样由触发器增量维护，趋势查询只读取这张表。
+
+report_search 是原文与 collection_task 的 FTS5 全文索引（trigram 分词，
+适用于中文），以 driver_reports_with_text 视图为外部内容表。新汇报由
+save_reports_batch 直接写入索引；删除与修改 collection_task 只由触发器把
+原先索引的值记入 report_search_queue，之后由 sync_search_index 更新索引并
+清理已删除汇报的原文。触发器不依赖应用注册的函数，sqlite3 命令行等外部
+工具也能直接删改 driver_reports。
+
+archive 模块把旧汇报按月移入归档库时会置位 archive_state.active，此时删除
+不从 summary_* 与 report_rollups 中扣减：汇总与趋势仍包含已归档的数据。
+rebuild_summary / rebuild_rollups 全量重建时同样读取归档库。
+
+原始文本不在 driver_reports 中，而是用共享字典压缩后按相同 id 存放在
+report_texts，扫描结构化列时不再读取原文。只有显式需要原文时（导出
+raw_text 列、get_raw_texts、全文检索的命中片段）才解压；视图
+driver_reports_with_text 给出带 raw_text 列的完整记录，读取该视图依赖
+connect 注册的 decompress_text 函数。
+"""
+
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import (DB_PATH, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE,
+                    SQLITE_STATEMENT_CACHE_SIZE)
+from metrics import DUPLICATE_REPORTS, PHASE_SECONDS, ROWS_INGESTED
+from textstore import SEED_DICTIONARY, SEED_DICTIONARY_ID, TextCodec, train_dictionary
+
+# driver_reports 的全部列，归档库使用相同的列
+REPORT_COLUMNS = (
+    "id", "driver_name", "vehicle_number", "collection_task", "collection_segments",
+    "collection_location", "collection_date", "collection_time_period", "driving_distance",
+    "created_at", "content_hash", "submit_count",
+)
+
+INSERT_SQL = '''
+    INSERT INTO driver_reports
+    (driver_name, vehicle_number, collection_task, collection_segments,
+     collection_location, collection_date, collection_time_period,
+     driving_distance, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_TEXT_SQL = "INSERT INTO report_texts (id, dictionary_id, data) VALUES (?, ?, ?)"
+
+INSERT_SEARCH_SQL = "INSERT INTO report_search (rowid, raw_text, collection_task) VALUES (?, ?, ?)"
+
+# 同一 content_hash 再次提交时的处理：
+# skip 保留原记录；update 用新的解析结果覆盖；count 只累加提交次数
+DUPLICATE_POLICIES = {
+    "skip": "ON CONFLICT (content_hash) DO NOTHING",
+    "update": '''ON CONFLICT (content_hash) DO UPDATE SET
+        driver_name = excluded.driver_name,
+        vehicle_number = excluded.vehicle_number,
+        collection_task = excluded.collection_task,
+        collection_segments = excluded.collection_segments,
+        collection_location = excluded.collection_location,
+        collection_date = excluded.collection_date,
+        collection_time_period = excluded.collection_time_period,
+        driving_distance = excluded.driving_distance,
+        submit_count = submit_count + 1''',
+    "count": "ON CONFLICT (content_hash) DO UPDATE SET submit_count = submit_count + 1",
+}
+
+# 重建物化汇总与趋势分桶用到的列
+REBUILD_COLUMNS = (
+    "driver_name", "vehicle_number", "collection_segments", "collection_location",
+    "collection_date", "collection_time_period", "driving_distance", "created_at",
+)
+
+# summary_counts 的维度 -> driver_reports 中的列
+SUMMARY_DIMENSIONS = {
+    "driver": "driver_name",
+    "location": "collection_location",
+    "time_period": "collection_time_period",
+}
+
+SUMMARY_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS summary_totals (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_reports INTEGER NOT NULL DEFAULT 0,
+        total_drivers INTEGER NOT NULL DEFAULT 0,
+        total_segments INTEGER NOT NULL DEFAULT 0,
+        total_distance REAL NOT NULL DEFAULT 0,
+        latest_update TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS summary_counts (
+        dimension TEXT NOT NULL,
+        key TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (dimension, key)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_driver_reports_created_at ON driver_reports (created_at);
+'''
+
+
+def _summary_add(row: str) -> str:
+    """把 NEW 行计入汇总的触发器语句"""
+    statements = [f'''
+        UPDATE summary_totals SET
+            total_reports = total_reports + 1,
+            total_drivers = total_drivers + ({row}.driver_name IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM summary_counts WHERE dimension = 'driver' AND key = {row}.driver_name)),
+            total_segments = total_segments + COALESCE({row}.collection_segments, 0),
+            total_distance = total_distance + COALESCE({row}.driving_distance, 0),
+            latest_update = CASE WHEN latest_update IS NULL OR {row}.created_at > latest_update
+                                 THEN {row}.created_at ELSE latest_update END
+        WHERE id = 1;''']
+    for dimension, column in SUMMARY_DIMENSIONS.items():
+        statements.append(f'''
+        INSERT INTO summary_counts (dimension, key, count)
+        SELECT '{dimension}', {row}.{column}, 1 WHERE {row}.{column} IS NOT NULL
+        ON CONFLICT (dimension, key) DO UPDATE SET count = count + 1;''')
+    return "".join(statements)
+
+
+def _summary_remove(row: str) -> str:
+    """把 OLD 行移出汇总的触发器语句"""
+    statements = []
+    for dimension, column in SUMMARY_DIMENSIONS.items():
+        statements.append(f'''
+        UPDATE summary_counts SET count = count - 1
+        WHERE dimension = '{dimension}' AND key = {row}.{column};''')
+    statements.append(f'''
+        UPDATE summary_totals SET
+            total_reports = total_reports - 1,
+            total_drivers = total_drivers - (SELECT COUNT(*) FROM summary_counts
+                WHERE dimension = 'driver' AND key = {row}.driver_name AND count <= 0),
+            total_segments = total_segments - COALESCE({row}.collection_segments, 0),
+            total_distance = total_distance - COALESCE({row}.driving_distance, 0),
+            latest_update = (SELECT MAX(created_at) FROM driver_reports)
+        WHERE id = 1;
+        DELETE FROM summary_counts WHERE count <= 0;''')
+    return "".join(statements)
+
+
+SUMMARY_TRIGGERS = f'''
+    CREATE TRIGGER IF NOT EXISTS trg_driver_reports_summary_insert
+    AFTER INSERT ON driver_reports
+    BEGIN{_summary_add("NEW")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_driver_reports_summary_delete
+    AFTER DELETE ON driver_reports
+    BEGIN{_summary_remove("OLD")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_driver_reports_summary_update
+    AFTER UPDATE OF driver_name, collection_segments, collection_location,
+                    collection_time_period, driving_distance, created_at
+    ON driver_reports
+    BEGIN{_summary_remove("OLD")}{_summary_add("NEW")}
+    END;
+'''
+
+
+# report_rollups 的粒度 -> 由采集日期计算桶的表达式；周以周一为桶
+ROLLUP_GRANULARITIES = {
+    "day": "date({date})",
+    "week": "date({date}, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m', {date})",
+}
+
+# report_rollups 的键列；driver_reports 中为 NULL 的值以空串计入
+ROLLUP_KEYS = ("driver_name", "vehicle_number", "collection_location", "collection_time_period")
+
+
+def _rollup_add(row: str) -> str:
+    """把 NEW 行计入各粒度分桶的触发器语句，日期无法识别的行不计入"""
+    keys = ", ".join(ROLLUP_KEYS)
+    values = ", ".join(f"COALESCE({row}.{key}, '')" for key in ROLLUP_KEYS)
+    return "".join(f'''
+        INSERT INTO report_rollups (granularity, bucket, {keys}, reports, segments, distance)
+        SELECT '{granularity}', bucket, {values}, 1,
+               COALESCE({row}.collection_segments, 0), COALESCE({row}.driving_distance, 0)
+        FROM (SELECT {expression.format(date=f"{row}.collection_date")} AS bucket) WHERE bucket IS NOT NULL
+        ON CONFLICT DO UPDATE SET
+            reports = reports + 1,
+            segments = segments + excluded.segments,
+            distance = distance + excluded.distance;'''
+        for granularity, expression in ROLLUP_GRANULARITIES.items())
+
+
+def _rollup_remove(row: str) -> str:
+    """把 OLD 行移出各粒度分桶的触发器语句，计数归零的桶随之删除"""
+    key_match = " AND ".join(f"{key} = COALESCE({row}.{key}, '')" for key in ROLLUP_KEYS)
+    statements = []
+    for granularity, expression in ROLLUP_GRANULARITIES.items():
+        match = (f"granularity = '{granularity}' AND bucket = "
+                 f"{expression.format(date=f'{row}.collection_date')} AND {key_match}")
+        statements.append(f'''
+        UPDATE report_rollups SET
+            reports = reports - 1,
+            segments = segments - COALESCE({row}.collection_segments, 0),
+            distance = distance - COALESCE({row}.driving_distance, 0)
+        WHERE {match};
+        DELETE FROM report_rollups WHERE {match} AND reports <= 0;''')
+    return "".join(statements)
+
+
+def _rollup_backfill(source: str = "driver_reports") -> Tuple[str, ...]:
+    """从 source（默认 driver_reports）一次性聚合出各粒度分桶的语句"""
+    keys = ", ".join(ROLLUP_KEYS)
+    values = ", ".join(f"COALESCE({key}, '') AS {key}" for key in ROLLUP_KEYS)
+    return tuple(f'''
+        INSERT INTO report_rollups (granularity, bucket, {keys}, reports, segments, distance)
+        SELECT '{granularity}', bucket, {keys}, COUNT(*), SUM(segments), SUM(distance)
+        FROM (SELECT {expression.format(date="collection_date")} AS bucket, {values},
+                     COALESCE(collection_segments, 0) AS segments, COALESCE(driving_distance, 0) AS distance
+              FROM {source})
+        WHERE bucket IS NOT NULL
+        GROUP BY bucket, {keys}'''
+        for granularity, expression in ROLLUP_GRANULARITIES.items())
+
+
+# 按顺序执行的结构迁移，第 N 项把 PRAGMA user_version 升级到 N。
+# 只能在末尾追加，已发布的迁移不可修改。
+MIGRATIONS: List[Tuple[str, ...]] = [
+    # 1: 常用筛选列索引；(collection_date, driver_name) 同时覆盖按日期的范围查询
+    (
+        "CREATE INDEX IF NOT EXISTS idx_driver_reports_driver ON driver_reports (driver_name)",
+        "CREATE INDEX IF NOT EXISTS idx_driver_reports_vehicle ON driver_reports (vehicle_number)",
+        "CREATE INDEX IF NOT EXISTS idx_driver_reports_location ON driver_reports (collection_location)",
+        "CREATE INDEX IF NOT EXISTS idx_driver_reports_date_driver ON driver_reports (collection_date, driver_name)",
+    ),
+    # 2: 规范化原文哈希去重；已有的重复记录保留，只有每组最早的一条参与唯一约束
+    (
+        "ALTER TABLE driver_reports ADD COLUMN content_hash TEXT",
+        "ALTER TABLE driver_reports ADD COLUMN submit_count INTEGER NOT NULL DEFAULT 1",
+        "UPDATE driver_reports SET content_hash = content_hash(raw_text) WHERE raw_text IS NOT NULL",
+        '''UPDATE driver_reports SET content_hash = NULL
+           WHERE id NOT IN (SELECT MIN(id) FROM driver_reports GROUP BY content_hash)''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_driver_reports_content_hash ON driver_reports (content_hash)",
+    ),
+    # 3: driver_reports 的变更计数，作为查询结果缓存的版本号
+    (
+        '''CREATE TABLE IF NOT EXISTS data_version (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               version INTEGER NOT NULL
+           )''',
+        "INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)",
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_version_insert AFTER INSERT ON driver_reports
+           BEGIN UPDATE data_version SET version = version + 1 WHERE id = 1; END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_version_delete AFTER DELETE ON driver_reports
+           BEGIN UPDATE data_version SET version = version + 1 WHERE id = 1; END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_version_update AFTER UPDATE ON driver_reports
+           BEGIN UPDATE data_version SET version = version + 1 WHERE id = 1; END''',
+    ),
+    # 4: 按日/周/月分桶的趋势汇总，由触发器增量维护，并从已有数据回填
+    (
+        '''CREATE TABLE IF NOT EXISTS report_rollups (
+               granularity TEXT NOT NULL,
+               bucket TEXT NOT NULL,
+               driver_name TEXT NOT NULL,
+               vehicle_number TEXT NOT NULL,
+               collection_location TEXT NOT NULL,
+               collection_time_period TEXT NOT NULL,
+               reports INTEGER NOT NULL,
+               segments INTEGER NOT NULL,
+               distance REAL NOT NULL,
+               PRIMARY KEY (granularity, bucket, driver_name, vehicle_number,
+                            collection_location, collection_time_period)
+           ) WITHOUT ROWID''',
+        *_rollup_backfill(),
+        f'''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_rollup_insert AFTER INSERT ON driver_reports
+           BEGIN{_rollup_add("NEW")}
+           END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_rollup_delete AFTER DELETE ON driver_reports
+           BEGIN{_rollup_remove("OLD")}
+           END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_rollup_update
+           AFTER UPDATE OF driver_name, vehicle_number, collection_segments, collection_location,
+                           collection_date, collection_time_period, driving_distance
+           ON driver_reports
+           BEGIN{_rollup_remove("OLD")}{_rollup_add("NEW")}
+           END''',
+    ),
+    # 5: raw_text / collection_task 全文索引，内容不重复存储，rebuild 从已有数据建索引
+    (
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS report_search USING fts5 (
+               raw_text, collection_task,
+               content = 'driver_reports', content_rowid = 'id', tokenize = 'trigram'
+           )''',
+        "INSERT INTO report_search (report_search) VALUES ('rebuild')",
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_search_insert AFTER INSERT ON driver_reports
+           BEGIN
+               INSERT INTO report_search (rowid, raw_text, collection_task)
+               VALUES (NEW.id, NEW.raw_text, NEW.collection_task);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_search_delete AFTER DELETE ON driver_reports
+           BEGIN
+               INSERT INTO report_search (report_search, rowid, raw_text, collection_task)
+               VALUES ('delete', OLD.id, OLD.raw_text, OLD.collection_task);
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_search_update
+           AFTER UPDATE OF raw_text, collection_task ON driver_reports
+           BEGIN
+               INSERT INTO report_search (report_search, rowid, raw_text, collection_task)
+               VALUES ('delete', OLD.id, OLD.raw_text, OLD.collection_task);
+               INSERT INTO report_search (rowid, raw_text, collection_task)
+               VALUES (NEW.id, NEW.raw_text, NEW.collection_task);
+           END''',
+    ),
+    # 6: 归档期间的删除不扣减物化汇总与趋势分桶
+    (
+        '''CREATE TABLE IF NOT EXISTS archive_state (
+               id INTEGER PRIMARY KEY CHECK (id = 1),
+               active INTEGER NOT NULL
+           )''',
+        "INSERT OR IGNORE INTO archive_state (id, active) VALUES (1, 0)",
+        "DROP TRIGGER IF EXISTS trg_driver_reports_summary_delete",
+        f'''CREATE TRIGGER trg_driver_reports_summary_delete AFTER DELETE ON driver_reports
+           WHEN NOT (SELECT active FROM archive_state WHERE id = 1)
+           BEGIN{_summary_remove("OLD")}
+           END''',
+        "DROP TRIGGER IF EXISTS trg_driver_reports_rollup_delete",
+        f'''CREATE TRIGGER trg_driver_reports_rollup_delete AFTER DELETE ON driver_reports
+           WHEN NOT (SELECT active FROM archive_state WHERE id = 1)
+           BEGIN{_rollup_remove("OLD")}
+           END''',
+    ),
+    # 7: 原文压缩后移入 report_texts；全文索引改以解压视图为外部内容表并重建
+    (
+        '''CREATE TABLE IF NOT EXISTS text_dictionaries (
+               id INTEGER PRIMARY KEY,
+               data BLOB NOT NULL,
+               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+           )''',
+        f"INSERT OR IGNORE INTO text_dictionaries (id, data) VALUES ({SEED_DICTIONARY_ID}, X'{SEED_DICTIONARY.hex()}')",
+        '''CREATE TABLE IF NOT EXISTS report_texts (
+               id INTEGER PRIMARY KEY,
+               dictionary_id INTEGER NOT NULL REFERENCES text_dictionaries (id),
+               data BLOB
+           )''',
+        f'''INSERT INTO report_texts (id, dictionary_id, data)
+           SELECT id, {SEED_DICTIONARY_ID}, compress_text({SEED_DICTIONARY_ID}, raw_text) FROM driver_reports''',
+        "DROP TRIGGER IF EXISTS trg_driver_reports_search_insert",
+        "DROP TRIGGER IF EXISTS trg_driver_reports_search_delete",
+        "DROP TRIGGER IF EXISTS trg_driver_reports_search_update",
+        "DROP TABLE IF EXISTS report_search",
+        "ALTER TABLE driver_reports DROP COLUMN raw_text",
+        '''CREATE VIEW IF NOT EXISTS driver_reports_with_text AS
+           SELECT d.*, decompress_text(t.dictionary_id, t.data) AS raw_text
+           FROM driver_reports d LEFT JOIN report_texts t ON t.id = d.id''',
+        '''CREATE VIRTUAL TABLE report_search USING fts5 (
+               raw_text, collection_task,
+               content = 'driver_reports_with_text', content_rowid = 'id', tokenize = 'trigram'
+           )''',
+        "INSERT INTO report_search (report_search) VALUES ('rebuild')",
+        '''CREATE TRIGGER IF NOT EXISTS trg_report_texts_search_insert AFTER INSERT ON report_texts
+           BEGIN
+               INSERT INTO report_search (rowid, raw_text, collection_task)
+               SELECT NEW.id, decompress_text(NEW.dictionary_id, NEW.data), collection_task
+               FROM driver_reports WHERE id = NEW.id;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_report_texts_search_update AFTER UPDATE ON report_texts
+           BEGIN
+               INSERT INTO report_search (report_search, rowid, raw_text, collection_task)
+               SELECT 'delete', OLD.id, decompress_text(OLD.dictionary_id, OLD.data), collection_task
+               FROM driver_reports WHERE id = OLD.id;
+               INSERT INTO report_search (rowid, raw_text, collection_task)
+               SELECT NEW.id, decompress_text(NEW.dictionary_id, NEW.data), collection_task
+               FROM driver_reports WHERE id = NEW.id;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_search_delete AFTER DELETE ON driver_reports
+           BEGIN
+               INSERT INTO report_search (report_search, rowid, raw_text, collection_task)
+               SELECT 'delete', OLD.id, decompress_text(dictionary_id, data), OLD.collection_task
+               FROM report_texts WHERE id = OLD.id;
+               DELETE FROM report_texts WHERE id = OLD.id;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_driver_reports_search_update
+           AFTER UPDATE OF collection_task ON driver_reports
+           BEGIN
+               INSERT INTO report_search (report_search, rowid, raw_text, collection_task)
+               SELECT 'delete', OLD.id, decompress_text(dictionary_id, data), OLD.collection_task
+               FROM report_texts WHERE id = OLD.id;
+               INSERT INTO report_search (rowid, raw_text, collection_task)
+               SELECT NEW.id, decompress_text(dictionary_id, data), NEW.collection_task
+               FROM report_texts WHERE id = NEW.id;
+           END''',
+    ),
+    # 8: 全文索引改由应用同步，触发器只记录待更新的行，不再调用 decompress_text
+    (
+        "DROP TRIGGER IF EXISTS trg_report_texts_search_insert",
+        "DROP TRIGGER IF EXISTS trg_report_texts_search_update",
+        "DROP TRIGGER IF EXISTS trg_driver_reports_search_delete",
+        "DROP TRIGGER IF EXISTS trg_driver_reports_search_update",
+        '''CREATE TABLE IF NOT EXISTS report_search_queue (
+               id INTEGER PRIMARY KEY,
+               collection_task TEXT
+           )''',
+        # 同一行多次变更时保留最早记录的值，即索引中实际存放的值
+        '''CREATE TRIGGER trg_driver_reports_search_delete AFTER DELETE ON driver_reports
+           BEGIN
+               INSERT OR IGNORE INTO report_search_queue (id, collection_task) VALUES (OLD.id, OLD.collection_task);
+           END''',
+        '''CREATE TRIGGER trg_driver_reports_search_update AFTER UPDATE OF collection_task ON driver_reports
+           WHEN OLD.collection_task IS NOT NEW.collection_task
+           BEGIN
+               INSERT OR IGNORE INTO report_search_queue (id, collection_task) VALUES (OLD.id, OLD.collection_task);
+           END''',
+    ),
+]
+
+
+def normalize_report(text: str) -> str:
+    """去掉每行首尾空白与空行，统一换行符，用于判断重复提交"""
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def content_hash(text: Optional[str]) -> Optional[str]:
+    """规范化原文的哈希；同一汇报重发（缩进、空行、换行符不同）得到相同的值"""
+    if text is None:
+        return None
+    return hashlib.blake2b(normalize_report(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+_local = threading.local()
+
+
+class ReportConnection(sqlite3.Connection):
+    """带原文编解码器的连接，由 connect 创建"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.text_codec = TextCodec(self)
+
+
+def connect(db_path: str = DB_PATH, check_same_thread: bool = True) -> ReportConnection:
+    """新建一个已设置 WAL 与性能参数的连接，调用方负责关闭"""
+    # uri=True 让 ATTACH 接受 file:...?mode=ro 形式的只读归档库；普通路径不受影响
+    conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                           check_same_thread=check_same_thread, factory=ReportConnection,
+                           cached_statements=SQLITE_STATEMENT_CACHE_SIZE, uri=True)
+    conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    # WAL 下 NORMAL 只在检查点时 fsync，断电最多丢失最近提交而不会损坏数据库
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    conn.create_function("content_hash", 1, content_hash, deterministic=True)
+    codec = conn.text_codec
+    conn.create_function("decompress_text", 2, codec.decompress, deterministic=True)
+    conn.create_function("compress_text", 2, lambda dictionary_id, text: codec.compress(text, dictionary_id),
+                         deterministic=True)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < len(MIGRATIONS):
+        _create_schema(conn)
+    return conn
+
+
+def get_connection(db_path: str = DB_PATH) -> ReportConnection:
+    """返回当前线程复用的连接，同一线程内对同一数据库只建立一次连接"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = connect(db_path)
+    return conn
+
+
+def close_connections():
+    """关闭当前线程缓存的所有连接"""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """把已有数据库原地升级到最新结构版本，返回执行的迁移数"""
+    applied = 0
+    while True:
+        # 在写事务内读取版本号，多个连接同时升级时每个迁移只执行一次
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                conn.commit()
+                break
+            for statement in MIGRATIONS[version]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied += 1
+    if applied:
+        # 刷新统计信息，让查询规划器用上新索引。只分析 driver_reports：FTS5 影子表
+        # 在建表时为空，留下的统计会让其内部查询选错计划，入库随数据量增长急剧变慢
+        conn.execute("ANALYZE driver_reports")
+    return applied
+
+
+def _create_schema(conn: sqlite3.Connection):
+    """建立基础表与汇总触发器并执行迁移，可重复调用"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS driver_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            driver_name TEXT,
+            vehicle_number TEXT,
+            collection_task TEXT,
+            collection_segments INTEGER,
+            collection_location TEXT,
+            collection_date TEXT,
+            collection_time_period TEXT,
+            driving_distance REAL,
+            raw_text TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # 流式导入的断点：与对应批次在同一事务内更新
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_progress (
+            source TEXT PRIMARY KEY,
+            byte_offset INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.executescript(SUMMARY_SCHEMA)
+    if cursor.execute("SELECT 1 FROM summary_totals").fetchone() is None:
+        rebuild_summary(conn)
+    cursor.executescript(SUMMARY_TRIGGERS)
+    conn.commit()
+    migrate(conn)
+
+
+def init_database(db_path: str = DB_PATH):
+    """初始化数据库"""
+    _create_schema(get_connection(db_path))
+
+
+def data_version(conn: sqlite3.Connection) -> int:
+    """driver_reports 的变更计数，任何插入、更新、删除提交后都会增大"""
+    return conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()[0]
+
+
+def _bump_data_version(conn: sqlite3.Connection):
+    # 汇总表被重写，让按版本号缓存的查询结果失效（首次建库时版本表尚未创建）
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'data_version'").fetchone():
+        conn.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def _with_archived(conn: sqlite3.Connection, db_path: Optional[str]) -> str:
+    """
+    把归档库中的汇报复制到临时表 archived_reports，返回与热库合并后的表表达式
+
+    归档库逐组附加，复制完一组提交一次再 DETACH；热库在调用方的写事务内读取，
+    重建期间的写入不会丢失。没有归档时直接返回 "driver_reports"。
+    """
+    from archive import list_archives, report_tables  # archive 依赖本模块，在此延迟导入
+
+    if db_path is None:
+        db_path = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+    # 内存数据库没有对应的归档目录
+    if not db_path or not list_archives(db_path):
+        return "driver_reports"
+    columns = ", ".join(REBUILD_COLUMNS)
+    conn.execute("DROP TABLE IF EXISTS temp.archived_reports")
+    conn.execute(f"CREATE TEMP TABLE archived_reports AS SELECT {columns} FROM main.driver_reports WHERE 0")
+    for table in report_tables(conn, db_path, include_hot=False):
+        with conn:
+            conn.execute(f"INSERT INTO temp.archived_reports SELECT {columns} FROM {table}")
+    return f"(SELECT {columns} FROM main.driver_reports UNION ALL SELECT {columns} FROM temp.archived_reports)"
+
+
+def rebuild_summary(conn: sqlite3.Connection, db_path: Optional[str] = None):
+    """
+    从 driver_reports 与已归档的汇报全量重建物化汇总（首次建表或修复时使用）
+
+    db_path 用于查找归档目录，默认为 conn 的主库文件。不要与 archive_reports 同时运行。
+    """
+    source = _with_archived(conn, db_path)
+    with conn:
+        conn.execute("DELETE FROM summary_totals")
+        conn.execute("DELETE FROM summary_counts")
+        conn.execute(f'''
+            INSERT INTO summary_totals
+            (id, total_reports, total_drivers, total_segments, total_distance, latest_update)
+            SELECT 1, COUNT(*), COUNT(DISTINCT driver_name),
+                   COALESCE(SUM(collection_segments), 0), COALESCE(SUM(driving_distance), 0),
+                   MAX(created_at)
+            FROM {source}
+        ''')
+        for dimension, column in SUMMARY_DIMENSIONS.items():
+            conn.execute(f'''
+                INSERT INTO summary_counts (dimension, key, count)
+                SELECT ?, {column}, COUNT(*) FROM {source}
+                WHERE {column} IS NOT NULL GROUP BY {column}
+            ''', (dimension,))
+        _bump_data_version(conn)
+    conn.execute("DROP TABLE IF EXISTS temp.archived_reports")
+
+
+def rebuild_rollups(conn: sqlite3.Connection, db_path: Optional[str] = None):
+    """从 driver_reports 与已归档的汇报全量重建趋势分桶（修复时使用），参数同 rebuild_summary"""
+    source = _with_archived(conn, db_path)
+    with conn:
+        conn.execute("DELETE FROM report_rollups")
+        for statement in _rollup_backfill(source):
+            conn.execute(statement)
+        _bump_data_version(conn)
+    conn.execute("DROP TABLE IF EXISTS temp.archived_reports")
+
+
+def _row(data: Dict, raw_text: str) -> Tuple:
+    return (
+        data["driver_name"], data["vehicle_number"], data["collection_task"],
+        data["collection_segments"], data["collection_location"],
+        data["collection_date"], data["collection_time_period"],
+        data["driving_distance"], content_hash(raw_text)
+    )
+
+
+def save_to_database(data: Dict, raw_text: str, db_path: str = DB_PATH,
+                     on_duplicate: str = "skip") -> int:
+    """保存数据到SQLite数据库，返回新增行数（重复提交时为 0）"""
+    return save_reports_batch([(data, raw_text)], db_path, on_duplicate=on_duplicate)
+
+
+def save_reports_batch(items: Iterable[Tuple[Dict, str]], db_path: str = DB_PATH,
+                       checkpoint: Optional[Tuple[str, int]] = None,
+                       on_duplicate: str = "skip") -> int:
+    """
+    在单个事务中批量保存 (解析结果, 原始文本)，返回新增行数
+
+    原文与已有记录重复时按 on_duplicate（skip/update/count）处理，不计入新增。
+    checkpoint 为 (来源, 字节偏移) 时在同一事务内记录导入进度，
+    保证断点与已写入的数据一致。任一行写入失败时整批回滚。
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError(f"未知的重复处理方式: {on_duplicate}")
+    rows = []
+    texts = {}
+    for data, raw_text in items:
+        row = _row(data, raw_text)
+        rows.append(row)
+        texts.setdefault(row[-1], raw_text)
+    if not rows and checkpoint is None:
+        return 0
+
+    conn = get_connection(db_path)
+    codec = conn.text_codec
+    with PHASE_SECONDS.time("db_write"), conn:
+        conn.execute("BEGIN IMMEDIATE")
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM driver_reports").fetchone()[0]
+        conn.executemany(INSERT_SQL + DUPLICATE_POLICIES[on_duplicate], rows)
+        # 新增行按 content_hash 对应到原文，压缩后写入 report_texts，原文直接写入全文索引
+        new_rows = conn.execute("SELECT id, content_hash, collection_task FROM driver_reports WHERE id > ?",
+                                (last_id,)).fetchall()
+        inserted = len(new_rows)
+        if new_rows:
+            dictionary_id = codec.latest_dictionary_id()
+            conn.executemany(INSERT_TEXT_SQL, [
+                (report_id, dictionary_id, codec.compress(texts[digest], dictionary_id))
+                for report_id, digest, _ in new_rows
+            ])
+            # 同一批内被 update 策略改写的新增行尚未进入索引，不需要排队
+            conn.execute("DELETE FROM report_search_queue WHERE id > ?", (last_id,))
+            conn.executemany(INSERT_SEARCH_SQL, [
+                (report_id, texts[digest], collection_task) for report_id, digest, collection_task in new_rows
+            ])
+        if on_duplicate == "update":
+            sync_search_index(conn)
+        if checkpoint is not None:
+            conn.execute('''
+                INSERT INTO ingest_progress (source, byte_offset) VALUES (?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    byte_offset = excluded.byte_offset,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', checkpoint)
+    if inserted:
+        ROWS_INGESTED.inc(amount=inserted)
+    if len(rows) > inserted:
+        DUPLICATE_REPORTS.inc(amount=len(rows) - inserted)
+    return inserted
+
+
+def sync_search_index(conn: sqlite3.Connection) -> int:
+    """
+    按 report_search_queue 更新全文索引，返回处理的行数
+
+    队列中的行先用原先索引的值从索引删除，仍存在的重新写入当前值，已删除
+    汇报的原文随之清理。conn 须由 connect 创建；调用方负责事务。
+    """
+    pending = conn.execute("SELECT COUNT(*) FROM report_search_queue").fetchone()[0]
+    if not pending:
+        return 0
+    conn.execute('''
+        INSERT INTO report_search (report_search, rowid, raw_text, collection_task)
+        SELECT 'delete', q.id, decompress_text(t.dictionary_id, t.data), q.collection_task
+        FROM report_search_queue q LEFT JOIN report_texts t ON t.id = q.id
+    ''')
+    conn.execute('''
+        INSERT INTO report_search (rowid, raw_text, collection_task)
+        SELECT d.id, decompress_text(t.dictionary_id, t.data), d.collection_task
+        FROM report_search_queue q JOIN driver_reports d ON d.id = q.id LEFT JOIN report_texts t ON t.id = q.id
+    ''')
+    conn.execute('''
+        DELETE FROM report_texts WHERE id IN (
+            SELECT id FROM report_search_queue WHERE id NOT IN (SELECT id FROM driver_reports))
+    ''')
+    conn.execute("DELETE FROM report_search_queue")
+    return pending
+
+
+def get_raw_texts(ids: Iterable[int], db_path: str = DB_PATH) -> Dict[int, str]:
+    """按 id 读取并解压原始文本，用于审计与重新解析；不存在的 id 不出现在结果中"""
+    conn = get_connection(db_path)
+    codec = conn.text_codec
+    texts = {}
+    ids = list(ids)
+    # 分批查询，避免超过 SQLite 的参数个数上限
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        for report_id, dictionary_id, data in conn.execute(
+                f"SELECT id, dictionary_id, data FROM report_texts WHERE id IN ({', '.join('?' * len(batch))})",
+                batch):
+            texts[report_id] = codec.decompress(dictionary_id, data)
+    return texts
+
+
+def train_text_dictionary(db_path: str = DB_PATH, sample_size: int = 2000, size: int = 16384) -> int:
+    """
+    从最近的 sample_size 条汇报生成新的压缩字典，返回字典编号
+
+    之后写入的汇报使用新字典，已有记录保持原字典，不需要重写。
+    """
+    conn = get_connection(db_path)
+    ids = [row[0] for row in conn.execute(
+        "SELECT id FROM report_texts WHERE data IS NOT NULL ORDER BY id DESC LIMIT ?", (sample_size,))]
+    texts = get_raw_texts(reversed(ids), db_path)
+    if not texts:
+        raise ValueError("没有可用于训练字典的汇报")
+    samples = [normalize_report(texts[report_id]) for report_id in sorted(texts)]
+    with conn:
+        cursor = conn.execute("INSERT INTO text_dictionaries (data) VALUES (?)", (train_dictionary(samples, size),))
+    return cursor.lastrowid
+
+
+def get_ingest_offset(source: str, db_path: str = DB_PATH) -> int:
+    """返回来源文件已提交的字节偏移，未导入过时为 0"""
+    row = get_connection(db_path).execute(
+        "SELECT byte_offset FROM ingest_progress WHERE source = ?", (source,)
+    ).fetchone()
+    return row[0] if row else 0
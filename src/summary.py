@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集数据汇总
+
+无筛选条件时只读取触发器维护的 summary_totals / summary_counts，耗时与
+driver_reports 行数无关；带筛选条件时在 SQLite 内用 COUNT/SUM/GROUP BY 聚合，
+只读取结构化列，不读取 raw_text。日期范围涉及已归档的月份时，经
+archive.report_tables 附加对应归档库一起聚合。
+
+结果按 (数据库, data_version, 筛选条件) 缓存：数据未变化时重复查询只需读取
+一次版本号；同一键对应的 ETag 也不变，HTTP 层可据此返回 304。
+"""
+
+import copy
+import hashlib
+import sqlite3
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from archive import list_archives, report_tables
+from cache import LRUCache
+from config import SUMMARY_CACHE_SIZE
+from metrics import PHASE_SECONDS
+from storage import DB_PATH, data_version, get_connection
+
+_summary_cache = LRUCache(SUMMARY_CACHE_SIZE)
+
+
+def build_filters(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                  driver_name: Optional[str] = None, vehicle_number: Optional[str] = None,
+                  collection_location: Optional[str] = None) -> Tuple[str, List]:
+    """把筛选条件转换为 WHERE 子句与参数，无条件时返回空子句"""
+    conditions = []
+    params = []
+    for clause, value in (
+        ("collection_date >= ?", start_date),
+        ("collection_date <= ?", end_date),
+        ("driver_name = ?", driver_name),
+        ("vehicle_number = ?", vehicle_number),
+        ("collection_location = ?", collection_location),
+    ):
+        if value is not None:
+            conditions.append(clause)
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def _summary(totals: Tuple, locations: Dict, time_periods: Dict) -> Dict:
+    total_reports, total_drivers, total_segments, total_distance, latest_update = totals
+    return {
+        "total_reports": total_reports,
+        "total_drivers": total_drivers,
+        "total_segments": int(total_segments),
+        "total_distance": float(total_distance),
+        "locations": locations,
+        "time_periods": time_periods,
+        "latest_update": str(latest_update)
+    }
+
+
+def _materialized_summary(conn: sqlite3.Connection) -> Optional[Dict]:
+    totals = conn.execute('''
+        SELECT total_reports, total_drivers, total_segments, total_distance, latest_update
+        FROM summary_totals WHERE id = 1
+    ''').fetchone()
+    if totals is None or totals[0] == 0:
+        return None
+
+    counts = {"location": {}, "time_period": {}}
+    for dimension, key, count in conn.execute('''
+        SELECT dimension, key, count FROM summary_counts
+        WHERE dimension IN ('location', 'time_period')
+        ORDER BY count DESC, key
+    '''):
+        counts[dimension][key] = count
+    return _summary(totals, counts["location"], counts["time_period"])
+
+
+def _filtered_summary(conn: sqlite3.Connection, db_path: str, where: str, params: List,
+                      start_date: Optional[str], end_date: Optional[str]) -> Optional[Dict]:
+    # 每个表达式覆盖热库或一组归档，分别聚合后在这里合并；
+    # 司机数不能相加，归档多于一次可附加的个数时需要收集司机名去重
+    grouped = len(list_archives(db_path, start_date, end_date)) > conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    total_reports = total_drivers = total_segments = total_distance = 0
+    latest_update = None
+    drivers = set()
+    counts = {"collection_location": Counter(), "collection_time_period": Counter()}
+    for table in report_tables(conn, db_path, start_date, end_date):
+        reports, distinct_drivers, segments, distance, latest = conn.execute(f'''
+            SELECT COUNT(*), COUNT(DISTINCT driver_name),
+                   COALESCE(SUM(collection_segments), 0), COALESCE(SUM(driving_distance), 0),
+                   MAX(created_at)
+            FROM {table} {where}
+        ''', params).fetchone()
+        if reports == 0:
+            continue
+        total_reports += reports
+        total_drivers = distinct_drivers
+        total_segments += segments
+        total_distance += distance
+        if latest is not None and (latest_update is None or latest > latest_update):
+            latest_update = latest
+        if grouped:
+            drivers.update(row[0] for row in conn.execute(
+                f"SELECT DISTINCT driver_name FROM {table} {where}", params) if row[0] is not None)
+        for column, counter in counts.items():
+            counter.update(dict(conn.execute(
+                f"SELECT {column}, COUNT(*) FROM {table} {where} GROUP BY {column}", params)))
+    if total_reports == 0:
+        return None
+
+    def value_counts(column: str) -> Dict:
+        items = [(key, count) for key, count in counts[column].items() if key is not None]
+        return dict(sorted(items, key=lambda item: (-item[1], item[0])))
+
+    totals = (total_reports, len(drivers) if grouped else total_drivers, total_segments, total_distance, latest_update)
+    return _summary(totals, value_counts("collection_location"), value_counts("collection_time_period"))
+
+
+def get_collection_summary_with_etag(db_path: str = DB_PATH, start_date: Optional[str] = None,
+                                     end_date: Optional[str] = None, driver_name: Optional[str] = None,
+                                     vehicle_number: Optional[str] = None,
+                                     collection_location: Optional[str] = None) -> Tuple[Dict, Optional[str]]:
+    """返回 (汇总, 强 ETag)，参数同 get_collection_summary；出错时 ETag 为 None"""
+    try:
+        where, params = build_filters(start_date, end_date, driver_name, vehicle_number, collection_location)
+        conn = get_connection(db_path)
+        # 先读版本号再计算：计算期间有写入时，缓存的结果只会比版本号新，不会过期
+        key = (db_path, data_version(conn), where, tuple(params))
+        summary = _summary_cache.get(key)
+        if summary is None:
+            with PHASE_SECONDS.time("db_read"):
+                if where:
+                    summary = _filtered_summary(conn, db_path, where, params, start_date, end_date)
+                else:
+                    summary = _materialized_summary(conn)
+            if summary is None:
+                summary = {"message": "暂无数据"}
+            _summary_cache.put(key, summary)
+        etag = '"%s"' % hashlib.blake2b(repr(key).encode("utf-8"), digest_size=12).hexdigest()
+        return copy.deepcopy(summary), etag
+    except Exception as e:
+        return {'error': str(e)}, None
+
+
+def get_collection_summary(db_path: str = DB_PATH, start_date: Optional[str] = None,
+                           end_date: Optional[str] = None, driver_name: Optional[str] = None,
+                           vehicle_number: Optional[str] = None,
+                           collection_location: Optional[str] = None) -> Dict:
+    """获取采集数据总览，可按采集日期范围、司机、车辆、地点筛选"""
+    return get_collection_summary_with_etag(db_path, start_date, end_date, driver_name,
+                                            vehicle_number, collection_location)[0]
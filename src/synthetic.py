@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成汇报生成器
+
+按固定随机种子生成与 example_data.txt、batch_process.py 中写法一致的汇报：
+标准格式、简化格式、连写格式、自由叙述和缺失字段。相同种子得到相同的
+汇报序列，供基准测试与压测使用。每条汇报带序号派生的车辆编号，互不重复。
+"""
+
+import random
+from typing import Dict, Iterator, Optional, Sequence
+
+FORMATS = ("standard", "simplified", "run_together", "free_form", "missing_fields")
+
+SURNAMES = "张李王赵钱孙周吴郑冯陈褚卫蒋沈韩杨朱秦许何吕施"
+GIVEN_NAMES = ("三", "四", "五", "六", "七", "八", "伟", "芳", "磊", "洋", "勇", "静", "少东", "建国", "晓明")
+PLATE_PREFIXES = ("京A", "京B", "沪B", "粤C", "川E", "浙F", "皖A", "LY-005-")
+CITIES = ("北京市朝阳区", "北京市海淀区", "上海", "广州", "成都", "杭州", "合肥", "深圳", "武汉", "南京")
+TASKS = ("城市道路数据采集", "高速公路数据采集", "乡村道路数据采集", "城市快速路数据采集",
+         "黄灯闪烁路口/与行人二轮车交互", "夜间环路数据采集", "隧道场景采集")
+
+
+def _fields(rng: random.Random, index: int) -> Dict:
+    return {
+        "driver": rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES),
+        "vehicle": f"{rng.choice(PLATE_PREFIXES)}{index:06d}",
+        "task": rng.choice(TASKS),
+        "segments": rng.randint(1, 80),
+        "location": rng.choice(CITIES),
+        "month": rng.randint(1, 12),
+        "day": rng.randint(1, 28),
+        "period": rng.choice(("白天", "夜晚")),
+        "distance": round(rng.uniform(10, 400), 1),
+    }
+
+
+def _standard(f: Dict) -> str:
+    return (f"采集员：{f['driver']}\n车辆编号：{f['vehicle']}\n采集任务：{f['task']}\n"
+            f"采集段数：{f['segments']}\n采集地点：{f['location']}\n"
+            f"采集日期：2025-{f['month']:02d}-{f['day']:02d}\n采集时段：{f['period']}\n"
+            f"行驶里程：{f['distance']}公里")
+
+
+def _simplified(f: Dict) -> str:
+    return (f"姓名：{f['driver']}\n车牌号：{f['vehicle']}\n任务：{f['task']}\n采集了{f['segments']}段\n"
+            f"地点：{f['location']}\n日期：2025-{f['month']:02d}-{f['day']:02d}\n"
+            f"{'白天采集' if f['period'] == '白天' else '夜间作业'}\n总里程：{f['distance']}公里")
+
+
+def _run_together(f: Dict) -> str:
+    return (f"采集员：{f['driver']}车辆编号：{f['vehicle']}采集任务：{f['task']}"
+            f"采集段数：{f['segments']}+采集地点：{f['location']}采集日期：{f['month']}.{f['day']}"
+            f"采集时段：{f['period']}行驶里程:  {int(f['distance'])}")
+
+
+def _free_form(f: Dict) -> str:
+    return (f"今天完成了数据采集工作，我是{f['driver']}，开的是{f['vehicle']}号车。\n"
+            f"这次的任务是{f['task']}，总共采集了{f['segments']}段数据。\n"
+            f"地点在{f['location']}，时间是2025年{f['month']}月{f['day']}日，{f['period']}进行的。\n"
+            f"总共行驶了{f['distance']}公里。")
+
+
+def _missing_fields(f: Dict) -> str:
+    return (f"采集员：{f['driver']}\n车辆编号：{f['vehicle']}\n采集任务：{f['task']}\n"
+            f"采集地点：{f['location']}\n采集日期：2025-{f['month']:02d}-{f['day']:02d}\n"
+            f"行驶里程：{f['distance']}公里")
+
+
+_RENDERERS = {
+    "standard": _standard,
+    "simplified": _simplified,
+    "run_together": _run_together,
+    "free_form": _free_form,
+    "missing_fields": _missing_fields,
+}
+
+
+def generate_reports(count: int, seed: int = 0,
+                     formats: Optional[Sequence[str]] = None) -> Iterator[str]:
+    """按种子生成 count 条汇报，formats 为空时各格式等概率出现"""
+    rng = random.Random(seed)
+    renderers = [_RENDERERS[name] for name in (formats or FORMATS)]
+    for index in range(count):
+        yield rng.choice(renderers)(_fields(rng, index))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原始汇报压缩
+
+原文以 raw deflate 压缩后存放在 report_texts 中。单条汇报只有一两百字节，
+直接压缩几乎没有收益，因此使用预置字典：text_dictionaries 的第 1 条是下面
+固定的种子字典，之后可用 storage.train_text_dictionary 从已有汇报中采样
+生成新字典，新写入的汇报使用最新的字典，旧记录按各自的字典编号解压。
+
+标准库没有 zstd，这里用 zlib 的 zdict 实现同样的共享字典压缩。
+"""
+
+import sqlite3
+import zlib
+from typing import Dict, Iterable, Optional
+
+# 种子字典：已写入数据库的记录依赖其内容，不可修改。
+# 内容取自 synthetic 生成器的模板文字与常见字段值，并非真实汇报的采样；
+# 有了足够的真实数据后应调用 storage.train_text_dictionary 生成新字典
+SEED_DICTIONARY = (
+    "今天完成了数据采集工作，我是，开的是号车。\n这次的任务是，总共采集了段数据。\n"
+    "地点在，时间是2025年月日，白天进行的。\n总共行驶了公里。\n"
+    "姓名：\n车牌号：\n任务：\n采集了段\n地点：\n日期：2025-\n白天采集\n夜间作业\n总里程：公里\n"
+    "采集员：\n车辆编号：\n采集任务：城市道路数据采集\n高速公路数据采集\n乡村道路数据采集\n"
+    "城市快速路数据采集\n黄灯闪烁路口/与行人二轮车交互\n夜间环路数据采集\n隧道场景采集\n"
+    "采集段数：\n采集地点：北京市朝阳区\n北京市海淀区\n上海\n广州\n深圳\n成都\n杭州\n"
+    "采集日期：2025-0\n采集时段：夜晚\n采集时段：白天\n行驶里程："
+).encode("utf-8")
+
+SEED_DICTIONARY_ID = 1
+
+# 压缩参数：memLevel 4 与默认值压缩率相同，复制压缩器状态更快
+_LEVEL = 6
+_WBITS = -15
+_MEM_LEVEL = 4
+
+
+class TextCodec:
+    """
+    一个连接上的原文编解码器
+
+    字典按编号从 text_dictionaries 读取后缓存；压缩器用字典预热一次，
+    之后每条汇报复制预热好的状态，省去重复加载字典的开销。
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._dictionaries: Dict[int, bytes] = {}
+        self._compressors: Dict[int, object] = {}
+
+    def dictionary(self, dictionary_id: int) -> bytes:
+        data = self._dictionaries.get(dictionary_id)
+        if data is None:
+            row = self.conn.execute("SELECT data FROM text_dictionaries WHERE id = ?", (dictionary_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"原文压缩字典不存在: {dictionary_id}")
+            data = self._dictionaries[dictionary_id] = bytes(row[0])
+        return data
+
+    def latest_dictionary_id(self) -> int:
+        """最新的字典编号，写入新汇报时使用"""
+        return self.conn.execute("SELECT MAX(id) FROM text_dictionaries").fetchone()[0]
+
+    def compress(self, text: Optional[str], dictionary_id: int) -> Optional[bytes]:
+        if text is None:
+            return None
+        compressor = self._compressors.get(dictionary_id)
+        if compressor is None:
+            compressor = zlib.compressobj(_LEVEL, zlib.DEFLATED, _WBITS, _MEM_LEVEL,
+                                          zlib.Z_DEFAULT_STRATEGY, zdict=self.dictionary(dictionary_id))
+            self._compressors[dictionary_id] = compressor
+        compressor = compressor.copy()
+        return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+    def decompress(self, dictionary_id: Optional[int], data: Optional[bytes]) -> Optional[str]:
+        if data is None:
+            return None
+        decompressor = zlib.decompressobj(_WBITS, zdict=self.dictionary(dictionary_id))
+        return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+def train_dictionary(samples: Iterable[str], size: int = 16384) -> bytes:
+    """
+    用样本汇报生成字典
+
+    deflate 只能回溯引用字典末尾 32KB 内的内容，样本按顺序拼接后保留末尾
+    size 字节，调用方应把最具代表性（如最近）的汇报放在最后。
+    """
+    data = "\n".join(samples).encode("utf-8")
+    return data[-size:] if len(data) > size else data
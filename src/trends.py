@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集趋势
+
+按日、周（周一为桶）、月统计报告数、段数与里程，可再按司机、车辆、地点或
+时段拆分。只读取触发器维护的 report_rollups，不扫描 driver_reports；
+结果与汇总一样按 (数据库, data_version, 查询条件) 缓存。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from cache import LRUCache
+from config import SUMMARY_CACHE_SIZE
+from metrics import PHASE_SECONDS
+from storage import DB_PATH, ROLLUP_GRANULARITIES, data_version, get_connection
+
+# 拆分维度 -> report_rollups 中的列
+TREND_DIMENSIONS = {
+    "driver": "driver_name",
+    "vehicle": "vehicle_number",
+    "location": "collection_location",
+    "time_period": "collection_time_period",
+}
+
+_trends_cache = LRUCache(SUMMARY_CACHE_SIZE)
+
+
+def _build_query(granularity: str, dimension: Optional[str], start_date: Optional[str],
+                 end_date: Optional[str], driver_name: Optional[str], vehicle_number: Optional[str],
+                 collection_location: Optional[str]) -> Tuple[str, List]:
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"未知的时间粒度: {granularity}")
+    if dimension is not None and dimension not in TREND_DIMENSIONS:
+        raise ValueError(f"未知的拆分维度: {dimension}")
+
+    # 日期条件换算到桶：起止日期所在的整周、整月都计入
+    bucket_of = ROLLUP_GRANULARITIES[granularity].format(date="?")
+    conditions = ["granularity = ?"]
+    params = [granularity]
+    for clause, value in (
+        (f"bucket >= {bucket_of}", start_date),
+        (f"bucket <= {bucket_of}", end_date),
+        ("driver_name = ?", driver_name),
+        ("vehicle_number = ?", vehicle_number),
+        ("collection_location = ?", collection_location),
+    ):
+        if value is not None:
+            conditions.append(clause)
+            params.append(value)
+
+    column = TREND_DIMENSIONS[dimension] if dimension else "NULL"
+    group_by = f"bucket, {column}" if dimension else "bucket"
+    sql = f'''
+        SELECT bucket, {column}, SUM(reports), SUM(segments), SUM(distance)
+        FROM report_rollups WHERE {' AND '.join(conditions)}
+        GROUP BY {group_by} ORDER BY bucket, SUM(reports) DESC, {column}
+    '''
+    return sql, params
+
+
+def get_collection_trends(db_path: str = DB_PATH, granularity: str = "day", dimension: Optional[str] = None,
+                          start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          driver_name: Optional[str] = None, vehicle_number: Optional[str] = None,
+                          collection_location: Optional[str] = None) -> Dict:
+    """
+    获取按时间分桶的采集趋势
+
+    granularity 为 day/week/month；dimension 为 driver/vehicle/location/time_period 时
+    每个桶再按该维度拆分，为空时只给出每个桶的合计。返回
+    {"granularity", "dimension", "trends": [{"bucket", "key", "reports", "segments", "distance"}]}，
+    拆分维度缺失的记录 key 为 None。
+    """
+    try:
+        sql, params = _build_query(granularity, dimension, start_date, end_date,
+                                   driver_name, vehicle_number, collection_location)
+        conn = get_connection(db_path)
+        key = (db_path, data_version(conn), sql, tuple(params))
+        result = _trends_cache.get(key)
+        if result is None:
+            with PHASE_SECONDS.time("db_read"):
+                rows = conn.execute(sql, params).fetchall()
+            trends = [
+                {
+                    "bucket": bucket,
+                    "key": (value or None) if dimension else None,
+                    "reports": reports,
+                    "segments": int(segments),
+                    "distance": round(float(distance), 2),
+                }
+                for bucket, value, reports, segments, distance in rows
+            ]
+            result = ({"granularity": granularity, "dimension": dimension, "trends": trends}
+                      if trends else {"message": "暂无数据"})
+            _trends_cache.put(key, result)
+        # 行内都是不可变值，逐行浅拷贝即可，比 deepcopy 快一个数量级
+        if "trends" in result:
+            return {**result, "trends": [dict(row) for row in result["trends"]]}
+        return dict(result)
+    except Exception as e:
+        return {'error': str(e)}
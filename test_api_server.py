@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# 测试 HTTP RPC 服务（临时数据库，系统分配端口）
+import asyncio
+import csv
+import gzip
+import http.client
+import io
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from api_server import start_server
+
+REPORTS = [
+    f"采集员：张三\n车辆编号：京A00{i}\n采集地点：北京\n采集日期：2025-03-{i + 10:02d}\n采集段数：{i}\n行驶里程：{i}公里"
+    for i in range(1, 6)
+]
+
+
+def _run(db_path, scenario):
+    """在 db_path 上启动服务器，在线程中用 scenario(port) 发请求，结束后关闭服务器"""
+    async def main():
+        server = await start_server("127.0.0.1", 0, db_path)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, scenario, port)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(main())
+
+
+def _request(conn, method, path, payload=None, headers=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else None
+    headers = dict(headers or {})
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_rpc_over_one_keep_alive_connection(make_db):
+    def scenario(port):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        response, body = _request(conn, "GET", "/health")
+        assert response.status == 200 and json.loads(body) == {"status": "ok"}
+        sock = conn.sock
+
+        response, body = _request(conn, "POST", "/rpc/parse_driver_report", {"report_text": REPORTS[0]})
+        assert response.status == 200
+        assert json.loads(body)["driver_name"] == "张三"
+
+        response, body = _request(conn, "POST", "/rpc/parse_driver_reports_batch",
+                                  {"report_texts": REPORTS + [""]})
+        result = json.loads(body)
+        assert (result["saved"], result["duplicates"], result["failed"]) == (4, 1, 1)
+
+        response, body = _request(conn, "GET", "/rpc/get_collection_summary?driver_name=%E5%BC%A0%E4%B8%89")
+        assert json.loads(body)["total_reports"] == 5
+        etag = response.getheader("ETag")
+        response, body = _request(conn, "GET", "/rpc/get_collection_summary?driver_name=%E5%BC%A0%E4%B8%89",
+                                  headers={"If-None-Match": etag})
+        assert response.status == 304 and body == b""
+
+        response, body = _request(conn, "GET", "/rpc/get_collection_trends?granularity=month")
+        assert json.loads(body)["trends"][0]["reports"] == 5
+
+        response, body = _request(conn, "POST", "/rpc/query_reports", {"driver_name": "张三", "page_size": 3})
+        page = json.loads(body)
+        ids = [report["id"] for report in page["reports"]]
+        assert page["next_cursor"] == str(ids[-1])
+        response, body = _request(conn, "GET", "/rpc/query_reports?driver_name=%E5%BC%A0%E4%B8%89&cursor="
+                                  + page["next_cursor"])
+        page = json.loads(body)
+        ids += [report["id"] for report in page["reports"]]
+        assert len(ids) == 5 and ids == sorted(ids, reverse=True) and page["next_cursor"] is None
+
+        # 所有请求复用同一个连接
+        assert conn.sock is sock
+        conn.close()
+
+    _run(make_db(), scenario)
+
+
+def test_errors(make_db):
+    def scenario(port):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        assert _request(conn, "GET", "/rpc/unknown")[0].status == 404
+        response, _ = _request(conn, "GET", "/rpc/parse_driver_report")
+        assert response.status == 405 and response.getheader("Allow") == "POST"
+        assert _request(conn, "POST", "/rpc/parse_driver_report", {"report_text": " "})[0].status == 400
+        assert _request(conn, "POST", "/rpc/parse_driver_report",
+                        {"report_text": REPORTS[0], "on_duplicate": "merge"})[0].status == 400
+        assert _request(conn, "GET", "/rpc/get_collection_trends?granularity=year")[0].status == 500
+        assert _request(conn, "GET", "/rpc/export_data_csv?format=csv&columns=id,password")[0].status == 400
+        # 出错后连接仍可继续使用
+        assert _request(conn, "GET", "/health")[0].status == 200
+        conn.close()
+
+    _run(make_db(), scenario)
+
+
+def test_metrics_endpoint(make_db):
+    def scenario(port):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        _request(conn, "POST", "/rpc/parse_driver_reports_batch", {"report_texts": REPORTS})
+        _request(conn, "POST", "/rpc/parse_driver_report", {"report_text": " "})
+        _request(conn, "GET", "/rpc/unknown")
+
+        response, body = _request(conn, "GET", "/metrics")
+        assert response.getheader("Content-Type").startswith("text/plain; version=0.0.4")
+        text = body.decode("utf-8")
+        assert ('driver_data_tool_calls_total{tool="parse_driver_reports_batch",transport="http",outcome="ok"}'
+                in text)
+        assert 'driver_data_tool_calls_total{tool="parse_driver_report",transport="http",outcome="error"}' in text
+        # 未知路径不产生指标
+        assert "unknown" not in text
+
+        response, body = _request(conn, "GET", "/rpc/get_server_stats")
+        stats = json.loads(body)
+        assert stats["rows_ingested"] >= len(REPORTS)
+        assert stats["phases"]["db_write"]["count"] >= 1
+        conn.close()
+
+    _run(make_db(), scenario)
+
+
+def test_export_streams_csv_with_gzip(make_db):
+    def scenario(port):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        _request(conn, "POST", "/rpc/parse_driver_reports_batch", {"report_texts": REPORTS})
+
+        # 默认与原接口一样返回 JSON
+        response, body = _request(conn, "GET", "/rpc/export_data_csv?columns=id,vehicle_number")
+        assert response.getheader("Content-Type").startswith("application/json")
+        result = json.loads(body)
+        Path(result["filename"]).unlink()
+        assert result["rows"] == 5
+
+        response, body = _request(conn, "GET", "/rpc/export_data_csv?format=csv&columns=id,vehicle_number")
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        rows = list(csv.reader(io.StringIO(body.decode("utf-8-sig"))))
+        assert rows[0] == ["id", "vehicle_number"] and len(rows) == 6
+
+        response, compressed = _request(conn, "GET", "/rpc/export_data_csv?format=csv",
+                                        headers={"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        rows = list(csv.reader(io.StringIO(gzip.decompress(compressed).decode("utf-8-sig"))))
+        assert rows[1][rows[0].index("raw_text")] == REPORTS[0]
+
+        # 足够大的 JSON 响应同样压缩
+        response, compressed = _request(conn, "POST", "/rpc/parse_driver_reports_batch",
+                                        {"report_texts": REPORTS * 10}, headers={"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert json.loads(gzip.decompress(compressed))["duplicates"] == 50
+        conn.close()
+
+    _run(make_db(), scenario)
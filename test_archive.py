@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# 测试按月归档
+import csv
+import io
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from archive import archive_dir, archive_reports, list_archives, report_tables
+from export import iter_csv_chunks
+from search import search_reports
+from storage import connect, get_connection, rebuild_rollups, rebuild_summary
+from summary import get_collection_summary
+from trends import get_collection_trends
+
+REPORTS = [
+    "采集员：张三\n采集地点：北京\n采集日期：2025-01-10\n采集段数：5\n行驶里程：10.5公里\n采集任务：隧道场景采集",
+    "采集员：李四\n采集地点：上海\n采集日期：2025-01-20\n采集段数：2\n行驶里程：1公里",
+    "采集员：张三\n采集地点：北京\n采集日期：2025-02-03\n采集段数：4\n行驶里程：20公里",
+    "采集员：王五\n采集地点：广州\n采集日期：2025-06-01\n采集段数：1\n行驶里程：3公里",
+]
+TODAY = date(2025, 6, 10)
+
+
+def _hot_count(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM driver_reports").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_archive_moves_old_reports_by_month(make_db):
+    db_path = make_db(REPORTS)
+    summary = get_collection_summary(db_path)
+    trends = get_collection_trends(db_path, "month", dimension="driver")
+
+    result = archive_reports(30, db_path, today=TODAY)
+    assert result == {"archived": 3, "months": {"2025-01": 2, "2025-02": 1}}
+    assert _hot_count(db_path) == 1
+    assert [month for month, _ in list_archives(db_path)] == ["2025-01", "2025-02"]
+    assert [month for month, _ in list_archives(db_path, start_date="2025-02-01")] == ["2025-02"]
+    assert Path(archive_dir(db_path), "2025-01.db").exists()
+
+    # 物化汇总与趋势分桶保留已归档的数据
+    assert get_collection_summary(db_path) == summary
+    assert get_collection_trends(db_path, "month", dimension="driver") == trends
+    # 全文检索只覆盖热库
+    assert search_reports("隧道场景", db_path=db_path)["total"] == 0
+
+    # 再次执行不会重复归档
+    assert archive_reports(30, db_path, today=TODAY)["archived"] == 0
+
+
+def test_rebuild_keeps_archived_reports(make_db):
+    db_path = make_db(REPORTS)
+    summary = get_collection_summary(db_path)
+    trends = get_collection_trends(db_path, "week", dimension="location")
+    archive_reports(30, db_path, today=TODAY)
+
+    conn = connect(db_path)
+    rebuild_summary(conn)
+    rebuild_rollups(conn)
+    conn.close()
+    assert get_collection_summary(db_path) == summary
+    assert get_collection_trends(db_path, "week", dimension="location") == trends
+
+
+def test_filtered_summary_and_export_include_archives(make_db):
+    db_path = make_db(REPORTS)
+    before = get_collection_summary(db_path, start_date="2025-01-01", end_date="2025-06-30")
+    by_driver = get_collection_summary(db_path, driver_name="张三")
+    archive_reports(30, db_path, today=TODAY)
+
+    assert get_collection_summary(db_path, start_date="2025-01-01", end_date="2025-06-30") == before
+    assert get_collection_summary(db_path, driver_name="张三") == by_driver
+    summary = get_collection_summary(db_path, start_date="2025-01-15", end_date="2025-02-28")
+    assert summary["total_reports"] == 2
+    assert summary["total_drivers"] == 2
+    assert summary["locations"] == {"上海": 1, "北京": 1}
+
+    raw = b"".join(iter_csv_chunks(["id", "driver_name", "collection_date"], db_path=db_path))
+    rows = list(csv.reader(io.StringIO(raw.decode("utf-8-sig"))))[1:]
+    assert [row[0] for row in rows] == ["1", "2", "3", "4"]
+
+    # 压缩原文随记录移入归档，导出时解压
+    raw = b"".join(iter_csv_chunks(["id", "raw_text"], db_path=db_path))
+    rows = list(csv.reader(io.StringIO(raw.decode("utf-8-sig"))))[1:]
+    assert [row[1] for row in rows] == REPORTS
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM report_texts").fetchone()[0] == 1
+    conn.close()
+
+
+def test_queries_attach_archives_read_only(make_db):
+    db_path = make_db(REPORTS)
+    archive_reports(30, db_path, today=TODAY)
+    archives = [Path(path) for _, path in list_archives(db_path)]
+    before = [path.read_bytes() for path in archives]
+
+    get_collection_summary(db_path, driver_name="张三")
+    b"".join(iter_csv_chunks(["id", "raw_text"], db_path=db_path))
+    assert [path.read_bytes() for path in archives] == before
+
+    # 只附加与日期范围有交集的月份，且以只读方式附加
+    conn = connect(db_path)
+    tables = report_tables(conn, db_path, start_date="2025-02-01")
+    assert "archive_0.driver_reports" in next(tables)
+    assert [row[1] for row in conn.execute("PRAGMA database_list")] == ["main", "archive_0"]
+    with pytest.raises(sqlite3.OperationalError, match="readonly"):
+        conn.execute("CREATE TABLE archive_0.probe (id INTEGER)")
+    tables.close()
+    conn.close()
+
+
+def test_legacy_archive_is_upgraded_by_archive_job(make_db):
+    db_path = make_db(REPORTS)
+    directory = archive_dir(db_path)
+    directory.mkdir()
+    # 早期的归档库：原文直接存放在 raw_text 列
+    conn = sqlite3.connect(str(directory / "2024-12.db"))
+    conn.execute('''
+        CREATE TABLE driver_reports (
+            id INTEGER PRIMARY KEY, driver_name TEXT, vehicle_number TEXT, collection_task TEXT,
+            collection_segments INTEGER, collection_location TEXT, collection_date TEXT,
+            collection_time_period TEXT, driving_distance REAL, raw_text TEXT, created_at TIMESTAMP,
+            content_hash TEXT, submit_count INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    with conn:
+        conn.execute("INSERT INTO driver_reports (id, driver_name, collection_date, raw_text) "
+                     "VALUES (0, '赵六', '2024-12-01', '采集员：赵六')")
+    conn.close()
+    archive_reports(30, db_path, today=TODAY)
+
+    raw = b"".join(iter_csv_chunks(["id", "driver_name", "raw_text"], db_path=db_path, end_date="2024-12-31"))
+    rows = list(csv.reader(io.StringIO(raw.decode("utf-8-sig"))))[1:]
+    assert rows == [["0", "赵六", "采集员：赵六"]]
+    conn = sqlite3.connect(str(directory / "2024-12.db"))
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(driver_reports)")]
+    conn.close()
+    assert "raw_text" not in columns
+
+
+def test_summary_merges_groups_beyond_attach_limit(make_db):
+    db_path = make_db(REPORTS)
+    expected = get_collection_summary(db_path, start_date="2025-01-01")
+    archive_reports(30, db_path, today=TODAY)
+
+    # 每次只能附加 1 个归档时分两组查询再合并，张三在两组中只计一次
+    conn = get_connection(db_path)
+    limit = conn.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, 1)
+    try:
+        summary = get_collection_summary(db_path, start_date="2025-01-01")
+    finally:
+        conn.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, limit)
+    assert summary == expected
+    assert summary["total_drivers"] == 3
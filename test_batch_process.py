@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# 测试多核批量入库
+import sqlite3
+
+from batch_process import bulk_process_reports
+
+
+def test_bulk_process_keeps_input_order(make_db):
+    db_path = make_db()
+    reports = [f"采集员：司机{i}\n采集段数：{i}\n行驶里程：{i}.5公里" for i in range(1000)]
+
+    saved = bulk_process_reports(reports, workers=2, chunk_size=64, db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT collection_segments FROM driver_reports ORDER BY id").fetchall()
+    conn.close()
+    assert saved == 1000
+    assert [row[0] for row in rows] == list(range(1000))
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# 测试冷启动基准
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from bench_startup import check, run_scenario
+from storage import close_connections
+
+
+def test_core_paths_start_without_heavy_modules(make_db):
+    db_path = make_db()
+    close_connections()
+    for name in ("parse", "ingest", "summary"):
+        result = run_scenario(name, db_path, repeat=1)
+        assert result["median_ms"] > 0
+        assert result["heavy_modules"] == []
+
+
+def test_check_reports_slow_or_heavy_startup():
+    result = {"median_ms": 80.0, "heavy_modules": []}
+    assert check("parse", result) == []
+    assert len(check("parse", result, target_ms=50)) == 1
+    assert len(check("parse", {"median_ms": 10.0, "heavy_modules": ["pandas"]})) == 1
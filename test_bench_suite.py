@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# 测试基准套件
+import pytest
+
+from bench_suite import METRICS, best_metrics, compare, main, run_size
+
+
+def test_run_size_reports_all_metrics(tmp_path):
+    metrics = run_size(200, seed=0, work_dir=tmp_path)
+    assert metrics["rows"] == 200
+    assert set(METRICS) <= set(metrics)
+    assert all(metrics[name] > 0 for name in METRICS)
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"1000": {"parse_reports_per_sec": 1000, "summary_ms": 10, "rows": 1000}}
+    assert compare({"1000": {"parse_reports_per_sec": 850, "summary_ms": 11.5, "rows": 1}}, baseline, 0.2) == []
+    regressions = compare({"1000": {"parse_reports_per_sec": 700, "summary_ms": 13}}, baseline, 0.2)
+    assert len(regressions) == 2
+    # 基线中没有的数据量不比较
+    assert compare({"100000": {"parse_reports_per_sec": 1}}, baseline, 0.2) == []
+    # 亚毫秒级的耗时变化是计时噪声
+    assert compare({"1000": {"summary_ms": 0.08}}, {"1000": {"summary_ms": 0.05}}, 0.2) == []
+
+
+def test_best_metrics_takes_best_run():
+    runs = [dict.fromkeys(METRICS, 1), dict.fromkeys(METRICS, 1)]
+    runs[0].update(rows=10, parse_reports_per_sec=100, summary_ms=3)
+    runs[1].update(rows=10, parse_reports_per_sec=120, summary_ms=5)
+    best = best_metrics(runs)
+    assert (best["rows"], best["parse_reports_per_sec"], best["summary_ms"]) == (10, 120, 3)
+
+
+def test_check_fails_without_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["bench_suite.py", "--sizes", "100", "--check",
+                                     "--output", str(tmp_path / "results.json"),
+                                     "--baseline", str(tmp_path / "missing.json")])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 1
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# 测试缓存工具
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from cache import LRUCache, etag_matches
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"abc"', None)
+
+
+if __name__ == "__main__":
+    test_lru_evicts_least_recently_used()
+    test_etag_matches()
+    print("✅ 缓存工具测试通过")
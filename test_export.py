@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# 测试分块导出
+import csv
+import io
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from export import EXPORT_COLUMNS, export_csv, export_parquet, iter_csv_chunks
+
+REPORTS = [
+    "采集员：张三\n采集地点：北京\n采集日期：2025-01-10\n行驶里程：10.5公里",
+    "采集员：李四\n采集地点：上海\n采集日期：2025-01-11",
+    "采集员：张三\n采集地点：北京海淀\n采集日期：2025-01-12",
+]
+
+
+def test_export_csv_writes_all_rows_in_chunks(make_db, tmp_path):
+    db_path = make_db(REPORTS)
+    filename = str(tmp_path / "out.csv")
+    result = export_csv(filename, chunk_size=2, db_path=db_path)
+    assert result == {"filename": filename, "rows": 3}
+
+    raw = Path(filename).read_bytes()
+    assert raw.startswith(b"\xef\xbb\xbf")
+    rows = list(csv.reader(io.StringIO(raw.decode("utf-8-sig"))))
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert [row[1] for row in rows[1:]] == ["张三", "李四", "张三"]
+    assert rows[3][EXPORT_COLUMNS.index("raw_text")] == REPORTS[2]
+
+
+def test_export_columns_and_filters(make_db, tmp_path):
+    db_path = make_db(REPORTS)
+    filename = str(tmp_path / "out.csv")
+    result = export_csv(filename, columns=["driver_name", "collection_location"], db_path=db_path,
+                        driver_name="张三", start_date="2025-01-11")
+    assert result["rows"] == 1
+    with open(filename, encoding="utf-8-sig", newline="") as f:
+        assert list(csv.reader(f)) == [["driver_name", "collection_location"], ["张三", "北京海淀"]]
+
+
+def test_iter_csv_chunks_matches_file_export(make_db, tmp_path):
+    db_path = make_db(REPORTS)
+    filename = str(tmp_path / "out.csv")
+    export_csv(filename, db_path=db_path)
+    chunks = list(iter_csv_chunks(chunk_size=1, db_path=db_path))
+    assert len(chunks) == 4
+    assert b"".join(chunks) == Path(filename).read_bytes()
+
+
+def test_unknown_column_is_rejected():
+    with pytest.raises(ValueError):
+        export_csv(columns=["driver_name", "1; DROP TABLE driver_reports"])
+
+
+def test_export_parquet_row_groups_and_dictionary(make_db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    db_path = make_db(REPORTS)
+    filename = str(tmp_path / "out.parquet")
+    result = export_parquet(filename, columns=["driver_name", "collection_location", "driving_distance"],
+                            row_group_size=2, db_path=db_path)
+    assert result == {"filename": filename, "rows": 3, "row_groups": 2}
+
+    parquet_file = pq.ParquetFile(filename)
+    assert parquet_file.metadata.num_row_groups == 2
+    encodings = parquet_file.metadata.row_group(0).column(0).encodings
+    assert any("DICTIONARY" in encoding for encoding in encodings)
+    table = parquet_file.read(columns=["driver_name", "driving_distance"])
+    assert table.column("driver_name").to_pylist() == ["张三", "李四", "张三"]
+    assert table.column("driving_distance").to_pylist() == [10.5, None, None]
+
+
+def test_export_parquet_without_pyarrow(make_db):
+    with mock.patch.dict(sys.modules, {"pyarrow": None}):
+        with pytest.raises(ImportError, match="pyarrow"):
+            export_parquet(db_path=make_db(REPORTS))
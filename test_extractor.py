@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# 测试规则提取引擎
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+
+STANDARD_REPORT = """
+采集员：张三
+车辆编号：京A12345
+采集任务：城市道路数据采集
+采集段数：5
+采集地点：北京市朝阳区
+采集日期：2025-01-10
+采集时段：白天
+行驶里程：120.5公里
+"""
+
+RUN_TOGETHER_REPORT = "采集员：方少东车辆编号：LY-005-31781采集任务：黄灯闪烁路口/与行人二轮车交互采集段数：70+采集地点：合肥采集日期：8.10采集时段：白天行驶里程:  273"
+
+
+def test_standard_report():
+    result = extract_with_rules(STANDARD_REPORT)
+    assert result == {
+        "driver_name": "张三",
+        "vehicle_number": "京A12345",
+        "collection_task": "城市道路数据采集",
+        "collection_segments": 5,
+        "collection_location": "北京市朝阳区",
+        "collection_date": "2025-01-10",
+        "collection_time_period": "白天",
+        "driving_distance": 120.5,
+    }
+
+
+def test_run_together_report():
+    result = extract_with_rules(RUN_TOGETHER_REPORT)
+    assert result["driver_name"] == "方少东"
+    assert result["vehicle_number"] == "LY-005-31781"
+    assert result["collection_task"] == "黄灯闪烁路口/与行人二轮车交互"
+    assert result["collection_segments"] == 70
+    assert result["collection_location"] == "合肥"
+    assert result["collection_date"] == "2025-08-10"
+    assert result["driving_distance"] == 273.0
+
+
+def test_simplified_labels_and_fallbacks():
+    result = extract_with_rules("司机：王五\n车牌：粤C11111\n项目：广州市区智驾测试\n采集了3段\n时间：2025-01-12\n夜间作业\n共85.7公里")
+    assert result["driver_name"] == "王五"
+    assert result["vehicle_number"] == "粤C11111"
+    assert result["collection_task"] == "广州市区智驾测试"
+    assert result["collection_segments"] == 3
+    assert result["collection_date"] == "2025-01-12"
+    assert result["collection_time_period"] == "夜晚"
+    assert result["driving_distance"] == 85.7
+
+
+def test_run_together_synonym_labels():
+    # 同义词标签整体识别，不会把“完成”“采集”“总”等前缀留在上一个字段里
+    result = extract_with_rules("司机：孙八车牌号：浙F44444采集项目：杭州城区道路测试完成段数：7"
+                                "测试地点：杭州测试日期：2025-01-15总里程：175.6公里")
+    assert result["driver_name"] == "孙八"
+    assert result["vehicle_number"] == "浙F44444"
+    assert result["collection_task"] == "杭州城区道路测试"
+    assert result["collection_segments"] == 7
+    assert result["collection_location"] == "杭州"
+    assert result["collection_date"] == "2025-01-15"
+    assert result["driving_distance"] == 175.6
+
+
+def test_label_priority():
+    # “采集员”优先于“姓名”，与出现顺序无关
+    result = extract_with_rules("姓名：李四\n采集员：张三")
+    assert result["driver_name"] == "张三"
+
+
+def test_missing_fields_are_none():
+    result = extract_with_rules("采集员：赵六\n采集地点：北京市丰台区")
+    assert result["collection_segments"] is None
+    assert result["collection_time_period"] is None
+    assert result["driving_distance"] is None
+
+
+def test_time_period_stops_at_line_end():
+    result = extract_with_rules("采集员：赵六\n采集时段：夜晚\n备注：白色车辆")
+    assert result["collection_time_period"] == "夜晚"
+
+
+def test_leading_decimal_point_distance():
+    assert extract_with_rules("行驶里程：.5公里")["driving_distance"] == 0.5
+    assert extract_with_rules("今天跑了.5公里")["driving_distance"] == 0.5
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
+    print("🎉 规则提取测试全部通过！")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# 测试批量入库
+import sqlite3
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+import ingest
+from cache import LRUCache
+from extractor import extract_with_rules
+from ingest import SEPARATORS, ingest_file, iter_reports, parse_report, parse_reports_batch
+from storage import get_ingest_offset
+from summary import get_collection_summary
+
+EXAMPLE_DATA = str(Path(__file__).resolve().parent / "example_data.txt")
+
+REPORTS = [
+    "采集员：张三\n车辆编号：京A12345\n采集段数：5\n行驶里程：120.5公里",
+    "",
+    "姓名：李四\n车牌：京B67890\n段数：8\n里程：200公里",
+]
+
+
+def test_parse_reports_batch(make_db):
+    db_path = make_db()
+    batch = parse_reports_batch(REPORTS, db_path)
+
+    assert batch["total"] == 3
+    assert batch["saved"] == 2
+    assert batch["failed"] == 1
+    assert [item["status"] for item in batch["results"]] == ["success", "error", "success"]
+    assert batch["results"][0]["data"]["driver_name"] == "张三"
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT driver_name, driving_distance FROM driver_reports ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [("张三", 120.5), ("李四", 200.0)]
+
+
+def test_parse_reports_batch_rolls_back_on_db_error(make_db):
+    db_path = make_db()
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TRIGGER fail_second_report BEFORE INSERT ON driver_reports
+        WHEN NEW.driver_name = '李四' BEGIN SELECT RAISE(ABORT, '写入失败'); END
+    ''')
+    conn.commit()
+    batch = parse_reports_batch(REPORTS, db_path)
+    assert "error" in batch
+    # 整批回滚，第一条也不会留下
+    assert conn.execute("SELECT COUNT(*) FROM driver_reports").fetchone()[0] == 0
+    conn.close()
+
+
+def test_iter_reports_splits_on_headers():
+    reports = [text for _, text in iter_reports(EXAMPLE_DATA, SEPARATORS["header"])]
+    assert len(reports) == 6
+    assert reports[0].startswith("采集员：张三")
+
+
+def test_iter_reports_resumes_from_offset():
+    reports = list(iter_reports(EXAMPLE_DATA))
+    offset, _ = reports[2]
+    resumed = [text for _, text in iter_reports(EXAMPLE_DATA, start_offset=offset)]
+    assert resumed == [text for _, text in reports[3:]]
+
+
+def test_ingest_file_commits_offset_with_batches(make_db):
+    db_path = make_db()
+    progress = []
+    result = ingest_file(EXAMPLE_DATA, batch_size=4, db_path=db_path,
+                         progress=lambda *args: progress.append(args))
+
+    assert result["saved"] == 6
+    assert progress[-1][0] == Path(EXAMPLE_DATA).stat().st_size
+    assert get_ingest_offset(result["source"], db_path) == Path(EXAMPLE_DATA).stat().st_size
+
+    # 已完整导入的文件续传时不会重复写入
+    assert ingest_file(EXAMPLE_DATA, resume=True, db_path=db_path)["saved"] == 0
+
+
+def test_resubmitted_reports_are_skipped(make_db):
+    db_path = make_db()
+    parse_reports_batch(REPORTS, db_path)
+    # 缩进、空行、换行符不同的重发视为同一汇报
+    resent = ["  采集员：张三\r\n\r\n  车辆编号：京A12345\r\n采集段数：5\n行驶里程：120.5公里  ", REPORTS[2]]
+    batch = parse_reports_batch(resent, db_path)
+
+    assert batch["saved"] == 0
+    assert batch["duplicates"] == 2
+    assert batch["failed"] == 0
+    summary = get_collection_summary(db_path)
+    assert summary["total_reports"] == 2
+    assert summary["total_segments"] == 13
+    assert summary["total_distance"] == 320.5
+
+
+def test_duplicate_count_and_update_policies(make_db):
+    db_path = make_db()
+    parse_reports_batch([REPORTS[0]], db_path)
+    assert parse_reports_batch([REPORTS[0], REPORTS[0]], db_path, on_duplicate="count")["saved"] == 0
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT submit_count FROM driver_reports").fetchone()[0] == 3
+
+    # update 用新的解析结果覆盖原记录，汇总随之调整
+    with mock.patch.object(ingest, "_parse_cache", LRUCache(0)), \
+            mock.patch.object(ingest, "extract_with_rules", lambda text: dict(extract_with_rules(text), collection_segments=9)):
+        assert parse_reports_batch([REPORTS[0]], db_path, on_duplicate="update")["saved"] == 0
+    assert conn.execute("SELECT COUNT(*), SUM(collection_segments) FROM driver_reports").fetchone() == (1, 9)
+    conn.close()
+    assert get_collection_summary(db_path)["total_segments"] == 9
+
+
+def test_parse_cache_skips_reparse():
+    text = "采集员：缓存测试\n采集段数：3"
+    parse_report(text)
+    with mock.patch.object(ingest, "extract_with_rules", side_effect=AssertionError("不应重新解析")):
+        assert parse_report("  " + text + "\n\n")["collection_segments"] == 3
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# 测试 LLM 兜底提取（本地桩服务器）
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+from llm import LLMExtractor
+
+FREE_FORM_REPORT = """今天完成了数据采集工作，我是王五，开的是京C11111号车。
+这次的任务是乡村道路数据采集，总共采集了3段数据。
+地点在北京市昌平区，时间是2025年1月12日，白天进行的。
+总共行驶了85.5公里。"""
+
+STANDARD_REPORT = "采集员：张三\n车辆编号：京A12345\n采集任务：城市道路数据采集\n采集段数：5\n" \
+                  "采集地点：北京市朝阳区\n采集日期：2025-01-10\n采集时段：白天\n行驶里程：120.5公里"
+
+ANSWER = {
+    "driver_name": "王五",
+    "vehicle_number": "京C11111",
+    "collection_task": "乡村道路数据采集",
+    "collection_segments": 99,
+    "collection_location": "北京市昌平区",
+    "collection_date": "2025-01-12",
+    "collection_time_period": "白天",
+    "driving_distance": "85.5",
+}
+
+
+class StubLLM:
+    """返回固定字段的 OpenAI 兼容桩服务器，记录收到的请求"""
+
+    def __init__(self, delay: float = 0):
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(payload)
+                time.sleep(delay)
+                size = payload["messages"][1]["content"].count("### 汇报 ")
+                content = json.dumps({"results": [{"index": i, "fields": ANSWER} for i in range(size)]})
+                body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                pass  # 超时测试中客户端先断开连接
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_only_missing_fields_are_requested_and_filled(tmp_path):
+    stub = StubLLM()
+    try:
+        llm = LLMExtractor(api_url=stub.url, cache_dir=str(tmp_path), batch_size=2)
+        texts = [FREE_FORM_REPORT, STANDARD_REPORT, FREE_FORM_REPORT + "\n补充", "采集员：赵六"]
+        rules = [extract_with_rules(text) for text in texts]
+        results = llm.fill_missing(rules, texts)
+    finally:
+        stub.close()
+
+    # 完整的汇报不发请求，其余三条按 batch_size=2 分两批
+    assert len(stub.requests) == 2
+    prompts = [request["messages"][1]["content"] for request in stub.requests]
+    prompt = next(prompt for prompt in prompts if prompt.startswith("### 汇报 0\n需要字段：driver_name"))
+    assert "collection_segments" not in prompt.split("\n")[1]
+
+    assert results[1] == rules[1]
+    assert results[0]["driver_name"] == "王五"
+    assert results[0]["collection_date"] == "2025-01-12"
+    assert results[0]["driving_distance"] == 85.5
+    # 规则已提取的字段不被覆盖
+    assert results[0]["collection_segments"] == 3
+    assert results[3]["driver_name"] == "赵六"
+
+
+def test_responses_are_cached_on_disk(tmp_path):
+    stub = StubLLM()
+    cache_dir = str(tmp_path)
+    try:
+        rules = [extract_with_rules(FREE_FORM_REPORT)]
+        first = LLMExtractor(api_url=stub.url, cache_dir=cache_dir).fill_missing(rules, [FREE_FORM_REPORT])
+        second = LLMExtractor(api_url=stub.url, cache_dir=cache_dir).fill_missing(rules, [FREE_FORM_REPORT])
+    finally:
+        stub.close()
+    assert len(stub.requests) == 1
+    assert first == second
+
+
+def test_cache_write_errors_keep_llm_result(tmp_path):
+    stub = StubLLM()
+    try:
+        rules = [extract_with_rules(FREE_FORM_REPORT)]
+        cache_dir = str(tmp_path)
+        llm = LLMExtractor(api_url=stub.url, cache_dir=cache_dir)
+        with mock.patch("llm.os.replace", side_effect=OSError(28, "No space left on device")):
+            result = llm.fill_missing(rules, [FREE_FORM_REPORT])
+        assert result[0]["driver_name"] == "王五"
+        assert len(stub.requests) == 1
+        # 写了一半的临时文件被清理
+        assert not [path for path in Path(cache_dir).rglob("*") if path.is_file()]
+    finally:
+        stub.close()
+
+
+def test_timeout_keeps_rule_result(tmp_path):
+    stub = StubLLM(delay=0.5)
+    try:
+        rules = [extract_with_rules(FREE_FORM_REPORT)]
+        llm = LLMExtractor(api_url=stub.url, cache_dir=str(tmp_path), timeout=0.1)
+        assert llm.fill_missing(rules, [FREE_FORM_REPORT]) == rules
+    finally:
+        stub.close()
+
+
+def test_concurrency_limit():
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def transport(payload):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return {"choices": [{"message": {"content": '{"results": []}'}}]}
+
+    llm = LLMExtractor(api_url="unused", cache_dir=None, batch_size=1, concurrency=2, transport=transport)
+    texts = [f"第{i}条" for i in range(6)]
+    llm.fill_missing([extract_with_rules(text) for text in texts], texts)
+    assert state["peak"] == 2
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# 测试 /rpc 压测工具（本地桩服务器）
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from load_test import parse_mix, percentile, run_stage
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status: int, body: bytes, chunked: bool = False):
+        self.send_response(status)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in (body[:3], body[3:]):
+                self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply(200, b'{"driver_name": "x"}')
+
+    def do_GET(self):
+        if self.path == "/rpc/export_data_csv?format=csv":
+            self._reply(200, "id,driver_name\r\n1,张三\r\n".encode("utf-8"), chunked=True)
+        else:
+            self._reply(500, b'{"error": "boom"}')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) is None
+
+
+def test_parse_mix():
+    assert parse_mix("parse=3,export=1") == {"parse": 3.0, "export": 1.0}
+
+
+def test_run_stage_against_local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        stage = asyncio.run(run_stage(f"http://127.0.0.1:{server.server_port}", clients=4, duration=0.5,
+                                      mix=parse_mix("parse=1,summary=1,export=1")))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    operations = stage["operations"]
+    assert stage["clients"] == 4
+    assert stage["requests"] == sum(stats["requests"] for stats in operations.values()) > 0
+    assert operations["parse"]["errors"] == 0
+    assert operations["export"]["errors"] == 0
+    # 桩服务器对汇总返回 500，计为错误
+    assert operations["summary"]["error_rate"] == 1.0
+    assert stage["p50_ms"] <= stage["p95_ms"] <= stage["p99_ms"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
+    print("🎉 压测工具测试全部通过！")
@@ -9,9 +9,6 @@ async def test_mcp_imports():
         from fastmcp import FastMCP
         print("✅ FastMCP 导入成功")
         
-        import pandas as pd
-        print("✅ Pandas 导入成功")
-        
         import sqlite3
         print("✅ SQLite3 导入成功")
         
@@ -85,9 +85,6 @@ def test_basic_imports():
     print("🔍 测试基本模块导入...")
     
     try:
-        import pandas as pd
-        print("✅ pandas 导入成功")
-        
         import sqlite3
         print("✅ sqlite3 导入成功")
         
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# 测试运行指标
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+import metrics
+from ingest import _parse_cache, parse_reports_batch
+from metrics import Counter, Histogram, render_prometheus, server_stats, track_tool
+from summary import get_collection_summary
+
+REPORTS = [
+    "采集员：张三\n车辆编号：京A001\n采集地点：北京\n采集日期：2025-03-10\n采集段数：5",
+    "采集员：李四\n车辆编号：京A002\n采集日期：2025-03-11",
+]
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram("test_seconds", "测试", ("tool",), buckets=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.01, 0.05, 0.5, 3.0):
+        histogram.observe(seconds, "a")
+    lines = histogram.render()
+    # 桶计数是累积的，边界值计入该桶（le 即小于等于）
+    assert 'test_seconds_bucket{tool="a",le="0.01"} 2' in lines
+    assert 'test_seconds_bucket{tool="a",le="1.0"} 4' in lines
+    assert 'test_seconds_bucket{tool="a",le="+Inf"} 5' in lines
+    assert 'test_seconds_count{tool="a"} 5' in lines
+
+    (_, data), = histogram.items()
+    stats = histogram.summary(data)
+    assert stats["count"] == 5 and stats["p50_ms"] == 100.0
+    # 落在最后一个桶之外的分位数无法估计
+    assert stats["p99_ms"] is None
+
+    counter = Counter("test_total", "测试", ("name",))
+    counter.inc('a"b\n')
+    assert counter.render() == ['test_total{name="a\\"b\\n"} 1']
+
+
+def test_ingest_records_phases_rows_and_field_hits(make_db):
+    metrics.reset()
+    _parse_cache.clear()
+    db_path = make_db()
+    parse_reports_batch(REPORTS + REPORTS[:1], db_path)
+    get_collection_summary(db_path, driver_name="张三")
+
+    stats = server_stats()
+    assert stats["rows_ingested"] == 2 and stats["duplicate_reports"] == 1
+    # 第三条与第一条相同，命中解析缓存，不再提取
+    assert stats["parse_cache"] == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+    assert stats["extraction"]["reports"] == 2
+    assert stats["extraction"]["fields"]["driver_name"]["hit_rate"] == 1.0
+    assert stats["extraction"]["fields"]["collection_segments"] == {"found": 1, "missing": 1, "hit_rate": 0.5}
+    # 阶段耗时按调用记录：一次批量解析、一次入库事务、一次汇总查询
+    assert stats["phases"]["parse"]["count"] == 1
+    assert stats["phases"]["db_write"]["count"] == 1
+    assert stats["phases"]["db_read"]["count"] == 1
+
+    text = render_prometheus()
+    assert "# TYPE driver_data_phase_seconds histogram" in text
+    assert "driver_data_rows_ingested_total 2" in text
+    assert 'driver_data_extracted_fields_total{field="collection_task",result="missing"} 2' in text
+
+
+def test_track_tool_counts_errors():
+    metrics.reset()
+
+    async def lookup(name: str) -> dict:
+        """查找"""
+        if not name:
+            return {"error": "缺少 name"}
+        return {"name": name}
+
+    tracked = track_tool(lookup)
+    # 保留名称、文档与签名，MCP 据此生成工具描述
+    assert tracked.__name__ == "lookup" and tracked.__doc__ == "查找"
+    assert asyncio.run(tracked("张三")) == {"name": "张三"}
+    asyncio.run(tracked(""))
+
+    (tool,) = server_stats()["tools"]
+    assert (tool["tool"], tool["transport"], tool["calls"], tool["errors"]) == ("lookup", "mcp", 2, 1)
+    assert tool["p50_ms"] is not None
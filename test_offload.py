@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# 测试阻塞任务卸载
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from config import TOOL_CONCURRENCY
+from offload import iterate_blocking, run_blocking
+
+
+def test_slow_export_does_not_block_parse():
+    release = threading.Event()
+
+    async def scenario():
+        export = asyncio.ensure_future(run_blocking("export", release.wait, 5))
+        await asyncio.sleep(0.01)
+        # 导出仍在线程中阻塞时，事件循环照常处理解析
+        parsed = await asyncio.wait_for(run_blocking("parse", str.upper, "ok"), timeout=1)
+        assert not export.done()
+        release.set()
+        return parsed, await export
+
+    assert asyncio.run(scenario()) == ("OK", True)
+
+
+def test_per_kind_concurrency_limit():
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+
+    async def scenario():
+        await asyncio.gather(*(run_blocking("export", work) for _ in range(TOOL_CONCURRENCY["export"] + 3)))
+
+    asyncio.run(scenario())
+    assert state["peak"] == TOOL_CONCURRENCY["export"]
+
+
+def test_iterate_blocking_closes_iterator_early():
+    closed = []
+
+    def chunks():
+        try:
+            yield from range(10)
+        finally:
+            closed.append(threading.current_thread().name)
+
+    async def scenario():
+        stream = iterate_blocking("export", chunks())
+        items = []
+        async for item in stream:
+            items.append(item)
+            if item == 2:
+                break
+        await stream.aclose()
+        return items
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+    # 生成器在线程池中关闭
+    assert closed and closed[0].startswith("tool")
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
+    print("🎉 任务卸载测试全部通过！")
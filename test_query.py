@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# 测试汇报明细查询
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from archive import archive_reports
+from query import DEFAULT_PAGE_SIZE, _query_sql, query_reports
+from storage import get_connection
+
+REPORTS = [
+    f"采集员：{'方少东' if i % 3 else '张三'}\n车辆编号：京A00{i % 2}\n采集地点：北京\n"
+    f"采集日期：2025-{i % 6 + 1:02d}-10\n采集时段：{'白天' if i % 2 else '夜晚'}\n采集段数：{i}"
+    for i in range(1, 31)
+]
+
+
+def _all_pages(db_path: str, **filters):
+    ids, cursor = [], None
+    while True:
+        result = query_reports(db_path, cursor=cursor, **filters)
+        ids += [report["id"] for report in result["reports"]]
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_keyset_pages_cover_filtered_rows(make_db):
+    db_path = make_db(REPORTS)
+    first = query_reports(db_path, driver_name="方少东", page_size=5)
+    assert [report["id"] for report in first["reports"]] == [29, 28, 26, 25, 23]
+    assert first["next_cursor"] == "23"
+    assert "raw_text" not in first["reports"][0]
+
+    expected = [i for i in range(30, 0, -1) if i % 3]
+    assert _all_pages(db_path, driver_name="方少东", page_size=7) == expected
+    assert _all_pages(db_path, driver_name="方少东", collection_time_period="白天",
+                      start_date="2025-03-01", page_size=2) == [
+        i for i in expected if i % 2 and i % 6 + 1 >= 3]
+
+    result = query_reports(db_path, vehicle_number="京A001", page_size=1, include_raw_text=True)
+    assert result["reports"][0]["raw_text"] == REPORTS[28]
+    # 没有数据时结构不变，分页客户端不需要特殊处理
+    assert query_reports(db_path, driver_name="李四") == {
+        "reports": [], "next_cursor": None, "page_size": DEFAULT_PAGE_SIZE, "message": "暂无数据"}
+    assert "error" in query_reports(db_path, cursor="abc")
+
+
+def test_deep_pages_seek_on_index(make_db):
+    db_path = make_db(REPORTS)
+    conn = get_connection(db_path)
+    plan = conn.execute("EXPLAIN QUERY PLAN " + _query_sql("driver_reports", ("driver_name",), True, False),
+                        ("方少东", 10, 21)).fetchall()
+    details = " ".join(row[3] for row in plan)
+    # 在索引上直接定位到游标之后，不扫描前面的行，也不排序
+    assert "driver_name=? AND rowid<?" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_pages_include_archived_reports(make_db):
+    db_path = make_db(REPORTS)
+    expected = _all_pages(db_path, driver_name="方少东", page_size=4)
+    assert archive_reports(30, db_path, today=date(2025, 5, 1))["archived"] > 0
+    assert _all_pages(db_path, driver_name="方少东", start_date="2025-01-01", page_size=4) == expected
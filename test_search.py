@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# 测试汇报全文检索
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+from search import search_reports
+from storage import connect, init_database, save_reports_batch
+
+REPORTS = [
+    "采集员：张三\n车辆编号：京A001\n采集任务：黄灯闪烁路口/与行人二轮车交互\n采集地点：北京",
+    "采集员：李四\n车辆编号：京A002\n采集任务：城市道路数据采集\n备注：途经黄灯闪烁路口两处，黄灯闪烁路口车流大",
+    "采集员：王五\n车辆编号：沪B003\n采集任务：隧道场景采集\n采集地点：上海",
+]
+
+
+def test_search_ranks_and_highlights(make_db):
+    db_path = make_db(REPORTS)
+    result = search_reports("黄灯闪烁路口", db_path=db_path)
+    assert result["total"] == 2
+    # 原文与采集任务都命中的汇报排在前面
+    assert [hit["id"] for hit in result["hits"]] == [1, 2]
+    assert result["hits"][0]["score"] <= result["hits"][1]["score"]
+    assert result["hits"][0]["driver_name"] == "张三"
+    assert "【黄灯闪烁路口】" in result["hits"][1]["snippet"]
+
+    # 多个词需全部出现；查询中的 FTS5 语法字符按字面匹配
+    assert [hit["id"] for hit in search_reports("黄灯闪烁 李四", db_path=db_path)["hits"]] == [2]
+    assert search_reports('隧道场景 OR "x', db_path=db_path)["total"] == 0
+    assert search_reports("不存在的内容", db_path=db_path)["total"] == 0
+    assert "error" in search_reports("  ", db_path=db_path)
+
+
+def test_search_pagination(make_db):
+    db_path = make_db(REPORTS)
+    first = search_reports("采集员", page=1, page_size=2, db_path=db_path)
+    second = search_reports("采集员", page=2, page_size=2, db_path=db_path)
+    assert first["total"] == second["total"] == 3
+    assert len(first["hits"]) == 2 and len(second["hits"]) == 1
+    assert {hit["id"] for hit in first["hits"] + second["hits"]} == {1, 2, 3}
+
+
+def test_short_terms_fall_back_to_like(make_db):
+    db_path = make_db(REPORTS)
+    result = search_reports("王五", db_path=db_path)
+    assert result["total"] == 1
+    assert result["hits"][0]["id"] == 3
+    assert result["hits"][0]["score"] is None
+    assert search_reports("100%", db_path=db_path)["total"] == 0
+
+
+def test_index_tracks_updates_and_deletes(make_db):
+    db_path = make_db(REPORTS)
+    # 外部工具的普通连接也能删改汇报，索引在下次检索前同步
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("UPDATE driver_reports SET collection_task = '夜间环路数据采集' WHERE id = 3")
+        conn.execute("DELETE FROM driver_reports WHERE id = 2")
+
+    assert [hit["id"] for hit in search_reports("夜间环路", db_path=db_path)["hits"]] == [3]
+    assert [hit["id"] for hit in search_reports("黄灯闪烁路口", db_path=db_path)["hits"]] == [1]
+    assert search_reports("城市道路", db_path=db_path)["total"] == 0
+    assert conn.execute("SELECT COUNT(*) FROM report_search_queue").fetchone()[0] == 0
+    assert conn.execute("SELECT id FROM report_texts ORDER BY id").fetchall() == [(1,), (3,)]
+    conn.close()
+
+    check = connect(db_path)
+    check.execute("INSERT INTO report_search (report_search) VALUES ('integrity-check')")
+    check.close()
+
+
+def test_update_policy_reindexes_collection_task(make_db):
+    db_path = make_db(REPORTS)
+    changed = REPORTS[2].replace("隧道场景采集", "隧道出入口采集")
+    data = dict(extract_with_rules(changed), collection_task="隧道出入口采集")
+    assert save_reports_batch([(data, REPORTS[2])], db_path, on_duplicate="update") == 0
+    assert [hit["id"] for hit in search_reports("隧道出入口", db_path=db_path)["hits"]] == [3]
+
+
+def test_migration_indexes_existing_reports(tmp_path):
+    # 旧版数据库：原文直接存放在 driver_reports.raw_text
+    db_path = str(tmp_path / "driver_data.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE driver_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            driver_name TEXT, vehicle_number TEXT, collection_task TEXT,
+            collection_segments INTEGER, collection_location TEXT, collection_date TEXT,
+            collection_time_period TEXT, driving_distance REAL, raw_text TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    with conn:
+        conn.executemany("INSERT INTO driver_reports (collection_task, raw_text) VALUES (?, ?)",
+                         [(extract_with_rules(text)["collection_task"], text) for text in REPORTS])
+    conn.close()
+    init_database(db_path)
+
+    assert search_reports("黄灯闪烁路口", db_path=db_path)["total"] == 2
+    assert search_reports("王五", db_path=db_path)["hits"][0]["id"] == 3
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# 测试数据库结构与迁移
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from storage import MIGRATIONS, get_connection, init_database, save_to_database
+from summary import get_collection_summary
+
+
+def _legacy_db(tmp_path: Path) -> str:
+    """旧版脚本创建的数据库：只有 driver_reports 表和一行数据"""
+    db_path = str(tmp_path / "driver_data.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE driver_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            driver_name TEXT, vehicle_number TEXT, collection_task TEXT,
+            collection_segments INTEGER, collection_location TEXT, collection_date TEXT,
+            collection_time_period TEXT, driving_distance REAL, raw_text TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("INSERT INTO driver_reports (driver_name, collection_date) VALUES ('张三', '2025-01-10')")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_init_database_upgrades_legacy_db(tmp_path):
+    db_path = _legacy_db(tmp_path)
+    init_database(db_path)
+    init_database(db_path)
+
+    conn = sqlite3.connect(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    rows = conn.execute("SELECT COUNT(*) FROM driver_reports").fetchone()[0]
+    conn.close()
+
+    assert version == len(MIGRATIONS)
+    assert {"idx_driver_reports_driver", "idx_driver_reports_vehicle",
+            "idx_driver_reports_location", "idx_driver_reports_date_driver"} <= indexes
+    assert rows == 1
+
+
+def test_migration_hashes_legacy_duplicates(tmp_path):
+    db_path = _legacy_db(tmp_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO driver_reports (driver_name, raw_text) VALUES (?, ?)",
+                     [("张三", "采集员：张三"), ("张三", "  采集员：张三\n")])
+    conn.commit()
+    conn.close()
+    init_database(db_path)
+
+    conn = sqlite3.connect(db_path)
+    hashes = conn.execute("SELECT content_hash FROM driver_reports ORDER BY id").fetchall()
+    conn.close()
+    # 已有的重复记录保留，只有最早的一条占用哈希
+    assert hashes[0] == (None,)
+    assert hashes[1][0] is not None
+    assert hashes[2] == (None,)
+
+
+def test_writes_upgrade_legacy_db_without_init(tmp_path):
+    db_path = _legacy_db(tmp_path)
+    data = {"driver_name": "李四", "vehicle_number": None, "collection_task": None,
+            "collection_segments": 3, "collection_location": None, "collection_date": None,
+            "collection_time_period": None, "driving_distance": None}
+    assert save_to_database(data, "采集员：李四\n采集段数：3", db_path) == 1
+    assert get_collection_summary(db_path)["total_reports"] == 2
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    conn.close()
+
+
+def test_connections_are_reused_per_thread(tmp_path):
+    db_path = _legacy_db(tmp_path)
+    conn = get_connection(db_path)
+    assert get_connection(db_path) is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_connection(db_path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_readers_do_not_block_behind_writer(tmp_path):
+    db_path = _legacy_db(tmp_path)
+    init_database(db_path)
+    writer = sqlite3.connect(db_path, timeout=0)
+    writer.execute("BEGIN EXCLUSIVE")
+    writer.execute("INSERT INTO driver_reports (driver_name) VALUES ('李四')")
+    try:
+        # 写事务未提交时，读取立即返回已提交的数据
+        reader = sqlite3.connect(db_path, timeout=0)
+        assert reader.execute("SELECT COUNT(*) FROM driver_reports").fetchone()[0] == 1
+        reader.close()
+    finally:
+        writer.rollback()
+        writer.close()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# 测试物化汇总
+import sys
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+from storage import connect, rebuild_summary, save_reports_batch
+import summary as summary_module
+from summary import get_collection_summary, get_collection_summary_with_etag
+
+REPORTS = [
+    "采集员：张三\n采集地点：北京\n采集时段：白天\n采集段数：5\n行驶里程：10.5公里",
+    "采集员：张三\n采集地点：上海\n采集时段：夜晚\n采集段数：2\n行驶里程：1公里",
+    "姓名：李四\n地点：北京",
+]
+
+
+def test_empty_summary(make_db):
+    assert get_collection_summary(make_db()) == {"message": "暂无数据"}
+
+
+def test_summary_tracks_inserts(make_db):
+    summary = get_collection_summary(make_db(REPORTS))
+    assert summary["total_reports"] == 3
+    assert summary["total_drivers"] == 2
+    assert summary["total_segments"] == 7
+    assert summary["total_distance"] == 11.5
+    assert summary["locations"] == {"北京": 2, "上海": 1}
+    assert summary["time_periods"] == {"夜晚": 1, "白天": 1}
+
+
+def test_summary_tracks_updates_and_deletes(make_db):
+    db_path = make_db(REPORTS)
+    conn = connect(db_path)
+    with conn:
+        conn.execute("UPDATE driver_reports SET driver_name = '王五', collection_location = '广州' WHERE id = 3")
+        conn.execute("DELETE FROM driver_reports WHERE id = 1")
+
+    summary = get_collection_summary(db_path)
+    assert summary["total_reports"] == 2
+    assert summary["total_drivers"] == 2
+    assert summary["total_segments"] == 2
+    assert summary["locations"] == {"上海": 1, "广州": 1}
+    assert summary["time_periods"] == {"夜晚": 1}
+
+    # 增量结果与全量重建一致
+    rebuild_summary(conn)
+    conn.close()
+    assert get_collection_summary(db_path) == summary
+
+
+def test_filtered_summary(make_db):
+    db_path = make_db(REPORTS)
+    summary = get_collection_summary(db_path, driver_name="张三")
+    assert summary["total_reports"] == 2
+    assert summary["total_drivers"] == 1
+    assert summary["total_distance"] == 11.5
+    assert summary["locations"] == {"上海": 1, "北京": 1}
+
+    summary = get_collection_summary(db_path, collection_location="北京")
+    assert summary["total_reports"] == 2
+    assert summary["time_periods"] == {"白天": 1}
+
+    assert get_collection_summary(db_path, driver_name="不存在") == {"message": "暂无数据"}
+
+
+def test_filtered_summary_by_date_range(make_db):
+    texts = [f"采集员：张三\n采集日期：2025-01-{day:02d}\n采集段数：1" for day in (5, 10, 20)]
+    db_path = make_db(texts)
+
+    summary = get_collection_summary(db_path, start_date="2025-01-06", end_date="2025-01-20")
+    assert summary["total_reports"] == 2
+    assert summary["total_segments"] == 2
+
+
+def test_summary_cache_follows_data_version(make_db):
+    db_path = make_db(REPORTS)
+    summary, etag = get_collection_summary_with_etag(db_path, driver_name="张三")
+
+    # 数据未变化：直接返回缓存，ETag 不变
+    with mock.patch.object(summary_module, "_filtered_summary", side_effect=AssertionError("不应重新计算")):
+        assert get_collection_summary_with_etag(db_path, driver_name="张三") == (summary, etag)
+
+    text = "采集员：张三\n采集段数：1"
+    save_reports_batch([(extract_with_rules(text), text)], db_path)
+    new_summary, new_etag = get_collection_summary_with_etag(db_path, driver_name="张三")
+    assert new_summary["total_reports"] == 3
+    assert new_etag != etag
+
+    # 不同筛选条件的 ETag 不同
+    assert get_collection_summary_with_etag(db_path, driver_name="李四")[1] != new_etag
+
+
+def test_summary_cache_returns_copies(make_db):
+    db_path = make_db(REPORTS)
+    get_collection_summary(db_path)["locations"]["北京"] = 0
+    assert get_collection_summary(db_path)["locations"]["北京"] == 2
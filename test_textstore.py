@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# 测试原文压缩存储
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from extractor import extract_with_rules
+from storage import connect, get_raw_texts, save_reports_batch, train_text_dictionary
+from textstore import SEED_DICTIONARY_ID
+
+REPORTS = [
+    f"采集员：张三\n车辆编号：京A00{i}\n采集任务：城市道路数据采集\n采集段数：{i}\n"
+    f"采集地点：北京市朝阳区\n采集日期：2025-03-{i + 10:02d}\n采集时段：白天\n行驶里程：{i * 3}公里"
+    for i in range(1, 9)
+]
+
+
+def test_raw_text_is_stored_compressed(make_db):
+    db_path = make_db(REPORTS)
+    conn = sqlite3.connect(db_path)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(driver_reports)")]
+    stored = conn.execute("SELECT SUM(length(data)) FROM report_texts").fetchone()[0]
+    conn.close()
+
+    assert "raw_text" not in columns
+    assert stored < sum(len(text.encode("utf-8")) for text in REPORTS) / 2
+    assert get_raw_texts([2, 1, 99], db_path) == {1: REPORTS[0], 2: REPORTS[1]}
+
+
+def test_trained_dictionary_applies_to_new_reports(make_db):
+    db_path = make_db(REPORTS)
+    dictionary_id = train_text_dictionary(db_path)
+    assert dictionary_id > SEED_DICTIONARY_ID
+
+    text = REPORTS[0].replace("张三", "李四")
+    save_reports_batch([(extract_with_rules(text), text)], db_path)
+    conn = connect(db_path)
+    rows = conn.execute("SELECT id, dictionary_id FROM report_texts ORDER BY id").fetchall()
+    view = conn.execute("SELECT raw_text FROM driver_reports_with_text ORDER BY id").fetchall()
+    conn.close()
+
+    # 已有记录保持原字典，新记录使用新字典
+    assert rows[0][1] == SEED_DICTIONARY_ID
+    assert rows[-1][1] == dictionary_id
+    assert [row[0] for row in view] == REPORTS + [text]
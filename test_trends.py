@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# 测试按时间分桶的趋势汇总
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from storage import MIGRATIONS, connect
+import trends as trends_module
+from trends import get_collection_trends
+
+REPORTS = [
+    "采集员：张三\n车辆编号：京A001\n采集地点：北京\n采集日期：2025-03-03\n采集时段：白天\n采集段数：5\n行驶里程：10.5公里",
+    "采集员：张三\n车辆编号：京A001\n采集地点：上海\n采集日期：2025-03-09\n采集时段：夜晚\n采集段数：2\n行驶里程：1公里",
+    "采集员：李四\n车辆编号：京A002\n采集地点：北京\n采集日期：2025-03-10\n采集段数：4\n行驶里程：20公里",
+    "采集员：李四\n车辆编号：京A002\n采集地点：北京\n采集日期：2025-04-01\n采集段数：1\n行驶里程：3公里",
+    "姓名：王五\n地点：北京",
+]
+
+
+def _totals(result):
+    return [(row["bucket"], row["reports"], row["segments"], row["distance"]) for row in result["trends"]]
+
+
+def test_empty_trends(make_db):
+    db_path = make_db()
+    assert get_collection_trends(db_path) == {"message": "暂无数据"}
+
+
+def test_trends_by_granularity(make_db):
+    db_path = make_db(REPORTS)
+    # 没有采集日期的汇报不进入任何桶
+    assert _totals(get_collection_trends(db_path, "day")) == [
+        ("2025-03-03", 1, 5, 10.5), ("2025-03-09", 1, 2, 1.0),
+        ("2025-03-10", 1, 4, 20.0), ("2025-04-01", 1, 1, 3.0),
+    ]
+    # 周以周一为桶：2025-03-09 是周日，与 03-03 同一周
+    assert _totals(get_collection_trends(db_path, "week")) == [
+        ("2025-03-03", 2, 7, 11.5), ("2025-03-10", 1, 4, 20.0), ("2025-03-31", 1, 1, 3.0),
+    ]
+    assert _totals(get_collection_trends(db_path, "month")) == [
+        ("2025-03", 3, 11, 31.5), ("2025-04", 1, 1, 3.0),
+    ]
+
+
+def test_trends_by_dimension_and_filters(make_db):
+    db_path = make_db(REPORTS)
+    result = get_collection_trends(db_path, "month", dimension="driver")
+    assert [(row["bucket"], row["key"], row["reports"]) for row in result["trends"]] == [
+        ("2025-03", "张三", 2), ("2025-03", "李四", 1), ("2025-04", "李四", 1),
+    ]
+    result = get_collection_trends(db_path, "month", dimension="time_period")
+    assert [(row["bucket"], row["key"]) for row in result["trends"]][:3] == [
+        ("2025-03", None), ("2025-03", "夜晚"), ("2025-03", "白天"),
+    ]
+
+    # 起止日期所在的整周计入
+    result = get_collection_trends(db_path, "week", start_date="2025-03-05", end_date="2025-03-10",
+                                   collection_location="北京")
+    assert _totals(result) == [("2025-03-03", 1, 5, 10.5), ("2025-03-10", 1, 4, 20.0)]
+
+    assert "error" in get_collection_trends(db_path, "year")
+    assert "error" in get_collection_trends(db_path, dimension="task")
+
+
+def test_trends_track_updates_and_deletes(make_db):
+    db_path = make_db(REPORTS)
+    conn = connect(db_path)
+    with conn:
+        conn.execute("UPDATE driver_reports SET collection_date = '2025-04-02', driving_distance = 7 WHERE id = 3")
+        conn.execute("DELETE FROM driver_reports WHERE id = 1")
+    conn.close()
+
+    assert _totals(get_collection_trends(db_path, "month")) == [
+        ("2025-03", 1, 2, 1.0), ("2025-04", 2, 5, 10.0),
+    ]
+    # 计数归零的桶被删除
+    assert get_collection_trends(db_path, "day", start_date="2025-03-03",
+                                 end_date="2025-03-03") == {"message": "暂无数据"}
+
+
+def test_migration_backfills_rollups(make_db):
+    db_path = make_db(REPORTS)
+    expected = get_collection_trends(db_path, "week", dimension="vehicle")
+
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        DROP TABLE report_rollups;
+        DROP TRIGGER trg_driver_reports_rollup_insert;
+        DROP TRIGGER trg_driver_reports_rollup_delete;
+        DROP TRIGGER trg_driver_reports_rollup_update;
+    ''')
+    with conn:
+        for statement in MIGRATIONS[3]:
+            conn.execute(statement)
+    conn.close()
+
+    # 回填不改变 driver_reports，版本号不变，需清掉缓存才会重新读表
+    trends_module._trends_cache.clear()
+    assert get_collection_trends(db_path, "week", dimension="vehicle") == expected